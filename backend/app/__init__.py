@@ -1,47 +1,92 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from pymongo import MongoClient
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
+from app.auth.admission import admission_controller
+from app.auth.hashing import password_hasher
+from app.utils.cache import facet_cache, profile_cache
+from app.utils.json_provider import MongoJSONProvider
+from app.utils.matching import match_scorer
+from app.utils.mongo import mongo
+from app.utils.monitoring import CommandCounter, init_request_stats, metrics
+from app.utils.invalidation import invalidation_bus
+from app.utils.jobs import job_queue
+from app.utils.indexes import ensure_indexes, verify_query_plans
+from app.cli import register_commands
 import os
 jwt = JWTManager()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.json = MongoJSONProvider(app)
     app.config.from_object(config_class)
+    if app.config.get('PROXY_FIX_X_FOR'):
+        # remote_addr must be the client, not the proxy, for per-IP auth limits
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
     # Initialize JWT and CORS
     
     jwt.init_app(app)
     CORS(app)
+    password_hasher.init_app(app)
+    admission_controller.init_app(app)
+    facet_cache.init_app(app)
+    profile_cache.init_app(app)
+    match_scorer.init_app(app)
     from flask_jwt_extended import JWTManager
 
     @jwt.invalid_token_loader
     def invalid_token_callback(reason):
-        print('❌ INVALID TOKEN:', reason)
+        app.logger.info('Invalid token: %s', reason)
         return jsonify({"msg": "Invalid token", "reason": reason}), 422
 
     @jwt.unauthorized_loader
     def missing_token_callback(reason):
-        print('❌ MISSING TOKEN:', reason)
+        app.logger.info('Missing token: %s', reason)
         return jsonify({"msg": "Missing token", "reason": reason}), 401
 
 
-    # Set up MongoDB with PyMongo directly
-    mongo_uri = app.config.get("MONGO_URI", "mongodb://localhost:27017/")
-    client = MongoClient(mongo_uri)
-    db_name = app.config.get("MONGO_DBNAME", "yourdbname")  # Set this in Config
-    app.db = client[db_name]
+    # Set up MongoDB with PyMongo directly; the client is created per process
+    command_counter = CommandCounter()
+    mongo.init_app(app, event_listeners=[command_counter])
+    init_request_stats(app, command_counter)
+    metrics.add_collector(mongo.collect_metrics)
+    metrics.add_collector(password_hasher.collect_metrics)
+    metrics.add_collector(admission_controller.collect_metrics)
+    metrics.add_collector(profile_cache.collect_metrics)
+
+    # Keep the per-process caches coherent across workers
+    invalidation_bus.init_app(app)
+    invalidation_bus.subscribe('facets', facet_cache.invalidate)
+    invalidation_bus.subscribe('profiles', profile_cache.invalidate)
+    metrics.add_collector(invalidation_bus.collect_metrics)
+
+    # Background jobs; handlers register themselves on import
+    job_queue.init_app(app)
+    from app import tasks  # noqa: F401
+    metrics.add_collector(job_queue.collect_metrics)
 
     # Register blueprints
     from app.auth.routes import auth
     from app.api.faculty_routes import faculty_bp
     from app.api.student_routes import student_bp
     from app.api.collaboration_routes import collaboration_bp
+    from app.api.export_routes import export_bp
+    from app.api.job_routes import job_bp
 
     app.register_blueprint(auth, url_prefix='/api/auth')
     app.register_blueprint(faculty_bp, url_prefix='/api')
     app.register_blueprint(student_bp, url_prefix='/api')
     app.register_blueprint(collaboration_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(job_bp, url_prefix='/api')
+
+    register_commands(app)
+
+    if app.config.get("MONGO_ENSURE_INDEXES"):
+        ensure_indexes(app.db)
+    if app.config.get("MONGO_VERIFY_INDEXES"):
+        verify_query_plans(app.db)
 
     return app
@@ -1,48 +1,174 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from bson import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
+from app.auth.utils import current_user_identity
+from app.models.collaboration import Collaboration, MATCH_METHODS
+from app.models.user import PROFILE_FIELDS
+from app.utils.jobs import job_queue
+from app.utils.helpers import (
+    MAX_PAGE_SIZE, REQUEST_FIELDS, REQUEST_STATUSES, inbox_page, parse_fields, parse_inbox_args,
+    parse_page_args, status_counts
+)
 
 collaboration_bp = Blueprint('collaboration', __name__)
 
+MAX_BULK_REQUESTS = 500
+MAX_ASYNC_BULK_REQUESTS = 10000
+
+
+def attach_user_summaries(db, requests, id_field, key, fields):
+    """Attach a short profile of the other party to each request with one $in query"""
+    user_ids = {r.get(id_field) for r in requests}
+    object_ids = [ObjectId(i) for i in user_ids if isinstance(i, str) and ObjectId.is_valid(i)]
+    if not object_ids:
+        return requests
+
+    projection = {'name': 1, **{field: 1 for field in fields}}
+    users = {str(u['_id']): u for u in db.users.find({"_id": {"$in": object_ids}}, projection)}
+    for r in requests:
+        user = users.get(r.get(id_field))
+        if user:
+            r[key] = {
+                'id': str(user['_id']),
+                'name': user.get('name'),
+                **{field: user.get(field, '') for field in fields}
+            }
+    return requests
+
+
+def apply_request_status(db, faculty_id, request_ids, status):
+    """Set status on the given requests owned by faculty_id with one bulk write
+
+    Returns {request_id: result} where result is updated, unchanged,
+    not_found, unauthorized or invalid_id.
+    """
+    object_ids = [ObjectId(i) for i in request_ids if ObjectId.is_valid(i)]
+    found = {
+        str(r['_id']): r for r in db.collaborations.find(
+            {'_id': {'$in': object_ids}}, {'faculty_id': 1, 'status': 1}
+        )
+    }
+
+    results, operations = {}, []
+    now = datetime.utcnow()
+    for request_id in request_ids:
+        existing = found.get(request_id)
+        if not ObjectId.is_valid(request_id):
+            results[request_id] = 'invalid_id'
+        elif existing is None:
+            results[request_id] = 'not_found'
+        elif existing.get('faculty_id') != faculty_id:
+            results[request_id] = 'unauthorized'
+        elif existing.get('status') == status:
+            results[request_id] = 'unchanged'
+        else:
+            results[request_id] = 'updated'
+            # Keep faculty_id in the filter so ownership holds at write time too
+            operations.append(UpdateOne(
+                {'_id': existing['_id'], 'faculty_id': faculty_id},
+                {'$set': {'status': status, 'updated_at': now}}
+            ))
+
+    if operations and db.collaborations.bulk_write(operations, ordered=False).matched_count != len(operations):
+        # A request was deleted or reassigned after the read; report what the write did
+        updated_ids = [ObjectId(i) for i, result in results.items() if result == 'updated']
+        current = {
+            str(r['_id']): r for r in db.collaborations.find(
+                {'_id': {'$in': updated_ids}}, {'faculty_id': 1}
+            )
+        }
+        for request_id in map(str, updated_ids):
+            existing = current.get(request_id)
+            if existing is None:
+                results[request_id] = 'not_found'
+            elif existing.get('faculty_id') != faculty_id:
+                results[request_id] = 'unauthorized'
+
+    return results
+
+
+@job_queue.task('bulk-update-request-status')
+def bulk_update_request_status_task(payload):
+    """Background form of PUT /requests/status for very large batches"""
+    results = apply_request_status(
+        current_app.db, payload['faculty_id'], payload['request_ids'], payload['status']
+    )
+    return {"updated": sum(1 for r in results.values() if r == 'updated'),
+            "results": [{"request_id": i, "result": results[i]} for i in payload['request_ids']]}
+
+
 @collaboration_bp.route('/matches', methods=['GET'])
 @jwt_required()
 def get_matches():
     db = current_app.db
-    current_user = get_jwt_identity()
-    user_id = current_user.get('user_id')
-    user_type = current_user.get('user_type')
+    user_id, user_type = current_user_identity()
+    try:
+        projection = parse_fields(request.args, REQUEST_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
 
     key = 'student_id' if user_type == 'student' else 'faculty_id'
-    matches = list(db.collaborations.find({key: user_id}))
-
-    for m in matches:
-        m['_id'] = str(m['_id'])
+    matches = list(db.collaborations.find({key: user_id}, projection))
     return jsonify({"success": True, "matches": matches, "count": len(matches)}), 200
 
+@collaboration_bp.route('/matches/suggested', methods=['GET'])
+@jwt_required()
+def get_suggested_matches():
+    """Suggest collaborators for the current user
+
+    ?method=interests (default) compares research interests; ?method=text
+    compares bios, publications and projects as well.
+    """
+    user_id, user_type = current_user_identity()
+    method = request.args.get('method', 'interests')
+    if method not in MATCH_METHODS:
+        return jsonify({"success": False, "message": "Invalid method"}), 400
+    try:
+        limit = min(int(request.args.get('limit', 20)), MAX_PAGE_SIZE)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid limit or offset"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"success": False, "message": "Invalid limit or offset"}), 400
+    match_type = 'faculty' if user_type == 'student' else 'student'
+    try:
+        projection = parse_fields(request.args, PROFILE_FIELDS[match_type])
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    matches = Collaboration.find_matches(
+        user_id, user_type, limit=limit, offset=offset, method=method, projection=projection
+    )
+    return jsonify({"success": True, "method": method, "matches": matches, "count": len(matches)}), 200
+
 @collaboration_bp.route('/matches/<user_id>', methods=['GET'])
 @jwt_required()
 def get_matches_for_user(user_id):
     db = current_app.db
-    user = db.users.find_one({"_id": ObjectId(user_id)})
+    if not ObjectId.is_valid(user_id):
+        return jsonify({"success": False, "message": "Invalid user ID"}), 400
+    try:
+        projection = parse_fields(request.args, REQUEST_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    user = db.users.find_one({"_id": ObjectId(user_id)}, {"user_type": 1})
 
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
     user_type = user.get('user_type')
     key = 'student_id' if user_type == 'student' else 'faculty_id'
-    matches = list(db.collaborations.find({key: user_id}))
-    for m in matches:
-        m['_id'] = str(m['_id'])
+    matches = list(db.collaborations.find({key: user_id}, projection))
     return jsonify({"success": True, "matches": matches, "count": len(matches)}), 200
 
 @collaboration_bp.route('/request', methods=['POST'])
 @jwt_required()
 def create_collaboration_request():
     db = current_app.db
-    current_user = get_jwt_identity()
-    user_id = current_user.get('user_id')
-    user_type = current_user.get('user_type')
+    user_id, user_type = current_user_identity()
 
     if user_type != 'student':
         return jsonify({"success": False, "message": "Only students can create collaboration requests"}), 403
@@ -51,14 +177,15 @@ def create_collaboration_request():
     if not data or 'faculty_id' not in data or 'message' not in data:
         return jsonify({"success": False, "message": "Faculty ID and message are required"}), 400
 
+    now = datetime.utcnow()
     request_data = {
         'student_id': user_id,
         'faculty_id': data.get('faculty_id'),
         'message': data.get('message'),
         'research_topic': data.get('research_topic', ''),
         'status': 'pending',
-        'created_at': datetime.utcnow(),
-        'updated_at': datetime.utcnow()
+        'created_at': now,
+        'updated_at': now
     }
 
     result = db.collaborations.insert_one(request_data)
@@ -68,80 +195,125 @@ def create_collaboration_request():
         "request_id": str(result.inserted_id)
     }), 201
 
-@collaboration_bp.route('/requests/student', methods=['GET'])
-@jwt_required()
-def get_student_requests():
+def inbox_response(owner_field, user_type, other_id_field, other_key, other_fields):
+    """One filtered page of the current user's requests plus per-status counts
+
+    With ?fields=, the other party's summary is attached only when their ID
+    field was selected.
+    """
     db = current_app.db
-    current_user = get_jwt_identity()
-    if current_user.get('user_type') != 'student':
+    user_id, current_type = current_user_identity()
+    if current_type != user_type:
         return jsonify({"success": False, "message": "Unauthorized"}), 403
 
-    student_id = current_user.get('user_id')
-    requests = list(db.collaborations.find({'student_id': student_id}))
-    for r in requests:
-        r['_id'] = str(r['_id'])
-        faculty = db.users.find_one({"_id": ObjectId(r['faculty_id'])})
-        if faculty:
-            r['faculty'] = {
-                'id': str(faculty['_id']),
-                'name': faculty.get('name'),
-                'department': faculty.get('department', ''),
-                'position': faculty.get('position', '')
-            }
-    return jsonify({"success": True, "requests": requests, "count": len(requests)}), 200
+    try:
+        filters = parse_inbox_args(request.args)
+        limit, cursor = parse_page_args(request.args)
+        projection = parse_fields(request.args, REQUEST_FIELDS)
+        requests, next_cursor = inbox_page(
+            db.collaborations, owner_field, user_id, filters, limit, cursor, projection
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    attach_user_summaries(db, requests, other_id_field, other_key, other_fields)
+    return jsonify({
+        "success": True,
+        "requests": requests,
+        "count": len(requests),
+        "next_cursor": next_cursor,
+        "status_counts": status_counts(db.collaborations, owner_field, user_id, filters)
+    }), 200
+
+@collaboration_bp.route('/requests/student', methods=['GET'])
+@jwt_required()
+def get_student_requests():
+    """Page through the current student's requests, filtered by status and since"""
+    return inbox_response('student_id', 'student', 'faculty_id', 'faculty', ['department', 'position'])
 
 @collaboration_bp.route('/requests/faculty', methods=['GET'])
 @jwt_required()
 def get_faculty_requests():
-    db = current_app.db
-    current_user = get_jwt_identity()
-    if current_user.get('user_type') != 'faculty':
-        return jsonify({"success": False, "message": "Unauthorized"}), 403
-
-    faculty_id = current_user.get('user_id')
-    requests = list(db.collaborations.find({'faculty_id': faculty_id}))
-    for r in requests:
-        r['_id'] = str(r['_id'])
-        student = db.users.find_one({"_id": ObjectId(r['student_id'])})
-        if student:
-            r['student'] = {
-                'id': str(student['_id']),
-                'name': student.get('name'),
-                'department': student.get('department', ''),
-                'program': student.get('program', '')
-            }
-    return jsonify({"success": True, "requests": requests, "count": len(requests)}), 200
+    """Page through the current faculty member's requests, filtered by status and since"""
+    return inbox_response('faculty_id', 'faculty', 'student_id', 'student', ['department', 'program'])
 
 @collaboration_bp.route('/request/<request_id>/status', methods=['PUT'])
 @jwt_required()
 def update_request_status(request_id):
     db = current_app.db
-    current_user = get_jwt_identity()
-    if current_user.get('user_type') != 'faculty':
+    faculty_id, user_type = current_user_identity()
+    if user_type != 'faculty':
         return jsonify({"success": False, "message": "Unauthorized"}), 403
 
-    faculty_id = current_user.get('user_id')
-    data = request.get_json()
+    if not ObjectId.is_valid(request_id):
+        return jsonify({"success": False, "message": "Invalid request ID"}), 400
+
+    data = request.get_json(silent=True)
     if not data or 'status' not in data:
         return jsonify({"success": False, "message": "Status is required"}), 400
 
     status = data['status']
-    if status not in ['pending', 'accepted', 'rejected']:
+    if status not in REQUEST_STATUSES:
         return jsonify({"success": False, "message": "Invalid status"}), 400
 
-    request_obj = db.collaborations.find_one({'_id': ObjectId(request_id)})
-    if not request_obj:
+    result = apply_request_status(db, faculty_id, [request_id], status)[request_id]
+    if result == 'not_found':
         return jsonify({"success": False, "message": "Request not found"}), 404
+    if result == 'unauthorized':
+        return jsonify({"success": False, "message": "Unauthorized"}), 403
+    if result == 'unchanged':
+        return jsonify({"success": True, "message": f"Request already {status}"}), 200
 
-    if request_obj['faculty_id'] != faculty_id:
+    return jsonify({"success": True, "message": f"Request {status}"}), 200
+
+
+@collaboration_bp.route('/requests/status', methods=['PUT'])
+@jwt_required()
+def bulk_update_request_status():
+    """Set the status of many requests owned by the current faculty member at once
+
+    Ownership is checked with one query and every change is applied with one
+    bulk write; the response reports a result for each requested ID.
+    """
+    db = current_app.db
+    faculty_id, user_type = current_user_identity()
+    if user_type != 'faculty':
         return jsonify({"success": False, "message": "Unauthorized"}), 403
 
-    result = db.collaborations.update_one(
-        {'_id': ObjectId(request_id)},
-        {'$set': {'status': status, 'updated_at': datetime.utcnow()}}
-    )
+    data = request.get_json(silent=True)
+    if not data or 'status' not in data or not isinstance(data.get('request_ids'), list):
+        return jsonify({"success": False, "message": "Status and a list of request_ids are required"}), 400
 
-    if result.modified_count == 0:
-        return jsonify({"success": False, "message": "Failed to update request status"}), 400
+    status = data['status']
+    if status not in REQUEST_STATUSES:
+        return jsonify({"success": False, "message": "Invalid status"}), 400
 
-    return jsonify({"success": True, "message": f"Request {status}"}), 200
+    # Larger batches are accepted when run as a background job
+    max_requests = MAX_ASYNC_BULK_REQUESTS if data.get('async') else MAX_BULK_REQUESTS
+    request_ids = list(dict.fromkeys(str(i) for i in data['request_ids']))
+    if not request_ids or len(request_ids) > max_requests:
+        return jsonify({
+            "success": False,
+            "message": f"Between 1 and {max_requests} request_ids are required"
+        }), 400
+
+    if data.get('async'):
+        job_id = job_queue.enqueue('bulk-update-request-status', {
+            "faculty_id": faculty_id, "request_ids": request_ids, "status": status
+        }, owner_id=faculty_id)
+        return jsonify({
+            "success": True,
+            "message": "Status update queued",
+            "job_id": job_id,
+            "job_url": f"/api/jobs/{job_id}"
+        }), 202
+
+    results = apply_request_status(db, faculty_id, request_ids, status)
+    updated = sum(1 for result in results.values() if result == 'updated')
+    return jsonify({
+        "success": True,
+        "message": f"{updated} request(s) {status}",
+        "status": status,
+        "updated": updated,
+        "results": [{"request_id": i, "result": results[i]} for i in request_ids]
+    }), 200
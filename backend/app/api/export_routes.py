@@ -0,0 +1,69 @@
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
+from bson import ObjectId
+from app.models.faculty import Faculty, PROFILE_PROJECTION
+from app.models.student import Student
+from app.utils.helpers import decode_cursor, parse_directory_filters
+from app.utils.json_provider import dumps_bytes
+
+export_bp = Blueprint('export', __name__)
+
+EXPORT_MODELS = {
+    'faculty': Faculty,
+    'students': Student,
+}
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+
+def _resume_after(args):
+    """Resume point from ?after=<last _id> or a directory/export ?cursor= token"""
+    after = args.get('after')
+    if not after:
+        token = decode_cursor(args.get('cursor'))
+        after = token.get('id') if token else None
+    if after is None:
+        return None
+    if not ObjectId.is_valid(after):
+        raise ValueError("Invalid cursor")
+    return ObjectId(after)
+
+
+@export_bp.route('/export/<directory>', methods=['GET'])
+@jwt_required()
+def export_directory(directory):
+    """Stream the faculty or student directory as NDJSON in _id order
+
+    Accepts the same filters as the directory listing. An interrupted export
+    resumes with ?after=<_id of the last line received>.
+    """
+    model = EXPORT_MODELS.get(directory)
+    if model is None:
+        return jsonify({"success": False, "message": "Unknown directory"}), 404
+
+    try:
+        after = _resume_after(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    try:
+        batch_size = int(request.args.get('batch_size', DEFAULT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid batch_size"}), 400
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+
+    query = model.build_query(parse_directory_filters(request.args))
+    if after is not None:
+        query['_id'] = {"$gt": after}
+
+    cursor = current_app.db.users.find(
+        query, PROFILE_PROJECTION, batch_size=batch_size
+    ).sort('_id', 1)
+
+    def generate():
+        try:
+            for document in cursor:
+                yield dumps_bytes(document) + b"\n"
+        finally:
+            cursor.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -1,57 +1,56 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.auth.utils import faculty_required
+from flask_jwt_extended import jwt_required
+from app.auth.utils import current_user_identity, faculty_required
 from bson import ObjectId
-from passlib.hash import pbkdf2_sha256
+from app.models.faculty import Faculty
+from app.models.user import PROFILE_FIELDS, PROFILE_SECTIONS, User, VersionConflictError
+from app.utils.cache import facet_response
+from app.utils.helpers import (
+    FACETS, facet_counts, parse_directory_filters, parse_fields, parse_page_args, wants_count
+)
 
 faculty_bp = Blueprint('faculty', __name__)
 
 @faculty_bp.route('/faculty', methods=['GET'])
 def get_all_faculty():
-    """Get all faculty members"""
-    db = current_app.db
-    filters = {"user_type": "faculty"}
-
-    if request.args.get('department'):
-        filters['department'] = request.args.get('department')
-
-    if request.args.get('research_interests'):
-        filters['research_interests'] = {
-            "$in": request.args.get('research_interests').split(',')
-        }
-
-    if request.args.get('search'):
-        search_term = request.args.get('search')
-        filters['$or'] = [
-            {"name": {"$regex": search_term, "$options": "i"}},
-            {"bio": {"$regex": search_term, "$options": "i"}},
-            {"research_interests": {"$regex": search_term, "$options": "i"}},
-        ]
-
-    faculty_list = list(db.users.find(filters))
-    for faculty in faculty_list:
-        faculty["_id"] = str(faculty["_id"])
-        faculty.pop("password", None)
-
-    return jsonify({
+    """Get a page of faculty members"""
+    filters = parse_directory_filters(request.args)
+    try:
+        limit, cursor = parse_page_args(request.args)
+        projection = parse_fields(request.args, PROFILE_FIELDS["faculty"])
+        faculty_list, next_cursor = Faculty.get_all_faculty(
+            filters, limit=limit, cursor=cursor, projection=projection
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    response = {
         "success": True,
         "faculty": faculty_list,
-        "count": len(faculty_list)
-    }), 200
+        "count": len(faculty_list),
+        "next_cursor": next_cursor
+    }
+    if wants_count(request.args):
+        response["total"] = Faculty.count_faculty(filters)
+
+    return jsonify(response), 200
 
 
 @faculty_bp.route('/faculty/<faculty_id>', methods=['GET'])
 def get_faculty(faculty_id):
     """Get faculty by ID"""
-    db = current_app.db
     if not ObjectId.is_valid(faculty_id):
         return jsonify({"success": False, "message": "Invalid faculty ID"}), 400
 
-    faculty = db.users.find_one({"_id": ObjectId(faculty_id), "user_type": "faculty"})
+    try:
+        projection = parse_fields(request.args, PROFILE_FIELDS["faculty"])
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    faculty = Faculty.get_faculty_by_id(faculty_id, projection)
     if not faculty:
         return jsonify({"success": False, "message": "Faculty not found"}), 404
 
-    faculty["_id"] = str(faculty["_id"])
     faculty.pop("password", None)
 
     return jsonify({
@@ -60,14 +59,41 @@ def get_faculty(faculty_id):
     }), 200
 
 
+@faculty_bp.route('/faculty/<faculty_id>/<section>', methods=['GET'])
+def get_faculty_section(faculty_id, section):
+    """Get a page of a faculty's publications or projects"""
+    if section not in PROFILE_SECTIONS:
+        return jsonify({"success": False, "message": "Unknown section"}), 404
+    if not ObjectId.is_valid(faculty_id):
+        return jsonify({"success": False, "message": "Invalid faculty ID"}), 400
+
+    try:
+        limit, cursor = parse_page_args(request.args)
+        page = User.get_profile_section(faculty_id, "faculty", section, limit, cursor)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if page is None:
+        return jsonify({"success": False, "message": "Faculty not found"}), 404
+
+    items, next_cursor, total = page
+    return jsonify({
+        "success": True,
+        section: items,
+        "count": len(items),
+        "total": total,
+        "next_cursor": next_cursor
+    }), 200
+
+
 @faculty_bp.route('/faculty/<faculty_id>', methods=['PUT'])
 @jwt_required()
 def update_faculty(faculty_id):
-    """Update faculty profile - only the faculty owner can update their profile"""
-    db = current_app.db
-    current_user = get_jwt_identity()
-    user_id = current_user.get('user_id')
-    user_type = current_user.get('user_type')
+    """Update faculty profile - only the faculty owner can update their profile
+
+    Send the profile's current "version" to have the update rejected with a
+    409 if someone else changed it first.
+    """
+    user_id, user_type = current_user_identity()
 
     if user_id != faculty_id or user_type != 'faculty':
         return jsonify({"success": False, "message": "Unauthorized"}), 403
@@ -79,22 +105,25 @@ def update_faculty(faculty_id):
     if not update_data:
         return jsonify({"success": False, "message": "No data provided"}), 400
 
-    update_data.pop('email', None)
-    update_data.pop('user_type', None)
-    if 'password' in update_data:
-        update_data['password'] = pbkdf2_sha256.hash(update_data['password'])
-
-    result = db.users.update_one(
-        {"_id": ObjectId(faculty_id), "user_type": "faculty"},
-        {"$set": update_data}
-    )
-
-    if result.modified_count == 0:
+    expected_version = update_data.pop('version', None)
+    if expected_version is not None and (isinstance(expected_version, bool) or not isinstance(expected_version, int)):
+        return jsonify({"success": False, "message": "Invalid version"}), 400
+
+    try:
+        version = Faculty.update_faculty(faculty_id, update_data, expected_version)
+    except VersionConflictError as e:
+        return jsonify({
+            "success": False,
+            "message": "Profile was changed by another request",
+            "version": e.current_version
+        }), 409
+    if version is None:
         return jsonify({"success": False, "message": "Failed to update faculty"}), 400
 
     return jsonify({
         "success": True,
-        "message": "Faculty updated successfully"
+        "message": "Faculty updated successfully",
+        "version": version
     }), 200
 
 
@@ -102,10 +131,8 @@ def update_faculty(faculty_id):
 def get_departments():
     """Get unique departments"""
     db = current_app.db
-    departments = db.users.distinct("department", {"user_type": "faculty"})
-    departments = [d for d in departments if d]
 
-    return jsonify({
-        "success": True,
-        "departments": sorted(departments)
-    }), 200
+    def compute():
+        return facet_counts(db, *FACETS["departments"])
+
+    return facet_response("departments", "departments", compute)
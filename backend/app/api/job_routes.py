@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.auth.utils import current_user_identity
+from app.utils.jobs import job_queue
+
+job_bp = Blueprint('jobs', __name__)
+
+JOB_FIELDS = ('name', 'status', 'attempts', 'max_attempts', 'result', 'error', 'last_error',
+              'created_at', 'started_at', 'finished_at')
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Poll a background job started by the current user"""
+    user_id, _ = current_user_identity()
+    job = job_queue.get(job_id)
+    if not job or job.get('owner_id') != user_id:
+        return jsonify({"success": False, "message": "Job not found"}), 404
+
+    return jsonify({
+        "success": True,
+        "job": {"id": str(job['_id']), **{field: job.get(field) for field in JOB_FIELDS}}
+    }), 200
@@ -1,56 +1,54 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.auth.utils import current_user_identity
 from bson import ObjectId
-from passlib.hash import pbkdf2_sha256
+from app.models.student import Student
+from app.models.user import PROFILE_FIELDS, PROFILE_SECTIONS, User, VersionConflictError
+from app.utils.cache import facet_response
+from app.utils.helpers import (
+    FACETS, facet_counts, parse_directory_filters, parse_fields, parse_page_args, wants_count
+)
 
 student_bp = Blueprint('student', __name__)
 
 @student_bp.route('/students', methods=['GET'])
 def get_all_students():
-    """Get all students"""
-    db = current_app.db
-    filters = {"user_type": "student"}
-
-    if request.args.get('department'):
-        filters['department'] = request.args.get('department')
-
-    if request.args.get('research_interests'):
-        filters['research_interests'] = {
-            "$in": request.args.get('research_interests').split(',')
-        }
-
-    if request.args.get('search'):
-        search_term = request.args.get('search')
-        filters['$or'] = [
-            {"name": {"$regex": search_term, "$options": "i"}},
-            {"bio": {"$regex": search_term, "$options": "i"}},
-            {"research_interests": {"$regex": search_term, "$options": "i"}},
-        ]
-
-    students = list(db.users.find(filters))
-    for student in students:
-        student["_id"] = str(student["_id"])
-        student.pop("password", None)
-
-    return jsonify({
+    """Get a page of students"""
+    filters = parse_directory_filters(request.args)
+    try:
+        limit, cursor = parse_page_args(request.args)
+        projection = parse_fields(request.args, PROFILE_FIELDS["student"])
+        students, next_cursor = Student.get_all_students(filters, limit=limit, cursor=cursor, projection=projection)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    response = {
         "success": True,
         "students": students,
-        "count": len(students)
-    }), 200
+        "count": len(students),
+        "next_cursor": next_cursor
+    }
+    if wants_count(request.args):
+        response["total"] = Student.count_students(filters)
+
+    return jsonify(response), 200
 
 
 @student_bp.route('/students/<student_id>', methods=['GET'])
 def get_student(student_id):
     """Get student by ID"""
-    db = current_app.db
     if not ObjectId.is_valid(student_id):
         return jsonify({"success": False, "message": "Invalid student ID"}), 400
 
-    student = db.users.find_one({"_id": ObjectId(student_id), "user_type": "student"})
+    try:
+        projection = parse_fields(request.args, PROFILE_FIELDS["student"])
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    student = Student.get_student_by_id(student_id, projection)
     if not student:
         return jsonify({"success": False, "message": "Student not found"}), 404
 
-    student["_id"] = str(student["_id"])
     student.pop("password", None)
 
     return jsonify({
@@ -59,14 +57,41 @@ def get_student(student_id):
     }), 200
 
 
+@student_bp.route('/students/<student_id>/<section>', methods=['GET'])
+def get_student_section(student_id, section):
+    """Get a page of a student's publications or projects"""
+    if section not in PROFILE_SECTIONS:
+        return jsonify({"success": False, "message": "Unknown section"}), 404
+    if not ObjectId.is_valid(student_id):
+        return jsonify({"success": False, "message": "Invalid student ID"}), 400
+
+    try:
+        limit, cursor = parse_page_args(request.args)
+        page = User.get_profile_section(student_id, "student", section, limit, cursor)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if page is None:
+        return jsonify({"success": False, "message": "Student not found"}), 404
+
+    items, next_cursor, total = page
+    return jsonify({
+        "success": True,
+        section: items,
+        "count": len(items),
+        "total": total,
+        "next_cursor": next_cursor
+    }), 200
+
+
 @student_bp.route('/students/<student_id>', methods=['PUT'])
 @jwt_required()
 def update_student(student_id):
-    """Update student profile - only the student owner can update their profile"""
-    db = current_app.db
-    current_user = get_jwt_identity()
-    user_id = current_user.get('user_id')
-    user_type = current_user.get('user_type')
+    """Update student profile - only the student owner can update their profile
+
+    Send the profile's current "version" to have the update rejected with a
+    409 if someone else changed it first.
+    """
+    user_id, user_type = current_user_identity()
 
     if user_id != student_id or user_type != 'student':
         return jsonify({"success": False, "message": "Unauthorized"}), 403
@@ -78,22 +103,25 @@ def update_student(student_id):
     if not update_data:
         return jsonify({"success": False, "message": "No data provided"}), 400
 
-    update_data.pop('email', None)
-    update_data.pop('user_type', None)
-    if 'password' in update_data:
-        update_data['password'] = pbkdf2_sha256.hash(update_data['password'])
-
-    result = db.users.update_one(
-        {"_id": ObjectId(student_id), "user_type": "student"},
-        {"$set": update_data}
-    )
-
-    if result.modified_count == 0:
+    expected_version = update_data.pop('version', None)
+    if expected_version is not None and (isinstance(expected_version, bool) or not isinstance(expected_version, int)):
+        return jsonify({"success": False, "message": "Invalid version"}), 400
+
+    try:
+        version = Student.update_student(student_id, update_data, expected_version)
+    except VersionConflictError as e:
+        return jsonify({
+            "success": False,
+            "message": "Profile was changed by another request",
+            "version": e.current_version
+        }), 409
+    if version is None:
         return jsonify({"success": False, "message": "Failed to update student"}), 400
 
     return jsonify({
         "success": True,
-        "message": "Student updated successfully"
+        "message": "Student updated successfully",
+        "version": version
     }), 200
 
 
@@ -101,13 +129,11 @@ def update_student(student_id):
 def get_programs():
     """Get unique programs"""
     db = current_app.db
-    programs = db.users.distinct("program", {"user_type": "student"})
-    programs = [p for p in programs if p]
 
-    return jsonify({
-        "success": True,
-        "programs": sorted(programs)
-    }), 200
+    def compute():
+        return facet_counts(db, *FACETS["programs"])
+
+    return facet_response("programs", "programs", compute)
 
 
 @student_bp.route('/research-interests', methods=['GET'])
@@ -115,13 +141,7 @@ def get_research_interests():
     """Get unique research interests from all users"""
     db = current_app.db
 
-    student_interests = db.users.distinct("research_interests", {"user_type": "student"})
-    faculty_interests = db.users.distinct("research_interests", {"user_type": "faculty"})
+    def compute():
+        return facet_counts(db, *FACETS["research_interests"])
 
-    all_interests = set(student_interests + faculty_interests)
-    all_interests = [i for i in all_interests if i]
-
-    return jsonify({
-        "success": True,
-        "research_interests": sorted(all_interests)
-    }), 200
+    return facet_response("research_interests", "research_interests", compute)
@@ -0,0 +1,202 @@
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from bson import ObjectId
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import ExpiredSignatureError, InvalidTokenError
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map, Rule
+from app import create_app
+from app.config import Config
+from app.models.user import PROFILE_FIELDS
+from app.repository import AsyncUserRepository
+from app.utils.cache import facet_body, facet_cache
+from app.utils.helpers import FACETS, parse_directory_filters, parse_fields, parse_page_args, wants_count
+from app.utils.json_provider import dumps_bytes
+from app.utils.mongo import client_options
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:  # PyMongo < 4.10
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+
+# Read-heavy routes served natively on the event loop. Everything else,
+# including writes and password hashing, is forwarded to the Flask app.
+ASYNC_ROUTES = Map([
+    Rule('/api/faculty', endpoint='faculty_list', methods=['GET']),
+    Rule('/api/faculty/<user_id>', endpoint='faculty_detail', methods=['GET']),
+    Rule('/api/students', endpoint='student_list', methods=['GET']),
+    Rule('/api/students/<user_id>', endpoint='student_detail', methods=['GET']),
+    Rule('/api/departments', endpoint='facet', methods=['GET'], defaults={'key': 'departments'}),
+    Rule('/api/programs', endpoint='facet', methods=['GET'], defaults={'key': 'programs'}),
+    Rule('/api/research-interests', endpoint='facet', methods=['GET'],
+         defaults={'key': 'research_interests'}),
+    Rule('/api/auth/me', endpoint='me', methods=['GET']),
+])
+
+
+class AsyncRequest:
+    """The parts of an ASGI request the async handlers need"""
+
+    def __init__(self, scope):
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+
+
+class AsyncApp:
+    """ASGI application serving the Flask API with async Mongo reads"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.client = None
+        self.repository = None
+
+    def _connect(self):
+        config = self.flask_app.config
+        self.client = AsyncMongoClient(
+            config.get("MONGO_URI") or "mongodb://localhost:27017/", **client_options(config)
+        )
+        self.repository = AsyncUserRepository(
+            self.client[config.get("MONGO_DBNAME") or "yourdbname"]
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.wsgi(scope, receive, send)
+
+        adapter = ASYNC_ROUTES.bind('', path_info=scope['path'])
+        try:
+            endpoint, params = adapter.match(method=scope['method'])
+        except HTTPException:
+            return await self.wsgi(scope, receive, send)
+
+        if self.repository is None:
+            self._connect()
+        handler = getattr(self, f"handle_{endpoint}")
+        status, body, headers = await handler(AsyncRequest(scope), **params)
+        await self._respond(send, status, body, headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._connect()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.client is not None:
+                    close = self.client.close()
+                    if close is not None:
+                        await close
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _respond(self, send, status, body, headers=None):
+        payload = b'' if body is None else dumps_bytes(body) + b"\n"
+        raw_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+        ]
+        raw_headers.extend(
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in (headers or {}).items()
+        )
+        await send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _list(self, request, user_type, name):
+        filters = parse_directory_filters(request.args)
+        try:
+            limit, cursor = parse_page_args(request.args)
+            projection = parse_fields(request.args, PROFILE_FIELDS[user_type])
+            users, next_cursor = await self.repository.list_users(user_type, filters, limit, cursor, projection)
+        except ValueError as e:
+            return 400, {"success": False, "message": str(e)}, None
+
+        body = {"success": True, name: users, "count": len(users), "next_cursor": next_cursor}
+        if wants_count(request.args):
+            body["total"] = await self.repository.count_users(user_type, filters)
+        return 200, body, None
+
+    async def _detail(self, request, user_type, name, user_id):
+        if not ObjectId.is_valid(user_id):
+            return 400, {"success": False, "message": f"Invalid {user_type} ID"}, None
+        try:
+            projection = parse_fields(request.args, PROFILE_FIELDS[user_type])
+        except ValueError as e:
+            return 400, {"success": False, "message": str(e)}, None
+        user = await self.repository.get_user(user_type, user_id, projection)
+        if user is None:
+            return 404, {"success": False, "message": f"{user_type.capitalize()} not found"}, None
+        return 200, {"success": True, name: user}, None
+
+    async def handle_faculty_list(self, request):
+        return await self._list(request, 'faculty', 'faculty')
+
+    async def handle_student_list(self, request):
+        return await self._list(request, 'student', 'students')
+
+    async def handle_faculty_detail(self, request, user_id):
+        return await self._detail(request, 'faculty', 'faculty', user_id)
+
+    async def handle_student_detail(self, request, user_id):
+        return await self._detail(request, 'student', 'student', user_id)
+
+    async def handle_facet(self, request, key):
+        counts, etag, generation = facet_cache.lookup(key)
+        if counts is None:
+            counts = await self.repository.facet_counts(*FACETS[key])
+            etag = facet_cache.store(key, counts, generation)
+
+        with_counts = request.args.get('counts', '').lower() in ('1', 'true', 'yes')
+        body, etag = facet_body(key, counts, etag, with_counts)
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': f"public, max-age={facet_cache.max_age}",
+        }
+        if f'"{etag}"' in request.headers.get('if-none-match', ''):
+            return 304, None, headers
+        return 200, body, headers
+
+    async def handle_me(self, request):
+        auth_header = request.headers.get('authorization', '')
+        if not auth_header.startswith('Bearer '):
+            reason = "Missing Authorization Header"
+            return 401, {"msg": "Missing token", "reason": reason}, None
+        # Same statuses and bodies as the JWTManager callbacks in create_app
+        try:
+            with self.flask_app.app_context():
+                claims = decode_token(auth_header[len('Bearer '):])
+        except ExpiredSignatureError:
+            return 401, {"msg": "Token has expired"}, None
+        except (InvalidTokenError, JWTExtendedException) as e:
+            return 422, {"msg": "Invalid token", "reason": str(e)}, None
+        if claims.get('type') != 'access':
+            reason = "Only non-refresh tokens are allowed"
+            return 422, {"msg": "Invalid token", "reason": reason}, None
+
+        user_type = claims.get('user_type')
+        if not claims.get('sub') or not user_type:
+            return 422, {"success": False, "message": "Invalid token content"}, None
+
+        user_type = 'student' if user_type == 'student' else 'faculty'
+        try:
+            projection = parse_fields(request.args, PROFILE_FIELDS[user_type])
+        except ValueError as e:
+            return 400, {"success": False, "message": str(e)}, None
+        user = await self.repository.get_user(user_type, claims['sub'], projection)
+        if not user:
+            return 404, {"success": False, "message": "User not found"}, None
+        return 200, {"success": True, "user": user}, None
+
+
+def create_asgi_app(config_class=Config):
+    """Build the ASGI app, e.g. `uvicorn --factory app.asgi:create_asgi_app`"""
+    return AsyncApp(create_app(config_class))
@@ -0,0 +1,169 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import jsonify, request
+from app.models.user import User
+
+
+class AdmissionRejected(Exception):
+    """Raised when a CPU-heavy auth request is turned away"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """Token buckets keyed by client, refilled continuously, bounded in number
+
+    The least recently used buckets are dropped first; a dropped bucket
+    comes back full, so only idle clients are forgotten.
+    """
+
+    def __init__(self, burst, per_minute, max_keys):
+        if burst < 1 or per_minute <= 0:
+            raise ValueError("Token buckets need a burst of at least 1 and a positive rate, "
+                             f"got burst={burst} per_minute={per_minute}")
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _refill(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def wait_time(self, key, now):
+        """Seconds until key may spend a token; 0 when it can spend one now"""
+        tokens = self._refill(key, now)
+        if tokens >= 1:
+            return 0.0
+        return (1 - tokens) / self.rate
+
+    def take(self, key, now):
+        self._buckets[key] = (self._refill(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+
+class AdmissionController:
+    """Limits login and registration before they reach PBKDF2
+
+    Each request spends a token from its client IP's bucket and, when it
+    names one, from its email's bucket, and holds one of a fixed number of
+    concurrency slots while it runs. Anything over a limit gets a fast 429.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_concurrent = 0
+        self.ip_buckets = None
+        self.email_buckets = None
+        self.in_flight = 0
+        self.outcomes = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('AUTH_ADMISSION_ENABLED', True)
+        self.max_concurrent = app.config.get('AUTH_MAX_CONCURRENT', (os.cpu_count() or 1) * 2)
+        max_keys = app.config.get('AUTH_BUCKET_MAX_KEYS', 100000)
+        self.ip_buckets = TokenBuckets(
+            app.config.get('AUTH_IP_BURST', 20), app.config.get('AUTH_IP_PER_MINUTE', 60), max_keys
+        )
+        self.email_buckets = TokenBuckets(
+            app.config.get('AUTH_EMAIL_BURST', 5), app.config.get('AUTH_EMAIL_PER_MINUTE', 10), max_keys
+        )
+        app.register_error_handler(AdmissionRejected, self._rejected_response)
+
+    def _rejected_response(self, error):
+        response = jsonify({"success": False, "message": "Too many requests, please retry later"})
+        response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+        return response, 429
+
+    def _count(self, outcome):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def acquire(self, ip, email=None):
+        """Admit a request or raise AdmissionRejected; pair with release()"""
+        now = time.monotonic()
+        with self._lock:
+            if self.max_concurrent and self.in_flight >= self.max_concurrent:
+                self._count('concurrency')
+                raise AdmissionRejected('concurrency', 1)
+            # Check both buckets before spending from either
+            ip_wait = self.ip_buckets.wait_time(ip, now)
+            if ip_wait:
+                self._count('ip')
+                raise AdmissionRejected('ip', ip_wait)
+            if email:
+                email_wait = self.email_buckets.wait_time(email, now)
+                if email_wait:
+                    self._count('email')
+                    raise AdmissionRejected('email', email_wait)
+                self.email_buckets.take(email, now)
+            self.ip_buckets.take(ip, now)
+            self.in_flight += 1
+            self._count('admitted')
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "tracked_ips": len(self.ip_buckets) if self.ip_buckets is not None else 0,
+                "tracked_emails": len(self.email_buckets) if self.email_buckets is not None else 0,
+                "outcomes": dict(self.outcomes),
+            }
+
+    def collect_metrics(self):
+        """Admission state in the shape expected by Metrics.add_collector"""
+        stats = self.stats()
+        return [
+            ("auth_admission_requests_total", "counter",
+             "Auth requests by admission outcome (admitted, ip, email, concurrency)",
+             [({"outcome": outcome}, count) for outcome, count in stats["outcomes"].items()]),
+            ("auth_admission_in_flight", "gauge", "Admitted auth requests currently running",
+             [({}, stats["in_flight"])]),
+            ("auth_admission_max_concurrent", "gauge", "Configured auth concurrency cap",
+             [({}, stats["max_concurrent"])]),
+            ("auth_admission_tracked_ips", "gauge", "Client IPs with a token bucket",
+             [({}, stats["tracked_ips"])]),
+            ("auth_admission_tracked_emails", "gauge", "Emails with a token bucket",
+             [({}, stats["tracked_emails"])]),
+        ]
+
+
+admission_controller = AdmissionController()
+
+
+def admission_controlled(fn):
+    """Run fn only once the admission controller admits the request"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not admission_controller.enabled:
+            return fn(*args, **kwargs)
+        data = request.get_json(silent=True)
+        email = data.get('email') if isinstance(data, dict) else None
+        admission_controller.acquire(
+            request.remote_addr or 'unknown',
+            User.normalize_email(email) if isinstance(email, str) and email else None
+        )
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            admission_controller.release()
+    return wrapper
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import jsonify
+from passlib.hash import pbkdf2_sha256
+
+
+class HashingBusyError(Exception):
+    """Raised when too many hashing jobs are waiting or one outlives its timeout"""
+
+
+def _hash(password, rounds):
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def _verify_and_update(password, password_hash, rounds):
+    if not pbkdf2_sha256.verify(password, password_hash):
+        return False, None
+    if pbkdf2_sha256.using(rounds=rounds).needs_update(password_hash):
+        return True, _hash(password, rounds)
+    return True, None
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class PasswordHasher:
+    """Runs PBKDF2 in a bounded process pool so request threads stay free"""
+
+    def __init__(self, app=None):
+        self.rounds = pbkdf2_sha256.default_rounds
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self.retry_after = 1
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._timings = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('PASSWORD_HASH_ROUNDS') or pbkdf2_sha256.default_rounds
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', 64)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT')
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        self._slots = threading.BoundedSemaphore(self.max_pending) if self.max_pending else None
+        app.register_error_handler(HashingBusyError, self._busy_response)
+
+    def _busy_response(self, error):
+        response = jsonify({"success": False, "message": "Server busy, please retry"})
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response, 503
+
+    def _get_executor(self):
+        # A pool inherited across fork() is unusable, so each process owns one.
+        # Its workers must not be forked from a threaded server either: they
+        # would inherit locks held by other threads, and the Mongo client.
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=_pool_context()
+                    )
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    def _run(self, operation, fn, *args):
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            self._record(operation, None)
+            raise HashingBusyError()
+        started = time.perf_counter()
+        release = self._slots is not None
+        try:
+            if self.workers:
+                future = self._get_executor().submit(fn, *args)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    # The pool is saturated; shed load the same way as a full queue.
+                    # A running hash cannot be cancelled, so its slot stays taken
+                    # until the pool is really done with it.
+                    if not future.cancel() and release:
+                        future.add_done_callback(lambda _: self._slots.release())
+                        release = False
+                    self._record(operation, None)
+                    raise HashingBusyError()
+            else:
+                result = fn(*args)
+        finally:
+            if release:
+                self._slots.release()
+        self._record(operation, time.perf_counter() - started)
+        return result
+
+    def _record(self, operation, elapsed):
+        with self._lock:
+            stats = self._timings.setdefault(
+                operation, {"count": 0, "rejected": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            if elapsed is None:
+                stats["rejected"] += 1
+                return
+            stats["count"] += 1
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def hash(self, password):
+        """Hash a password with the configured number of rounds"""
+        return self._run('hash', _hash, password, self.rounds)
+
+    def verify_and_update(self, password, password_hash):
+        """Verify a password, returning (valid, new_hash) when the cost has changed"""
+        return self._run('verify', _verify_and_update, password, password_hash, self.rounds)
+
+    def verify(self, password, password_hash):
+        """Verify a password against a stored hash"""
+        return self.verify_and_update(password, password_hash)[0]
+
+    def stats(self):
+        """Per-operation timing counters"""
+        with self._lock:
+            return {op: dict(values) for op, values in self._timings.items()}
+
+    def collect_metrics(self):
+        """Hashing timings in the shape expected by Metrics.add_collector"""
+        stats = self.stats()
+        return [
+            ("password_hash_operations_total", "counter", "Completed hashing operations",
+             [({"operation": op}, values["count"]) for op, values in stats.items()]),
+            ("password_hash_rejected_total", "counter", "Hashing operations rejected as busy or timed out",
+             [({"operation": op}, values["rejected"]) for op, values in stats.items()]),
+            ("password_hash_seconds_total", "counter", "Time spent hashing, including queueing",
+             [({"operation": op}, values["total_seconds"]) for op, values in stats.items()]),
+            ("password_hash_seconds_max", "gauge", "Slowest hashing operation",
+             [({"operation": op}, values["max_seconds"]) for op, values in stats.items()]),
+        ]
+
+
+password_hasher = PasswordHasher()
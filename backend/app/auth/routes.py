@@ -167,18 +167,24 @@
 #         "success": True,
 #         "user": user
 #     }), 200
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.models.student import Student
 from app.models.faculty import Faculty
+from app.models.user import PROFILE_FIELDS, User
 from app.auth.utils import validate_registration_data
+from app.utils.helpers import parse_fields
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, get_jwt, jwt_required, get_jwt_identity
 )
-from passlib.hash import pbkdf2_sha256
+from app.auth.admission import admission_controlled
+from app.auth.hashing import password_hasher
 
 auth = Blueprint('auth', __name__)
 
 @auth.route('/register/student', methods=['POST'])
+@admission_controlled
 def register_student():
     """Register a new student"""
     data = request.get_json()
@@ -186,11 +192,17 @@ def register_student():
     if errors:
         return jsonify({"success": False, "errors": errors}), 400
     
-    access_token = create_access_token(identity=data.email, additional_claims={
-        "email": data.email,
-        "user_type": data.user_type
+    try:
+        student_id = Student.create_student(data)
+    except DuplicateKeyError as e:
+        if not User.is_duplicate_email(e):
+            raise
+        return jsonify({"success": False, "errors": {"email": User.DUPLICATE_EMAIL_ERROR}}), 400
+
+    access_token = create_access_token(identity=student_id, additional_claims={
+        "email": User.normalize_email(data['email']),
+        "user_type": "student"
     })
-    student_id = Student.create_student(data)
     return jsonify({
         "success": True,
         "message": "Student registered successfully", 
@@ -199,6 +211,7 @@ def register_student():
     }), 201
 
 @auth.route('/register/faculty', methods=['POST'])
+@admission_controlled
 def register_faculty():
     """Register a new faculty member"""
     data = request.get_json()
@@ -206,13 +219,17 @@ def register_faculty():
     if errors:
         return jsonify({"success": False, "errors": errors}), 400
     
-    access_token = create_access_token(identity=data.email, additional_claims={
-        "email": data.email,
-        "user_type": data.user_type
-        
+    try:
+        faculty_id = Faculty.create_faculty(data)
+    except DuplicateKeyError as e:
+        if not User.is_duplicate_email(e):
+            raise
+        return jsonify({"success": False, "errors": {"email": User.DUPLICATE_EMAIL_ERROR}}), 400
+
+    access_token = create_access_token(identity=faculty_id, additional_claims={
+        "email": User.normalize_email(data['email']),
+        "user_type": "faculty"
     })
-    
-    faculty_id = Faculty.create_faculty(data)
     return jsonify({
         "success": True,
         "message": "Faculty registered successfully", 
@@ -222,27 +239,31 @@ def register_faculty():
 
 
 @auth.route('/login', methods=['POST'])
+@admission_controlled
 def login():
     data = request.get_json()
 
     if not data or 'email' not in data or 'password' not in data:
         return jsonify({"success": False, "message": "Email and password required"}), 400
 
-    email = data['email'].lower()
+    email = data['email']
     password = data['password']
 
-    student = Student.get_student_by_email(email)
-    faculty = Faculty.get_faculty_by_email(email)
-
-    user = student or faculty
-
+    user = User.get_user_by_email(email)
     if not user:
         return jsonify({"success": False, "message": "Invalid email or password"}), 401
 
-    if not pbkdf2_sha256.verify(password, user['password']):
+    valid, new_hash = password_hasher.verify_and_update(password, user['password'])
+    if not valid:
         return jsonify({"success": False, "message": "Invalid email or password"}), 401
 
     user_id = str(user["_id"])
+    if new_hash:
+        # The configured hashing cost changed since this password was stored
+        current_app.db.users.update_one(
+            {"_id": ObjectId(user_id), "password": user['password']},
+            {"$set": {"password": new_hash}}
+        )
 
     # 🚀 FLAT DICT — DO NOT WRAP IN "sub"
     access_token = create_access_token(identity=user_id, additional_claims={
@@ -287,16 +308,18 @@ def get_user_profile():
     claims = get_jwt()
     user_type = claims.get('user_type')
 
-    print('DEBUG: current_user_id =', current_user_id)
-    print('DEBUG: user_type =', user_type)
-
     if not current_user_id or not user_type:
         return jsonify({"success": False, "message": "Invalid token content"}), 422
 
+    try:
+        projection = parse_fields(request.args, PROFILE_FIELDS.get(user_type, PROFILE_FIELDS['faculty']))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     if user_type == 'student':
-        user = Student.get_student_by_id(current_user_id)
+        user = Student.get_student_by_id(current_user_id, projection)
     else:
-        user = Faculty.get_faculty_by_id(current_user_id)
+        user = Faculty.get_faculty_by_id(current_user_id, projection)
 
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
@@ -1,8 +1,7 @@
 from functools import wraps
 from flask import request, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.models.student import Student
-from app.models.faculty import Faculty
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from app.models.user import User
 import re
 from email_validator import validate_email, EmailNotValidError
 
@@ -22,10 +21,8 @@ def faculty_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        identity = get_jwt_identity()
-        
         # Check if user is faculty
-        if identity.get('user_type') != 'faculty':
+        if current_user_identity()[1] != 'faculty':
             return jsonify({"msg": "Faculty access required"}), 403
         return fn(*args, **kwargs)
     return wrapper
@@ -34,14 +31,23 @@ def student_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        identity = get_jwt_identity()
-        
         # Check if user is student
-        if identity.get('user_type') != 'student':
+        if current_user_identity()[1] != 'student':
             return jsonify({"msg": "Student access required"}), 403
         return fn(*args, **kwargs)
     return wrapper
 
+def current_user_identity():
+    """Return (user_id, user_type) for the request's token
+
+    Tokens carry the user ID as their identity and the user type as a claim;
+    older tokens carried a {"user_id", "user_type"} identity instead.
+    """
+    identity = get_jwt_identity()
+    if isinstance(identity, dict):
+        return identity.get('user_id'), identity.get('user_type')
+    return identity, get_jwt().get('user_type')
+
 def validate_registration_data(data, user_type):
     """Validate registration data"""
     errors = {}
@@ -61,13 +67,11 @@ def validate_registration_data(data, user_type):
         except EmailNotValidError:
             errors['email'] = "Invalid email format"
     
-    # Check if email already exists
+    # Check if email already exists; the unique index on users.email
+    # still rejects a duplicate that races past this check
     if 'email' in data and data['email'] and 'email' not in errors:
-        student = Student.get_student_by_email(data['email'])
-        faculty = Faculty.get_faculty_by_email(data['email'])
-        
-        if student or faculty:
-            errors['email'] = "Email already registered"
+        if User.email_exists(data['email']):
+            errors['email'] = User.DUPLICATE_EMAIL_ERROR
     
     # Password requirements
     if 'password' in data and data['password']:
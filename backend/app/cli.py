@@ -0,0 +1,71 @@
+import click
+from app.utils.indexes import IndexVerificationError, ensure_indexes, verify_query_plans
+
+
+def register_commands(app):
+    """Register the maintenance commands available through `flask <command>`"""
+
+    @app.cli.command('create-indexes')
+    def create_indexes_command():
+        """Create every index in the index registry"""
+        for collection, names in ensure_indexes(app.db).items():
+            click.echo(f"{collection}: {', '.join(names)}")
+
+    @app.cli.command('verify-indexes')
+    def verify_indexes_command():
+        """Explain every known query shape and fail on a collection scan"""
+        try:
+            checked = verify_query_plans(app.db)
+        except IndexVerificationError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"All {checked} query shapes use an index")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Recompute directory search terms for every user"""
+        from app.utils.search import rebuild_index
+        click.echo(f"Reindexed {rebuild_index(app.db)} users")
+
+    @app.cli.command('rebuild-similarity-index')
+    def rebuild_similarity_index_command():
+        """Recompute the MinHash signatures and LSH bands of every profile"""
+        from app.utils.similarity import rebuild_similarity_index
+        click.echo(f"Reindexed {rebuild_similarity_index(app.db)} users")
+
+    @app.cli.command('recompute-matches')
+    @click.option('--top', default=20, show_default=True, help="Matches stored per user")
+    def recompute_matches_command(top):
+        """Score every user against every candidate and store their top matches"""
+        from app.utils.matching import MATCHES_COLLECTION, recompute_matches
+        click.echo(f"Stored matches for {recompute_matches(app.db, k=top)} users in {MATCHES_COLLECTION}")
+
+    @app.cli.command('run-jobs')
+    @click.option('--workers', default=2, show_default=True, help="Worker threads")
+    def run_jobs_command(workers):
+        """Run background job workers in the foreground until interrupted"""
+        import threading
+        from app.utils.jobs import job_queue
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=job_queue.work, kwargs={"stop": stop}, daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        click.echo(f"Running {workers} job workers for: {', '.join(job_queue.task_names)}")
+        try:
+            while any(thread.is_alive() for thread in threads):
+                stop.wait(1)
+        except KeyboardInterrupt:
+            stop.set()
+
+    @app.cli.command('enqueue-job')
+    @click.argument('name')
+    def enqueue_job_command(name):
+        """Queue a background job, e.g. recompute-matches or refresh-facets"""
+        from app.utils.jobs import job_queue
+        try:
+            job_id = job_queue.enqueue(name, dedupe=True)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Queued {name} as job {job_id}")
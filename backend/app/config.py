@@ -9,6 +9,20 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') 
     MONGO_URI = os.environ.get('MONGO_URI')
     MONGO_DBNAME = os.environ.get('MONGO_DBNAME') 
+
+    # Connection pool; the client is created lazily in each worker process
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 300000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 10000))
+    # Wire compression trades CPU for bandwidth; enable it (e.g. 'zstd,zlib')
+    # only where the link to mongod is the bottleneck
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS')
+
+    MONGO_ENSURE_INDEXES = os.environ.get('MONGO_ENSURE_INDEXES', 'false').lower() == 'true'
+    MONGO_VERIFY_INDEXES = os.environ.get('MONGO_VERIFY_INDEXES', 'false').lower() == 'true'
     
     # ✅ Add these lines:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
@@ -18,3 +32,46 @@ class Config:
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
     JWT_ALGORITHM = 'HS256'
+
+    # Password hashing runs in a process pool; 0 workers hashes inline
+    PASSWORD_HASH_ROUNDS = int(os.environ.get('PASSWORD_HASH_ROUNDS', 29000))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = 30
+
+    # Admission control for login and registration; excess requests get a 429
+    AUTH_ADMISSION_ENABLED = os.environ.get('AUTH_ADMISSION_ENABLED', 'true').lower() == 'true'
+    AUTH_MAX_CONCURRENT = int(os.environ.get('AUTH_MAX_CONCURRENT', (os.cpu_count() or 1) * 2))
+    AUTH_IP_BURST = int(os.environ.get('AUTH_IP_BURST', 20))
+    AUTH_IP_PER_MINUTE = int(os.environ.get('AUTH_IP_PER_MINUTE', 60))
+    AUTH_EMAIL_BURST = int(os.environ.get('AUTH_EMAIL_BURST', 5))
+    AUTH_EMAIL_PER_MINUTE = int(os.environ.get('AUTH_EMAIL_PER_MINUTE', 10))
+
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted;
+    # with 0 the per-IP limits key on the socket peer
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+
+    FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 300))
+    FACET_CACHE_MAX_AGE = int(os.environ.get('FACET_CACHE_MAX_AGE', 60))
+
+    # Profiles cached per process; 0 disables the cache
+    PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', 10000))
+    PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', 60))
+
+    # Seconds before the in-memory match scoring matrix is rebuilt
+    MATCH_SCORER_TTL = int(os.environ.get('MATCH_SCORER_TTL', 300))
+
+    # Background job workers per process; 0 leaves jobs to `flask run-jobs`
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_POLL_INTERVAL = 1.0
+
+    # Cross-worker cache invalidation through a capped collection
+    CACHE_BUS_ENABLED = os.environ.get('CACHE_BUS_ENABLED', 'true').lower() == 'true'
+    CACHE_BUS_COLLECTION = 'cache_invalidations'
+    CACHE_BUS_SIZE = 1024 * 1024
+
+    # Requests slower than this are logged with their Mongo command breakdown
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 0)) or None
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
@@ -1,6 +1,12 @@
 from flask import current_app
 from bson import ObjectId
 from datetime import datetime
+from app.utils.matching import match_scorer, stored_top_matches
+from app.utils.search import INDEX_PROJECTION
+from app.utils.similarity import similar_users
+
+MATCH_PROJECTION = {"password": 0, **INDEX_PROJECTION}
+MATCH_METHODS = ("interests", "text")
 
 class Collaboration:
     """Collaboration model for MongoDB using pymongo"""
@@ -41,8 +47,6 @@ class Collaboration:
             return []
 
         requests = list(db.collaboration_requests.find({"student_id": student_id}))
-        for request in requests:
-            request["_id"] = str(request["_id"])
         return requests
 
     @staticmethod
@@ -53,8 +57,6 @@ class Collaboration:
             return []
 
         requests = list(db.collaboration_requests.find({"faculty_id": faculty_id}))
-        for request in requests:
-            request["_id"] = str(request["_id"])
         return requests
 
     @staticmethod
@@ -71,32 +73,65 @@ class Collaboration:
         return result.modified_count > 0
 
     @staticmethod
-    def find_matches(user_id, user_type):
-        """Find matches for a user based on research interests"""
+    def find_matches(user_id, user_type, limit=20, offset=0, method="interests", projection=None):
+        """Find the top matches for a user
+
+        method="interests" ranks by IDF-weighted similarity of research
+        interests; method="text" ranks by MinHash similarity of bio,
+        publications, projects and interests. A projection limits the
+        profile fields returned for each match.
+        """
         db = current_app.db
-        if not ObjectId.is_valid(user_id):
+        if not ObjectId.is_valid(user_id) or method not in MATCH_METHODS:
             return []
 
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "research_interests" not in user:
+        user = db.users.find_one({"_id": ObjectId(user_id)}, {"research_interests": 1})
+        if not user:
             return []
-
-        research_interests = user.get("research_interests", [])
-        if not research_interests:
+        research_interests = user.get("research_interests") or []
+
+        match_type = "faculty" if user_type == "student" else "student"
+        if method == "text":
+            top = [
+                (candidate_id, score, None)
+                for candidate_id, score in similar_users(db, user["_id"], match_type, limit, offset)
+            ]
+        elif research_interests:
+            # Lists stored by recompute_matches answer the first pages without
+            # scoring while they are no older than the live scorer may be
+            top = stored_top_matches(db, user["_id"], user_type, limit, offset, max_age=match_scorer.ttl)
+            if top is None:
+                top = match_scorer.get(db).top_matches(
+                    user["_id"], research_interests, match_type, limit=limit, offset=offset
+                )
+        else:
+            return []
+        if not top:
             return []
 
-        match_query = {
-            "user_type": "faculty" if user_type == "student" else "student",
-            "research_interests": {"$in": research_interests}
+        # Common interests are recomputed from the candidates' current
+        # interests, even when the client did not select them: stored lists
+        # and the scorer may predate the candidate's last edit
+        fetch = MATCH_PROJECTION if projection is None else {**projection, "research_interests": 1}
+        documents = {
+            doc["_id"]: doc
+            for doc in db.users.find(
+                {"_id": {"$in": [candidate_id for candidate_id, _, _ in top]}}, fetch
+            )
         }
 
-        matches = list(db.users.find(match_query))
-        for match in matches:
-            match["_id"] = str(match["_id"])
-            match_interests = set(match.get("research_interests", []))
-            common_interests = match_interests.intersection(set(research_interests))
-            match["match_score"] = len(common_interests)
-            match["common_interests"] = list(common_interests)
-
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
+        matches = []
+        for candidate_id, score, _ in top:
+            match = documents.get(candidate_id)
+            if not match:
+                continue
+            interests = sorted(set(research_interests) & set(match.get("research_interests") or []))
+            if method == "interests" and not interests:
+                # The candidate dropped every interest they shared with this user
+                continue
+            if projection is not None and "research_interests" not in projection:
+                match.pop("research_interests", None)
+            match["match_score"] = round(score, 4)
+            match["common_interests"] = interests
+            matches.append(match)
         return matches
@@ -1,7 +1,21 @@
 from flask import current_app
 from bson import ObjectId
 from datetime import datetime
-from passlib.hash import pbkdf2_sha256
+from app.auth.hashing import password_hasher
+from app.models.user import User
+from app.utils.cache import invalidate_facets, profile_cache
+from app.utils.helpers import DEFAULT_PAGE_SIZE, paginate
+from app.utils.search import INDEX_PROJECTION, SearchQuery, index_terms
+from app.utils.similarity import similarity_fields
+
+PROFILE_PROJECTION = {"password": 0, **INDEX_PROJECTION}
+# Directory cards, with the bio the client shows and searches; publications,
+# projects and the other heavy sections are only read on the profile page
+# and through the section endpoints
+SUMMARY_PROJECTION = {
+    "name": 1, "user_type": 1, "department": 1, "position": 1,
+    "research_interests": 1, "bio": 1, "profile_image": 1, "availability": 1,
+}
 
 class Faculty:
     """Faculty model for MongoDB using pymongo"""
@@ -10,9 +24,10 @@ class Faculty:
     def create_faculty(user_data):
         """Create a new faculty document"""
         db = current_app.db
+        now = datetime.utcnow()
         faculty = {
-            "email": user_data.get('email').lower(),
-            "password": pbkdf2_sha256.hash(user_data.get('password')),
+            "email": User.normalize_email(user_data.get('email')),
+            "password": password_hasher.hash(user_data.get('password')),
             "name": user_data.get('name'),
             "user_type": "faculty",
             "profile_image": user_data.get('profile_image', ''),
@@ -26,37 +41,53 @@ class Faculty:
             "availability": user_data.get('availability', ''),
             "contact_info": user_data.get('contact_info', {}),
             "office_hours": user_data.get('office_hours', ''),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "version": 1,
+            "created_at": now,
+            "updated_at": now
         }
+        faculty.update(index_terms(faculty))
+        faculty.update(similarity_fields(faculty))
         result = db.users.insert_one(faculty)
+        invalidate_facets(faculty)
         return str(result.inserted_id)
 
     @staticmethod
-    def get_faculty_by_id(faculty_id):
-        """Get faculty by ID"""
+    def get_faculty_by_id(faculty_id, projection=None):
+        """Get faculty by ID, without the password hash, through the profile cache
+
+        A projection limits the result to its fields; a cached profile is
+        trimmed to them, otherwise only those fields are read.
+        """
         db = current_app.db
         if not ObjectId.is_valid(faculty_id):
             return None
 
-        faculty = db.users.find_one({"_id": ObjectId(faculty_id), "user_type": "faculty"})
-        if faculty:
-            faculty["_id"] = str(faculty["_id"])
-        return faculty
+        def load(projection=PROFILE_PROJECTION):
+            faculty = db.users.find_one(
+                {"_id": ObjectId(faculty_id), "user_type": "faculty"}, projection
+            )
+            if faculty:
+                faculty["_id"] = str(faculty["_id"])
+            return faculty
+
+        key = ("faculty", str(ObjectId(faculty_id)))
+        if projection:
+            cached = profile_cache.peek(key, projection)
+            return cached if cached is not None else load(projection)
+        return profile_cache.get(key, load)
 
     @staticmethod
     def get_faculty_by_email(email):
         """Get faculty by email"""
         db = current_app.db
-        faculty = db.users.find_one({"email": email.lower(), "user_type": "faculty"})
+        faculty = db.users.find_one({"email": User.normalize_email(email), "user_type": "faculty"})
         if faculty:
             faculty["_id"] = str(faculty["_id"])
         return faculty
 
     @staticmethod
-    def get_all_faculty(filters=None):
-        """Get all faculty with optional filters"""
-        db = current_app.db
+    def build_query(filters=None):
+        """Build the users query for the faculty directory filters"""
         query = {"user_type": "faculty"}
 
         if filters:
@@ -64,36 +95,35 @@ class Faculty:
                 query['department'] = filters['department']
             if 'research_interests' in filters and filters['research_interests']:
                 query['research_interests'] = {"$in": filters['research_interests']}
-            if 'search' in filters and filters['search']:
-                search_term = filters['search']
-                query['$or'] = [
-                    {"name": {"$regex": search_term, "$options": "i"}},
-                    {"bio": {"$regex": search_term, "$options": "i"}},
-                    {"research_interests": {"$regex": search_term, "$options": "i"}}
-                ]
-
-        faculty = list(db.users.find(query))
-        for faculty_member in faculty:
-            faculty_member["_id"] = str(faculty_member["_id"])
-        return faculty
+            search = SearchQuery(filters.get('search'))
+            if search:
+                query.update(search.filter())
+        return query
 
     @staticmethod
-    def update_faculty(faculty_id, update_data):
-        """Update faculty profile"""
+    def get_all_faculty(filters=None, limit=DEFAULT_PAGE_SIZE, cursor=None, projection=None):
+        """Get one page of faculty with optional filters, returning (faculty, next_cursor)"""
         db = current_app.db
-        if not ObjectId.is_valid(faculty_id):
-            return False
+        query = Faculty.build_query(filters)
+        search = SearchQuery((filters or {}).get('search'))
+
+        faculty, next_cursor = paginate(
+            db.users, query, limit, cursor,
+            projection=projection or SUMMARY_PROJECTION, search=search or None
+        )
+        return faculty, next_cursor
 
-        # Do not allow email or user_type to be changed
-        update_data.pop('email', None)
-        update_data.pop('user_type', None)
-        if 'password' in update_data:
-            update_data['password'] = pbkdf2_sha256.hash(update_data['password'])
+    @staticmethod
+    def count_faculty(filters=None):
+        """Count faculty matching the directory filters"""
+        db = current_app.db
+        return db.users.count_documents(Faculty.build_query(filters))
 
-        update_data['updated_at'] = datetime.utcnow()
+    @staticmethod
+    def update_faculty(faculty_id, update_data, expected_version=None):
+        """Update faculty profile with only the changed fields, returning its new version
 
-        result = db.users.update_one(
-            {"_id": ObjectId(faculty_id), "user_type": "faculty"},
-            {"$set": update_data}
-        )
-        return result.modified_count > 0
+        Returns None when the faculty does not exist; raises VersionConflictError
+        when expected_version is stale.
+        """
+        return User.update_profile(faculty_id, "faculty", update_data, expected_version)
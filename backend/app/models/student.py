@@ -1,7 +1,21 @@
 from flask import current_app
 from bson import ObjectId
 from datetime import datetime
-from passlib.hash import pbkdf2_sha256
+from app.auth.hashing import password_hasher
+from app.models.user import User
+from app.utils.cache import invalidate_facets, profile_cache
+from app.utils.helpers import DEFAULT_PAGE_SIZE, paginate
+from app.utils.search import INDEX_PROJECTION, SearchQuery, index_terms
+from app.utils.similarity import similarity_fields
+
+PROFILE_PROJECTION = {"password": 0, **INDEX_PROJECTION}
+# Directory cards, with the bio the client shows and searches; publications,
+# projects and the other heavy sections are only read on the profile page
+# and through the section endpoints
+SUMMARY_PROJECTION = {
+    "name": 1, "user_type": 1, "department": 1, "program": 1, "year_of_study": 1,
+    "research_interests": 1, "bio": 1, "profile_image": 1, "availability": 1,
+}
 
 class Student:
     """Student model for MongoDB using pymongo directly"""
@@ -10,9 +24,10 @@ class Student:
     def create_student(user_data):
         """Create a new student document"""
         db = current_app.db
+        now = datetime.utcnow()
         student = {
-            "email": user_data.get('email').lower(),
-            "password": pbkdf2_sha256.hash(user_data.get('password')),
+            "email": User.normalize_email(user_data.get('email')),
+            "password": password_hasher.hash(user_data.get('password')),
             "name": user_data.get('name'),
             "user_type": "student",
             "profile_image": user_data.get('profile_image', ''),
@@ -26,38 +41,54 @@ class Student:
             "skills": user_data.get('skills', []),
             "availability": user_data.get('availability', ''),
             "contact_info": user_data.get('contact_info', {}),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "version": 1,
+            "created_at": now,
+            "updated_at": now
         }
+        student.update(index_terms(student))
+        student.update(similarity_fields(student))
 
         result = db.users.insert_one(student)
+        invalidate_facets(student)
         return str(result.inserted_id)
 
     @staticmethod
-    def get_student_by_id(student_id):
-        """Get student by ID"""
+    def get_student_by_id(student_id, projection=None):
+        """Get student by ID, without the password hash, through the profile cache
+
+        A projection limits the result to its fields; a cached profile is
+        trimmed to them, otherwise only those fields are read.
+        """
         db = current_app.db
         if not ObjectId.is_valid(student_id):
             return None
 
-        student = db.users.find_one({"_id": ObjectId(student_id), "user_type": "student"})
-        if student:
-            student["_id"] = str(student["_id"])
-        return student
+        def load(projection=PROFILE_PROJECTION):
+            student = db.users.find_one(
+                {"_id": ObjectId(student_id), "user_type": "student"}, projection
+            )
+            if student:
+                student["_id"] = str(student["_id"])
+            return student
+
+        key = ("student", str(ObjectId(student_id)))
+        if projection:
+            cached = profile_cache.peek(key, projection)
+            return cached if cached is not None else load(projection)
+        return profile_cache.get(key, load)
 
     @staticmethod
     def get_student_by_email(email):
         """Get student by email"""
         db = current_app.db
-        student = db.users.find_one({"email": email.lower(), "user_type": "student"})
+        student = db.users.find_one({"email": User.normalize_email(email), "user_type": "student"})
         if student:
             student["_id"] = str(student["_id"])
         return student
 
     @staticmethod
-    def get_all_students(filters=None):
-        """Get all students with optional filters"""
-        db = current_app.db
+    def build_query(filters=None):
+        """Build the users query for the student directory filters"""
         query = {"user_type": "student"}
 
         if filters:
@@ -65,36 +96,35 @@ class Student:
                 query['department'] = filters['department']
             if 'research_interests' in filters and filters['research_interests']:
                 query['research_interests'] = {"$in": filters['research_interests']}
-            if 'search' in filters and filters['search']:
-                search_term = filters['search']
-                query['$or'] = [
-                    {"name": {"$regex": search_term, "$options": "i"}},
-                    {"bio": {"$regex": search_term, "$options": "i"}},
-                    {"research_interests": {"$regex": search_term, "$options": "i"}}
-                ]
-
-        students = list(db.users.find(query))
-        for student in students:
-            student["_id"] = str(student["_id"])
-        return students
+            search = SearchQuery(filters.get('search'))
+            if search:
+                query.update(search.filter())
+        return query
 
     @staticmethod
-    def update_student(student_id, update_data):
-        """Update student profile"""
+    def get_all_students(filters=None, limit=DEFAULT_PAGE_SIZE, cursor=None, projection=None):
+        """Get one page of students with optional filters, returning (students, next_cursor)"""
         db = current_app.db
-        if not ObjectId.is_valid(student_id):
-            return False
+        query = Student.build_query(filters)
+        search = SearchQuery((filters or {}).get('search'))
 
-        # Prevent modification of certain fields
-        update_data.pop('email', None)
-        update_data.pop('user_type', None)
-        if 'password' in update_data:
-            update_data['password'] = pbkdf2_sha256.hash(update_data['password'])
+        students, next_cursor = paginate(
+            db.users, query, limit, cursor,
+            projection=projection or SUMMARY_PROJECTION, search=search or None
+        )
+        return students, next_cursor
 
-        update_data['updated_at'] = datetime.utcnow()
+    @staticmethod
+    def count_students(filters=None):
+        """Count students matching the directory filters"""
+        db = current_app.db
+        return db.users.count_documents(Student.build_query(filters))
 
-        result = db.users.update_one(
-            {"_id": ObjectId(student_id), "user_type": "student"},
-            {"$set": update_data}
-        )
-        return result.modified_count > 0
+    @staticmethod
+    def update_student(student_id, update_data, expected_version=None):
+        """Update student profile with only the changed fields, returning its new version
+
+        Returns None when the student does not exist; raises VersionConflictError
+        when expected_version is stale.
+        """
+        return User.update_profile(student_id, "student", update_data, expected_version)
@@ -0,0 +1,199 @@
+from flask import current_app
+from bson import ObjectId
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from app.auth.hashing import password_hasher
+from app.utils.cache import invalidate_facets, invalidate_profile
+from app.utils.helpers import decode_cursor, encode_cursor
+from app.utils.matching import MATCHES_COLLECTION
+from app.utils.search import (
+    SEARCH_SOURCE_FIELDS, SEARCH_NAME_TERMS_FIELD, SEARCH_TERMS_FIELD,
+    SIMILARITY_BANDS_FIELD, SIMILARITY_SIGNATURE_FIELD, index_terms
+)
+from app.utils.similarity import SIMILARITY_SOURCE_FIELDS, similarity_fields
+
+# Fields clients may not write through a profile update
+PROTECTED_FIELDS = (
+    '_id', 'email', 'user_type', 'version', 'created_at', 'updated_at',
+    SEARCH_TERMS_FIELD, SEARCH_NAME_TERMS_FIELD, SIMILARITY_SIGNATURE_FIELD, SIMILARITY_BANDS_FIELD,
+)
+
+# Profile fields clients may select with ?fields=, per user type. The
+# password hash and the index fields are never selectable.
+_SHARED_FIELDS = (
+    'email', 'name', 'user_type', 'profile_image', 'department', 'research_interests', 'bio',
+    'publications', 'current_projects', 'availability', 'contact_info', 'version',
+    'created_at', 'updated_at',
+)
+PROFILE_FIELDS = {
+    'student': _SHARED_FIELDS + ('year_of_study', 'program', 'skills'),
+    'faculty': _SHARED_FIELDS + ('position', 'lab_info', 'office_hours'),
+}
+
+# Heavy profile arrays served page by page from /<users>/<id>/<section>
+PROFILE_SECTIONS = {
+    'publications': 'publications',
+    'projects': 'current_projects',
+}
+
+
+class VersionConflictError(Exception):
+    """Raised when a profile changed since the version the client edited"""
+
+    def __init__(self, current_version):
+        super().__init__(f"Profile is at version {current_version}")
+        self.current_version = current_version
+
+
+def profile_delta(stored, changes):
+    """Translate the fields that differ from stored into update operators
+
+    Arrays that only gained items at the end become $push and arrays that
+    only lost items become $pull; any other change is a $set of the field.
+    Returns ({operator: {field: value}}, {field: new value}) for changed fields.
+    """
+    operators, changed = {}, {}
+    for field, value in changes.items():
+        old = stored.get(field)
+        if field in stored and old == value:
+            continue
+        changed[field] = value
+        if isinstance(old, list) and isinstance(value, list):
+            added = value[len(old):]
+            removed = []
+            for item in old:
+                if item not in value and item not in removed:
+                    removed.append(item)
+            if value[:len(old)] == old and added:
+                operators.setdefault("$push", {})[field] = {"$each": added}
+                continue
+            if removed and value == [item for item in old if item not in removed]:
+                operators.setdefault("$pull", {})[field] = {"$in": removed}
+                continue
+        operators.setdefault("$set", {})[field] = value
+    return operators, changed
+
+
+class User:
+    """Lookups shared by students and faculty in the users collection"""
+
+    DUPLICATE_EMAIL_ERROR = "Email already registered"
+
+    @staticmethod
+    def normalize_email(email):
+        """Canonical form under which emails are stored and looked up"""
+        return email.strip().lower()
+
+    @staticmethod
+    def get_user_by_email(email):
+        """Get a student or faculty member by email with a single indexed query"""
+        db = current_app.db
+        user = db.users.find_one({"email": User.normalize_email(email)})
+        if user:
+            user["_id"] = str(user["_id"])
+        return user
+
+    @staticmethod
+    def email_exists(email):
+        """Check whether any user is registered with this email"""
+        db = current_app.db
+        return db.users.find_one(
+            {"email": User.normalize_email(email)}, {"_id": 1}
+        ) is not None
+
+    @staticmethod
+    def is_duplicate_email(error):
+        """Whether a DuplicateKeyError came from the unique email index"""
+        return isinstance(error, DuplicateKeyError) and 'email' in str(error.details or error)
+
+    @staticmethod
+    def update_profile(user_id, user_type, update_data, expected_version=None):
+        """Apply only the fields that changed, returning the profile's version
+
+        Returns None when the user does not exist. Raises VersionConflictError
+        when expected_version is stale or another write lands first. A request
+        that changes nothing writes nothing and returns the current version.
+        """
+        db = current_app.db
+        if not ObjectId.is_valid(user_id):
+            return None
+
+        changes = {k: v for k, v in update_data.items() if k not in PROTECTED_FIELDS}
+        password = changes.pop('password', None)
+        derived = set(SEARCH_SOURCE_FIELDS) | set(SIMILARITY_SOURCE_FIELDS)
+        projection = {field: 1 for field in set(changes) | derived | {'version'}}
+        stored = db.users.find_one({"_id": ObjectId(user_id), "user_type": user_type}, projection)
+        if stored is None:
+            return None
+
+        version = stored.get('version', 0)
+        if expected_version is not None and expected_version != version:
+            raise VersionConflictError(version)
+
+        operators, changed = profile_delta(stored, changes)
+        if not changed and not password:
+            return version
+
+        now = datetime.utcnow()
+        fields = operators.setdefault("$set", {})
+        if password:
+            fields['password'] = password_hasher.hash(password)
+        merged = {**stored, **changed}
+        if any(field in changed for field in SEARCH_SOURCE_FIELDS):
+            fields.update(index_terms(merged))
+        if any(field in changed for field in SIMILARITY_SOURCE_FIELDS):
+            fields.update(similarity_fields(merged))
+        fields['updated_at'] = now
+        operators["$inc"] = {"version": 1}
+
+        # Matching on the version read above makes a concurrent edit fail fast
+        version_filter = {"version": version} if 'version' in stored else {"version": {"$exists": False}}
+        result = db.users.update_one({"_id": stored["_id"], "user_type": user_type, **version_filter}, operators)
+        if result.matched_count == 0:
+            current = db.users.find_one({"_id": stored["_id"]}, {"version": 1})
+            if current is None:
+                return None
+            raise VersionConflictError(current.get('version', 0))
+
+        invalidate_profile(user_type, stored["_id"])
+        invalidate_facets(changed)
+        if 'research_interests' in changed:
+            # Precomputed matches no longer reflect the new interests
+            db[MATCHES_COLLECTION].delete_one({"_id": stored["_id"]})
+        return version + 1
+
+    @staticmethod
+    def get_profile_section(user_id, user_type, section, limit, cursor=None):
+        """Get one page of a profile section, returning (items, next_cursor, total)
+
+        Only the requested slice of the array leaves the server. Items have no
+        key of their own, so the cursor carries the array offset. Returns None
+        when the user does not exist.
+        """
+        db = current_app.db
+        if not ObjectId.is_valid(user_id):
+            return None
+        after = decode_cursor(cursor) or {}
+        offset = after.get('offset', 0)
+        if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+            raise ValueError("Invalid cursor")
+
+        field = "$" + PROFILE_SECTIONS[section]
+        values = {"$cond": [{"$isArray": field}, field, []]}
+        rows = list(db.users.aggregate([
+            {"$match": {"_id": ObjectId(user_id), "user_type": user_type}},
+            {"$project": {
+                "_id": 0,
+                "items": {"$slice": [values, offset, limit + 1]},
+                "total": {"$size": values},
+            }},
+        ]))
+        if not rows:
+            return None
+
+        items = rows[0]["items"]
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor({"offset": offset + limit})
+        return items, next_cursor, rows[0]["total"]
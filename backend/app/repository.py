@@ -0,0 +1,70 @@
+import inspect
+from bson import ObjectId
+from app.models import faculty, student
+from app.models.faculty import Faculty, PROFILE_PROJECTION
+from app.models.student import Student
+from app.utils.helpers import (
+    decode_page_cursor, facet_pipeline, finish_page, keyset_query
+)
+from app.utils.search import SearchQuery, ranked_search_pipeline
+
+MODELS = {
+    'faculty': Faculty,
+    'student': Student,
+}
+SUMMARY_PROJECTIONS = {
+    'faculty': faculty.SUMMARY_PROJECTION,
+    'student': student.SUMMARY_PROJECTION,
+}
+
+
+async def _to_list(cursor, length=None):
+    # PyMongo's async aggregate() must be awaited for its cursor; Motor's not
+    if inspect.isawaitable(cursor):
+        cursor = await cursor
+    return await cursor.to_list(length)
+
+
+class AsyncUserRepository:
+    """Async data access for the read paths, built on the model query builders
+
+    Queries, projections and cursors are shared with the synchronous models
+    so both app factories return identical pages.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def list_users(self, user_type, filters, limit, cursor=None, projection=None):
+        """Async counterpart of Faculty.get_all_faculty / Student.get_all_students"""
+        query = MODELS[user_type].build_query(filters)
+        projection = projection or SUMMARY_PROJECTIONS[user_type]
+        search = SearchQuery((filters or {}).get('search')) or None
+        after = decode_page_cursor(cursor, search)
+
+        if search:
+            pipeline = ranked_search_pipeline(query, search, limit, after, projection)
+            documents = await _to_list(self.db.users.aggregate(pipeline))
+        else:
+            documents = await _to_list(
+                self.db.users.find(keyset_query(query, after), projection)
+                .sort('_id', 1).limit(limit + 1)
+            )
+        return finish_page(documents, limit, search)
+
+    async def count_users(self, user_type, filters):
+        """Count users matching the directory filters"""
+        return await self.db.users.count_documents(MODELS[user_type].build_query(filters))
+
+    async def get_user(self, user_type, user_id, projection=None):
+        """Get a user of the given type by id, without password or index fields"""
+        if not ObjectId.is_valid(user_id):
+            return None
+        return await self.db.users.find_one(
+            {"_id": ObjectId(user_id), "user_type": user_type}, projection or PROFILE_PROJECTION
+        )
+
+    async def facet_counts(self, field, query):
+        """Async counterpart of helpers.facet_counts"""
+        rows = await _to_list(self.db.users.aggregate(facet_pipeline(field, query)))
+        return {str(row["_id"]): row["count"] for row in rows}
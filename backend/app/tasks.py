@@ -0,0 +1,39 @@
+from flask import current_app
+from app.utils.cache import FACET_FIELDS, facet_cache, invalidate_facets
+from app.utils.helpers import FACETS, facet_counts
+from app.utils.jobs import job_queue
+
+
+@job_queue.task('recompute-matches')
+def recompute_matches_task(payload):
+    """Score every user and store their top matches"""
+    from app.utils.matching import recompute_matches
+    return {"users": recompute_matches(current_app.db, k=payload.get('top', 20))}
+
+
+@job_queue.task('rebuild-search-index')
+def rebuild_search_index_task(payload):
+    """Recompute directory search terms for every user"""
+    from app.utils.search import rebuild_index
+    return {"users": rebuild_index(current_app.db)}
+
+
+@job_queue.task('rebuild-similarity-index')
+def rebuild_similarity_index_task(payload):
+    """Recompute MinHash signatures and LSH bands for every user"""
+    from app.utils.similarity import rebuild_similarity_index
+    return {"users": rebuild_similarity_index(current_app.db)}
+
+
+@job_queue.task('refresh-facets')
+def refresh_facets_task(payload):
+    """Drop cached facets on every worker and recount them into this worker's cache"""
+    db = current_app.db
+    invalidate_facets(FACET_FIELDS)
+    sizes = {}
+    for key, facet in FACETS.items():
+        generation = facet_cache.lookup(key)[2]
+        counts = facet_counts(db, *facet)
+        facet_cache.store(key, counts, generation)
+        sizes[key] = len(counts)
+    return {"facets": sizes}
@@ -0,0 +1,209 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import jsonify, request
+from app.utils.invalidation import invalidation_bus
+
+
+class FacetCache:
+    """Per-process TTL cache for facet lists, cleared by the model write paths"""
+
+    def __init__(self, ttl=300, max_age=60):
+        self.ttl = ttl
+        self.max_age = max_age
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('FACET_CACHE_TTL', self.ttl)
+        self.max_age = app.config.get('FACET_CACHE_MAX_AGE', self.max_age)
+
+    def lookup(self, key):
+        """Return (value, etag, generation); value is None on a miss or after expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry and entry[2] > time.monotonic():
+            return entry[0], entry[1], generation
+        return None, None, generation
+
+    def store(self, key, value, generation):
+        """Cache a freshly computed value and return its etag"""
+        digest = hashlib.sha1(
+            json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        with self._lock:
+            # Skip storing a value computed while an invalidation ran
+            if generation == self._generation:
+                self._entries[key] = (value, digest, time.monotonic() + self.ttl)
+        return digest
+
+    def get(self, key, compute):
+        """Return (value, etag) for key, computing it on a miss or after expiry"""
+        value, etag, generation = self.lookup(key)
+        if value is None:
+            value = compute()
+            etag = self.store(key, value, generation)
+        return value, etag
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or every entry when called without keys"""
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+facet_cache = FacetCache()
+
+
+class ProfileCache:
+    """Per-process LRU cache of user profiles with a TTL, cleared on profile writes
+
+    Entries never hold the password hash, and callers get their own copy so
+    route handlers can modify what they return.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config.get('PROFILE_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('PROFILE_CACHE_TTL', self.ttl)
+
+    def get(self, key, load):
+        """Return a copy of the cached profile for key, loading it on a miss"""
+        if not self.max_size:
+            return load()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            generation = self._generation
+
+        profile = load()
+        if profile is None:
+            return None
+        profile.pop('password', None)
+        with self._lock:
+            # Skip storing a profile read while an invalidation ran
+            if generation == self._generation:
+                self._entries[key] = (copy.deepcopy(profile), time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return profile
+
+    def peek(self, key, fields):
+        """Return a copy of just the given fields of a cached profile, or None on a miss"""
+        if not self.max_size:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return {
+                    field: copy.deepcopy(value) for field, value in entry[0].items()
+                    if field == '_id' or field in fields
+                }
+            self.misses += 1
+        return None
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or every entry when called without keys"""
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def collect_metrics(self):
+        """Cache counters in the shape expected by Metrics.add_collector"""
+        stats = self.stats()
+        return [
+            ("profile_cache_hits_total", "counter", "Profile reads served from cache",
+             [({}, stats["hits"])]),
+            ("profile_cache_misses_total", "counter", "Profile reads that went to Mongo",
+             [({}, stats["misses"])]),
+            ("profile_cache_evictions_total", "counter", "Profiles evicted by the size bound",
+             [({}, stats["evictions"])]),
+            ("profile_cache_entries", "gauge", "Profiles currently cached",
+             [({}, stats["size"])]),
+        ]
+
+
+profile_cache = ProfileCache()
+
+
+def invalidate_profile(user_type, user_id):
+    """Drop a cached profile on every worker"""
+    key = (user_type, str(user_id))
+    profile_cache.invalidate(key)
+    invalidation_bus.publish('profiles', key)
+
+# Facets derived from each profile field, used to invalidate on writes
+FACET_FIELDS = {
+    'department': 'departments',
+    'program': 'programs',
+    'research_interests': 'research_interests',
+}
+
+
+def invalidate_facets(data):
+    """Invalidate the facets that depend on fields present in data, on every worker"""
+    keys = [FACET_FIELDS[field] for field in FACET_FIELDS if field in data]
+    if keys:
+        facet_cache.invalidate(*keys)
+        invalidation_bus.publish('facets', *keys)
+
+
+def facet_body(name, counts, etag, with_counts):
+    """Build the facet response body and its variant-specific ETag"""
+    body = {"success": True, name: sorted(counts)}
+    if with_counts:
+        body["counts"] = counts
+    return body, f"{etag}-{'c' if with_counts else 'n'}"
+
+
+def facet_response(key, name, compute):
+    """Serve a cached {value: count} facet as a sorted list with ETag revalidation
+
+    With ?counts=true the per-value counts are included as well.
+    """
+    counts, etag = facet_cache.get(key, compute)
+    with_counts = request.args.get('counts', '').lower() in ('1', 'true', 'yes')
+
+    body, etag = facet_body(name, counts, etag, with_counts)
+    response = jsonify(body)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={facet_cache.max_age}"
+    return response.make_conditional(request)
@@ -1,29 +1,9 @@
 from bson import ObjectId
+import base64
 import json
 import re
-
-class JSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder for MongoDB ObjectId"""
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        return json.JSONEncoder.default(self, obj)
-
-def convert_object_ids(data):
-    """Convert ObjectIds to strings in a dictionary or list"""
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, ObjectId):
-                data[key] = str(value)
-            elif isinstance(value, dict) or isinstance(value, list):
-                data[key] = convert_object_ids(value)
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            if isinstance(item, ObjectId):
-                data[i] = str(item)
-            elif isinstance(item, dict) or isinstance(item, list):
-                data[i] = convert_object_ids(item)
-    return data
+from datetime import datetime, timezone
+from app.utils.search import ranked_search_pipeline
 
 def sanitize_input(text):
     """Remove potentially harmful characters from input"""
@@ -36,4 +16,233 @@ def sanitize_input(text):
     # Remove other potentially harmful HTML tags
     text = re.sub(r'<.*?>', '', text)
     
-    return text
\ No newline at end of file
+    return text
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    """Encode keyset values into an opaque cursor token"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token produced by encode_cursor"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_page_args(args):
+    """Read limit and cursor from request query parameters"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit")
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return min(limit, MAX_PAGE_SIZE), args.get('cursor')
+
+
+def parse_fields(args, allowed):
+    """Compile ?fields=a,b into an inclusion projection limited to allowed fields
+
+    Returns None when no fields were requested. _id is always returned, and
+    anything outside the allow-list, such as password, is rejected.
+    """
+    value = args.get('fields')
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(',') if f.strip() and f.strip() != '_id']
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return {field: 1 for field in fields} or {"_id": 1}
+
+
+def parse_directory_filters(args):
+    """Read the directory filters shared by /faculty and /students"""
+    interests = args.get('research_interests')
+    return {
+        'department': args.get('department'),
+        'research_interests': interests.split(',') if interests else None,
+        'search': args.get('search'),
+    }
+
+
+# Facet cache key -> (users field, users query) behind each facet endpoint
+FACETS = {
+    'departments': ("department", {"user_type": "faculty"}),
+    'programs': ("program", {"user_type": "student"}),
+    'research_interests': ("research_interests", {"user_type": {"$in": ["student", "faculty"]}}),
+}
+
+
+def facet_pipeline(field, query):
+    """Aggregation counting users per non-empty value of field (arrays are unwound)"""
+    return [
+        {"$match": query},
+        {"$project": {"_id": 0, "value": "$" + field}},
+        {"$unwind": "$value"},
+        {"$match": {"value": {"$nin": ["", None]}}},
+        {"$group": {"_id": "$value", "count": {"$sum": 1}}},
+    ]
+
+
+def facet_counts(db, field, query):
+    """Return {value: user count} for field among users matching query"""
+    return {
+        str(row["_id"]): row["count"]
+        for row in db.users.aggregate(facet_pipeline(field, query))
+    }
+
+
+def wants_count(args):
+    """Whether the client asked for a total count alongside a page"""
+    return args.get('count', '').lower() in ('1', 'true', 'yes')
+
+
+def decode_page_cursor(cursor, search=None):
+    """Decode and validate a directory page cursor into its keyset values"""
+    after = decode_cursor(cursor)
+    if after:
+        if not ObjectId.is_valid(after.get('id')):
+            raise ValueError("Invalid cursor")
+        after['id'] = ObjectId(after['id'])
+        if search and not isinstance(after.get('score'), int):
+            raise ValueError("Invalid cursor")
+    return after
+
+
+def keyset_query(query, after):
+    """Restrict an _id-ordered query to documents after the cursor"""
+    query = dict(query)
+    if after:
+        query['_id'] = {"$gt": after['id']}
+    return query
+
+
+def finish_page(documents, limit, search=None):
+    """Trim a limit + 1 fetch to one page and build its next_cursor"""
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = {"id": str(documents[-1]['_id'])}
+        if search:
+            last['score'] = documents[-1]['search_score']
+        next_cursor = encode_cursor(last)
+    return documents, next_cursor
+
+
+def paginate(collection, query, limit, cursor=None, projection=None, search=None):
+    """Keyset-paginate a query, returning (documents, next_cursor)
+
+    Plain listings are ordered by _id. When a SearchQuery is given the page
+    is ordered by relevance and the cursor carries the last score as well.
+    """
+    after = decode_page_cursor(cursor, search)
+    if search:
+        pipeline = ranked_search_pipeline(query, search, limit, after, projection)
+        documents = list(collection.aggregate(pipeline))
+    else:
+        documents = list(
+            collection.find(keyset_query(query, after), projection).sort('_id', 1).limit(limit + 1)
+        )
+    return finish_page(documents, limit, search)
+
+
+REQUEST_STATUSES = ['pending', 'accepted', 'rejected']
+REQUEST_FIELDS = ('student_id', 'faculty_id', 'message', 'research_topic', 'status', 'created_at', 'updated_at')
+INBOX_SORTS = {'newest': -1, 'oldest': 1}
+
+
+def parse_since(value):
+    """Parse an ISO 8601 timestamp into the naive UTC datetimes stored in Mongo"""
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError("Invalid since")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def parse_inbox_args(args):
+    """Read the status, since and sort filters of the collaboration request inboxes"""
+    statuses = args.get('status')
+    statuses = statuses.split(',') if statuses else REQUEST_STATUSES
+    if any(status not in REQUEST_STATUSES for status in statuses):
+        raise ValueError("Invalid status")
+    sort = args.get('sort', 'newest')
+    if sort not in INBOX_SORTS:
+        raise ValueError("Invalid sort")
+    return {'statuses': statuses, 'since': parse_since(args.get('since')), 'sort': sort}
+
+
+def inbox_query(owner_field, owner_id, filters):
+    """Build the query for one user's requests, without the status filter"""
+    query = {owner_field: owner_id}
+    if filters['since']:
+        query['created_at'] = {"$gte": filters['since']}
+    return query
+
+
+def inbox_page(collection, owner_field, owner_id, filters, limit, cursor=None, projection=None):
+    """Keyset-paginate a user's requests by (created_at, _id), returning (requests, next_cursor)
+
+    Status is always matched with $in so the (owner, status, created_at, _id)
+    index serves the sort by merging one index range per status.
+    """
+    fetch = projection and {**projection, "created_at": 1}
+    direction = INBOX_SORTS[filters['sort']]
+    query = inbox_query(owner_field, owner_id, filters)
+    query['status'] = {"$in": filters['statuses']}
+
+    after = decode_cursor(cursor)
+    if after:
+        try:
+            created_at = datetime.fromisoformat(after['created_at'])
+            after_id = ObjectId(after['id'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        op = "$lt" if direction < 0 else "$gt"
+        query["$or"] = [
+            {"created_at": {op: created_at}},
+            {"created_at": created_at, "_id": {op: after_id}},
+        ]
+
+    documents = list(
+        collection.find(query, fetch).sort([("created_at", direction), ("_id", direction)]).limit(limit + 1)
+    )
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor({"created_at": last['created_at'].isoformat(), "id": str(last['_id'])})
+    if projection and 'created_at' not in projection:
+        for document in documents:
+            document.pop('created_at', None)
+    return documents, next_cursor
+
+
+def status_counts(collection, owner_field, owner_id, filters):
+    """Count a user's requests per status with a single aggregation"""
+    counts = dict.fromkeys(REQUEST_STATUSES, 0)
+    for row in collection.aggregate([
+        {"$match": inbox_query(owner_field, owner_id, filters)},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]):
+        counts[row["_id"]] = row["count"]
+    return counts
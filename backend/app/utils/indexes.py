@@ -0,0 +1,144 @@
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from app.utils.helpers import FACETS, REQUEST_STATUSES, facet_pipeline
+from app.utils.matching import MATCHES_COLLECTION, MATCH_USER_TYPES
+from app.utils.search import SEARCH_TERMS_FIELD, SIMILARITY_BANDS_FIELD, SearchQuery
+
+# Every index the application relies on, per collection. Keep this in sync
+# with QUERY_SHAPES below so `flask verify-indexes` can prove each query
+# issued by the models and routes is served by one of them.
+INDEXES = {
+    'users': [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("user_type", ASCENDING), ("_id", ASCENDING)], name="user_type_id"),
+        IndexModel(
+            [("user_type", ASCENDING), ("department", ASCENDING), ("_id", ASCENDING)],
+            name="user_type_department_id"
+        ),
+        IndexModel([("user_type", ASCENDING), ("program", ASCENDING)], name="user_type_program"),
+        IndexModel(
+            [("user_type", ASCENDING), ("research_interests", ASCENDING)],
+            name="user_type_research_interests"
+        ),
+        IndexModel(
+            [("user_type", ASCENDING), (SEARCH_TERMS_FIELD, ASCENDING)],
+            name="user_type_search_terms"
+        ),
+        IndexModel(
+            [("user_type", ASCENDING), (SIMILARITY_BANDS_FIELD, ASCENDING)],
+            name="user_type_text_bands"
+        ),
+    ],
+    'collaborations': [
+        # Inboxes filter by status and page by (created_at, _id) within it
+        IndexModel(
+            [("student_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="student_id_status_created_at"
+        ),
+        IndexModel(
+            [("faculty_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="faculty_id_status_created_at"
+        ),
+    ],
+    'jobs': [
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_expires_at"),
+        IndexModel(
+            [("dedupe_key", ASCENDING)], name="dedupe_key_unique", unique=True,
+            partialFilterExpression={"dedupe_key": {"$exists": True}}
+        ),
+        # Finished jobs are kept a week for polling and debugging
+        IndexModel([("finished_at", ASCENDING)], name="finished_at_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    'collaboration_requests': [
+        IndexModel([("student_id", ASCENDING), ("status", ASCENDING)], name="student_id_status"),
+        IndexModel([("faculty_id", ASCENDING), ("status", ASCENDING)], name="faculty_id_status"),
+    ],
+}
+
+_ID = ObjectId()
+_SEARCH = SearchQuery("machine learn")
+
+# Representative explain() commands for the queries the application issues.
+QUERY_SHAPES = [
+    ("login lookup", {"find": "users", "filter": {"email": "a@b.edu"}}),
+    ("profile by id", {"find": "users", "filter": {"_id": _ID, "user_type": "faculty"}}),
+    ("directory page", {"find": "users", "filter": {"user_type": "faculty", "_id": {"$gt": _ID}},
+                        "sort": {"_id": 1}, "limit": 21}),
+    ("directory by department", {"find": "users", "filter": {"user_type": "student", "department": "CS"},
+                                 "sort": {"_id": 1}, "limit": 21}),
+    ("directory by interest", {"find": "users",
+                               "filter": {"user_type": "faculty", "research_interests": {"$in": ["AI"]}},
+                               "sort": {"_id": 1}, "limit": 21}),
+    ("directory search", {"aggregate": "users", "cursor": {}, "pipeline": [
+        {"$match": {"user_type": "faculty", **_SEARCH.filter()}},
+        {"$addFields": {"search_score": _SEARCH.score_expression()}},
+        {"$sort": {"search_score": -1, "_id": 1}},
+        {"$limit": 21},
+    ]}),
+    *((f"{name} facet", {"aggregate": "users", "cursor": {}, "pipeline": facet_pipeline(*facet)})
+      for name, facet in FACETS.items()),
+    ("profile section", {"aggregate": "users", "cursor": {}, "pipeline": [
+        {"$match": {"_id": _ID, "user_type": "faculty"}},
+        {"$project": {"_id": 0, "items": {"$slice": ["$publications", 0, 21]}}},
+    ]}),
+    ("match candidates", {"find": "users", "filter": {"_id": {"$in": [_ID]}}}),
+    ("similar text candidates", {"find": "users", "filter": {
+        "user_type": "faculty", "_id": {"$ne": _ID}, SIMILARITY_BANDS_FIELD: {"$in": ["0:0123456789abcdef"]}
+    }, "limit": 2000}),
+    ("match scorer load", {"find": "users", "filter": {
+        "user_type": {"$in": MATCH_USER_TYPES}, "research_interests.0": {"$exists": True}}}),
+    ("stored matches", {"find": MATCHES_COLLECTION, "filter": {"_id": _ID}}),
+    *((f"{owner} inbox", {"find": "collaborations",
+                          "filter": {f"{owner}_id": str(_ID), "status": {"$in": REQUEST_STATUSES}},
+                          "sort": {"created_at": -1, "_id": -1}, "limit": 21})
+      for owner in ("student", "faculty")),
+    *((f"{owner} inbox counts", {"aggregate": "collaborations", "cursor": {}, "pipeline": [
+        {"$match": {f"{owner}_id": str(_ID)}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]}) for owner in ("student", "faculty")),
+    ("request by id", {"find": "collaborations", "filter": {"_id": _ID}}),
+    ("next due job", {"find": "jobs", "filter": {"status": "queued", "run_at": {"$lte": _ID.generation_time}},
+                      "sort": {"run_at": 1}, "limit": 1}),
+    ("expired job leases", {"find": "jobs", "filter": {
+        "status": "running", "lease_expires_at": {"$lte": _ID.generation_time}}}),
+    *((f"{status} jobs count", {"count": "jobs", "query": {"status": status}})
+      for status in ('queued', 'running', 'succeeded', 'failed')),
+]
+
+
+class IndexVerificationError(Exception):
+    """Raised when a known query shape would scan a whole collection"""
+
+
+def ensure_indexes(db):
+    """Create every registered index; existing identical indexes are left alone"""
+    created = {}
+    for collection, indexes in INDEXES.items():
+        created[collection] = db[collection].create_indexes(indexes)
+    return created
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def verify_query_plans(db):
+    """Explain every registered query shape and fail on any COLLSCAN"""
+    failures = []
+    for name, command in QUERY_SHAPES:
+        explain = db.command('explain', command, verbosity='queryPlanner')
+        if 'COLLSCAN' in set(_plan_stages(explain)):
+            failures.append(name)
+    if failures:
+        raise IndexVerificationError(
+            "Collection scans found for: " + ", ".join(failures)
+        )
+    return len(QUERY_SHAPES)
@@ -0,0 +1,204 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+    """Fans cache invalidations out to every worker through a capped collection
+
+    Writers publish (cache, keys) messages; each process tails the collection
+    from a background thread and applies messages from other processes to its
+    registered caches. After losing its place in the collection a subscriber
+    clears its caches entirely, so a worker is never left holding stale data.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.enabled = False
+        self.collection_name = 'cache_invalidations'
+        self.size = 1024 * 1024
+        self.await_ms = 1000
+        self._handlers = {}
+        self._reset_process()
+        os.register_at_fork(after_in_child=self._reset_process)
+
+    def init_app(self, app):
+        self.db = app.db
+        self.enabled = app.config.get('CACHE_BUS_ENABLED', False)
+        self.collection_name = app.config.get('CACHE_BUS_COLLECTION', self.collection_name)
+        self.size = app.config.get('CACHE_BUS_SIZE', self.size)
+        self.await_ms = app.config.get('CACHE_BUS_AWAIT_MS', self.await_ms)
+        if self.enabled:
+            app.before_request(self.start)
+
+    def _reset_process(self):
+        # A forked worker needs its own identity and subscriber thread
+        self.origin = uuid.uuid4().hex
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.published = 0
+        self.publish_errors = 0
+        self.received = {}
+        self.errors = 0
+        self.resyncs = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.connected = False
+
+    def subscribe(self, cache, handler):
+        """Call handler(*keys) for messages about cache; no keys means clear everything"""
+        self._handlers[cache] = handler
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    def publish(self, cache, *keys):
+        """Tell the other workers to drop keys from cache"""
+        if not self.enabled:
+            return
+        try:
+            self.collection.insert_one({
+                "cache": cache,
+                "keys": [list(key) if isinstance(key, tuple) else key for key in keys],
+                "origin": self.origin,
+                "published_at": time.time(),
+            })
+        except PyMongoError:
+            # The TTLs still bound staleness, so a lost message must not fail the write
+            logger.exception("Failed to publish cache invalidation for %s", cache)
+            with self._stats_lock:
+                self.publish_errors += 1
+            return
+        with self._stats_lock:
+            self.published += 1
+
+    def start(self):
+        """Start this process's subscriber thread if it is not running"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name='cache-invalidation-bus', daemon=True
+                )
+                self._thread.start()
+
+    def ensure_collection(self):
+        try:
+            self.db.create_collection(self.collection_name, capped=True, size=self.size)
+        except CollectionInvalid:
+            pass
+
+    def _run(self):
+        last_id, positioned = None, False
+        while True:
+            try:
+                # Start after the newest message, but only once: a None last_id
+                # later means the collection was empty and everything is new
+                if not positioned:
+                    self.ensure_collection()
+                    newest = self.collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+                    last_id = newest["_id"] if newest else None
+                    positioned = True
+                last_id = self._tail(last_id)
+            except PyMongoError:
+                logger.exception("Cache invalidation subscriber lost its cursor")
+                with self._stats_lock:
+                    self.errors += 1
+                    self.connected = False
+                self._resync()
+                positioned = False
+                time.sleep(1)
+
+    def _tail(self, last_id):
+        # A capped collection keeps insertion order, but ObjectIds minted by
+        # different processes are not ordered, so the cursor resumes by
+        # skipping to the last message seen rather than comparing _ids. With
+        # the whole collection matched, the cursor stays alive while idle.
+        cursor = self.collection.find(
+            {}, cursor_type=CursorType.TAILABLE_AWAIT, max_await_time_ms=self.await_ms
+        )
+        with self._stats_lock:
+            self.connected = True
+        found = last_id is None
+        while cursor.alive:
+            for message in cursor:
+                if not found:
+                    found = message["_id"] == last_id
+                    continue
+                last_id = message["_id"]
+                self._apply(message)
+            if not found:
+                # The last message seen was overwritten before we got back
+                self._resync()
+                found = True
+        # An empty capped collection returns a dead cursor; wait for a first message
+        time.sleep(self.await_ms / 1000)
+        return last_id
+
+    def _apply(self, message):
+        lag = max(0.0, time.time() - message.get("published_at", time.time()))
+        cache = message.get("cache")
+        with self._stats_lock:
+            self.received[cache] = self.received.get(cache, 0) + 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+        if message.get("origin") == self.origin or cache not in self._handlers:
+            return
+        keys = [tuple(key) if isinstance(key, list) else key for key in message.get("keys", [])]
+        self._handlers[cache](*keys)
+
+    def _resync(self):
+        with self._stats_lock:
+            self.resyncs += 1
+        for handler in self._handlers.values():
+            handler()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "connected": self.connected,
+                "published": self.published,
+                "publish_errors": self.publish_errors,
+                "received": dict(self.received),
+                "errors": self.errors,
+                "resyncs": self.resyncs,
+                "last_lag_seconds": self.last_lag,
+                "max_lag_seconds": self.max_lag,
+            }
+
+    def collect_metrics(self):
+        """Bus counters in the shape expected by Metrics.add_collector"""
+        stats = self.stats()
+        return [
+            ("cache_bus_connected", "gauge", "Whether this worker is tailing the bus",
+             [({}, int(stats["connected"]))]),
+            ("cache_bus_published_total", "counter", "Invalidations published by this worker",
+             [({}, stats["published"])]),
+            ("cache_bus_publish_errors_total", "counter", "Invalidations that failed to publish",
+             [({}, stats["publish_errors"])]),
+            ("cache_bus_received_total", "counter", "Invalidations read from the bus",
+             [({"cache": cache}, count) for cache, count in stats["received"].items()]),
+            ("cache_bus_subscriber_errors_total", "counter", "Subscriber cursor failures",
+             [({}, stats["errors"])]),
+            ("cache_bus_resyncs_total", "counter", "Full cache clears after losing the cursor",
+             [({}, stats["resyncs"])]),
+            ("cache_bus_lag_seconds", "gauge", "Delay between publishing and applying the last message",
+             [({}, stats["last_lag_seconds"])]),
+            ("cache_bus_lag_seconds_max", "gauge", "Largest observed invalidation delay",
+             [({}, stats["max_lag_seconds"])]),
+        ]
+
+
+invalidation_bus = InvalidationBus()
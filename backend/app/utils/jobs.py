@@ -0,0 +1,277 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from app.utils.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ['queued', 'running', 'succeeded', 'failed']
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600)
+
+metrics.describe('job_duration_seconds', 'histogram', 'Time spent running background jobs')
+metrics.describe('job_wait_seconds', 'histogram', 'Time background jobs waited in the queue')
+metrics.describe('job_failures_total', 'counter', 'Background job attempts that raised')
+
+
+class JobQueue:
+    """Mongo-backed queue of background jobs run by worker threads
+
+    A worker claims a job by leasing it for JOB_VISIBILITY_TIMEOUT seconds
+    and renews the lease while the job runs; a job whose worker died is
+    claimed again once its lease expires. Failed attempts are retried with
+    exponential backoff up to JOB_MAX_ATTEMPTS.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.collection_name = 'jobs'
+        self.workers = 0
+        self.visibility_timeout = 300
+        self.max_attempts = 3
+        self.poll_interval = 1.0
+        self._tasks = {}
+        self._reset_process()
+        os.register_at_fork(after_in_child=self._reset_process)
+
+    def init_app(self, app):
+        self.app = app
+        self.collection_name = app.config.get('JOB_COLLECTION', self.collection_name)
+        self.workers = app.config.get('JOB_WORKERS', self.workers)
+        self.visibility_timeout = app.config.get('JOB_VISIBILITY_TIMEOUT', self.visibility_timeout)
+        self.max_attempts = app.config.get('JOB_MAX_ATTEMPTS', self.max_attempts)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', self.poll_interval)
+        if self.workers:
+            app.before_request(self.start)
+
+    def _reset_process(self):
+        # Worker threads do not survive fork; each process starts its own
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def collection(self):
+        return self.app.db[self.collection_name]
+
+    def task(self, name):
+        """Register a function(payload) -> result as the handler for jobs called name"""
+        def decorator(fn):
+            self._tasks[name] = fn
+            return fn
+        return decorator
+
+    @property
+    def task_names(self):
+        return sorted(self._tasks)
+
+    def enqueue(self, name, payload=None, owner_id=None, dedupe=False):
+        """Queue a job and return its ID
+
+        With dedupe, a job of the same name and payload that is still queued
+        or running is returned instead of queueing another.
+        """
+        if name not in self._tasks:
+            raise ValueError(f"Unknown job: {name}")
+        now = datetime.utcnow()
+        job = {
+            "name": name,
+            "payload": payload or {},
+            "owner_id": owner_id,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "run_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if dedupe:
+            # The partial unique index on dedupe_key rejects a second active job
+            job["dedupe_key"] = f"{name}:{sorted((payload or {}).items())}"
+            try:
+                return str(self.collection.insert_one(job).inserted_id)
+            except DuplicateKeyError:
+                existing = self.collection.find_one({"dedupe_key": job["dedupe_key"]}, {"_id": 1})
+                if existing:
+                    return str(existing["_id"])
+                job.pop("_id", None)
+        return str(self.collection.insert_one(job).inserted_id)
+
+    def get(self, job_id):
+        """Return a job by ID, or None"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        return self.collection.find_one({"_id": ObjectId(job_id)})
+
+    def claim(self, worker_id):
+        """Lease the next due job to worker_id, or return None when there is none"""
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lte": now},
+                 "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+            ]},
+            {"$set": {
+                "status": "running",
+                "worker": worker_id,
+                "started_at": now,
+                "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                "updated_at": now,
+            }, "$inc": {"attempts": 1}},
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def reap(self):
+        """Fail jobs whose last allowed attempt outlived its lease"""
+        now = datetime.utcnow()
+        return self.collection.update_many(
+            {"status": "running", "lease_expires_at": {"$lte": now},
+             "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {"$set": {"status": "failed", "error": "Visibility timeout expired", "finished_at": now,
+                      "updated_at": now},
+             "$unset": {"dedupe_key": ""}},
+        ).modified_count
+
+    def renew_lease(self, job, worker_id):
+        """Push back the lease on a job this worker is running; False once it lost the job"""
+        now = datetime.utcnow()
+        return self.collection.update_one(
+            {"_id": job["_id"], "worker": worker_id, "status": "running"},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.visibility_timeout), "updated_at": now}}
+        ).matched_count == 1
+
+    def _heartbeat(self, job, worker_id, done):
+        # Renew well before expiry so one slow write does not let the lease lapse
+        while not done.wait(self.visibility_timeout / 3):
+            try:
+                if not self.renew_lease(job, worker_id):
+                    logger.warning("Job %s (%s) lost its lease on %s", job["_id"], job["name"], worker_id)
+                    return
+            except PyMongoError:
+                logger.exception("Could not renew the lease on job %s", job["_id"])
+
+    def run(self, job, worker_id):
+        """Run one claimed job and record its outcome"""
+        started = time.perf_counter()
+        metrics.observe('job_wait_seconds', (datetime.utcnow() - job["created_at"]).total_seconds(),
+                        buckets=JOB_BUCKETS, job=job["name"])
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, worker_id, done), name='job-lease-heartbeat', daemon=True
+        )
+        heartbeat.start()
+        try:
+            with self.app.app_context():
+                result = self._tasks[job["name"]](job.get("payload") or {})
+        except Exception as e:
+            done.set()
+            metrics.inc('job_failures_total', job=job["name"])
+            logger.exception("Job %s (%s) failed on attempt %d", job["_id"], job["name"], job["attempts"])
+            self._finish_failed(job, worker_id, e)
+            outcome = 'failed'
+        else:
+            done.set()
+            now = datetime.utcnow()
+            self.collection.update_one(
+                {"_id": job["_id"], "worker": worker_id},
+                {"$set": {"status": "succeeded", "result": result, "finished_at": now, "updated_at": now},
+                 "$unset": {"lease_expires_at": "", "dedupe_key": ""}}
+            )
+            outcome = 'succeeded'
+        metrics.observe('job_duration_seconds', time.perf_counter() - started,
+                        buckets=JOB_BUCKETS, job=job["name"], outcome=outcome)
+
+    def _finish_failed(self, job, worker_id, error):
+        now = datetime.utcnow()
+        update = {"last_error": f"{type(error).__name__}: {error}",
+                  "traceback": traceback.format_exc(limit=5), "updated_at": now}
+        if job["attempts"] < job.get("max_attempts", self.max_attempts):
+            update.update(status="queued", run_at=now + timedelta(seconds=2 ** job["attempts"]))
+            unset = {"lease_expires_at": ""}
+        else:
+            update.update(status="failed", error=update["last_error"], finished_at=now)
+            unset = {"lease_expires_at": "", "dedupe_key": ""}
+        self.collection.update_one(
+            {"_id": job["_id"], "worker": worker_id}, {"$set": update, "$unset": unset}
+        )
+
+    def work(self, worker_id=None, stop=None):
+        """Claim and run jobs until stop is set"""
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        stop = stop or self._stop
+        last_reap = 0.0
+        while not stop.is_set():
+            try:
+                if time.monotonic() - last_reap > self.visibility_timeout / 2:
+                    self.reap()
+                    last_reap = time.monotonic()
+                job = self.claim(worker_id)
+            except PyMongoError:
+                logger.exception("Job worker %s could not reach the queue", worker_id)
+                stop.wait(self.poll_interval * 5)
+                continue
+            if job is None:
+                stop.wait(self.poll_interval)
+                continue
+            try:
+                if job["name"] not in self._tasks:
+                    self._finish_failed(job, worker_id, LookupError(f"No handler for {job['name']}"))
+                else:
+                    self.run(job, worker_id)
+            except Exception:
+                # Recording the outcome failed; the lease expires and the job is
+                # retried or reaped, but this thread must keep serving the queue
+                logger.exception("Job worker %s could not record the outcome of job %s",
+                                 worker_id, job["_id"])
+                stop.wait(self.poll_interval)
+
+    def start(self):
+        """Start this process's worker threads if they are not running"""
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self.work, name=f'job-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stats(self):
+        """Job counts per status and the age of the oldest due job"""
+        # One index-only count per status; finished jobs expire through a TTL index
+        counts = {status: self.collection.count_documents({"status": status}) for status in JOB_STATUSES}
+        oldest = self.collection.find_one(
+            {"status": "queued", "run_at": {"$lte": datetime.utcnow()}}, {"run_at": 1},
+            sort=[("run_at", 1)]
+        )
+        age = (datetime.utcnow() - oldest["run_at"]).total_seconds() if oldest else 0.0
+        return {"counts": counts, "oldest_queued_seconds": age}
+
+    def collect_metrics(self):
+        """Queue depth in the shape expected by Metrics.add_collector"""
+        try:
+            stats = self.stats()
+        except PyMongoError:
+            return []
+        return [
+            ("jobs", "gauge", "Background jobs by status",
+             [({"status": status}, count) for status, count in stats["counts"].items()]),
+            ("job_oldest_queued_seconds", "gauge", "Age of the oldest job waiting to run",
+             [({}, stats["oldest_queued_seconds"])]),
+        ]
+
+
+job_queue = JobQueue()
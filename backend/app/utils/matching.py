@@ -0,0 +1,273 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from scipy import sparse
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+from app.utils.jobs import job_queue
+
+logger = logging.getLogger(__name__)
+
+MATCH_USER_TYPES = ["student", "faculty"]
+
+
+class MatchScorer:
+    """IDF-weighted cosine similarity over a sparse user x interest matrix
+
+    Each user is a row of IDF weights for their interests, L2-normalised.
+    Per candidate type the rows are also kept by column, which makes each
+    interest's column its posting list, so a query only reads the postings
+    of its own interests and scores only candidates sharing one of them.
+    Rare interests shared with a candidate count for more than common ones.
+    """
+
+    def __init__(self, users):
+        self.vocabulary = {}
+        self.user_ids = []
+        self.row_of = {}
+        rows, cols, types = [], [], []
+        for user in users:
+            interests = {i for i in user.get("research_interests") or [] if isinstance(i, str) and i}
+            if not interests:
+                continue
+            row = len(self.user_ids)
+            self.user_ids.append(user["_id"])
+            self.row_of[user["_id"]] = row
+            types.append(user.get("user_type"))
+            for interest in interests:
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(interest, len(self.vocabulary)))
+
+        self.interests = np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=object)
+        shape = (len(self.user_ids), len(self.vocabulary))
+        self.membership = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape
+        )
+        document_frequency = np.bincount(cols, minlength=shape[1])
+        self.idf = (np.log((1 + shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.weights = self._normalise(self.membership @ sparse.diags(self.idf))
+
+        types = np.array(types, dtype=object)
+        self.rows_by_type = {t: np.flatnonzero(types == t) for t in set(types.tolist())}
+        # interest -> (candidate position, weight) posting lists per candidate type
+        self.postings_by_type = {t: self.weights[rows].tocsc() for t, rows in self.rows_by_type.items()}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def load(cls, db):
+        """Build a scorer from every user with at least one research interest"""
+        # The user_type bound keeps this on the user_type_research_interests index
+        return cls(db.users.find(
+            {"user_type": {"$in": MATCH_USER_TYPES}, "research_interests.0": {"$exists": True}},
+            {"user_type": 1, "research_interests": 1}
+        ))
+
+    @staticmethod
+    def _normalise(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+    def query_weights(self, interests):
+        """Columns and weights of a set of interests, weighted like the matrix rows"""
+        columns = np.array(sorted({self.vocabulary[i] for i in interests if i in self.vocabulary}), dtype=int)
+        weights = self.idf[columns]
+        norm = np.sqrt(np.dot(weights, weights))
+        return columns, weights / norm if norm else weights
+
+    def posting_scores(self, candidate_type, columns, weights):
+        """(candidate positions, scores) for candidates in the given interests' postings
+
+        Candidates sharing no interest are never read; each posting adds its
+        weight times the query weight to its candidate's score.
+        """
+        postings = self.postings_by_type[candidate_type]
+        starts, ends = postings.indptr[columns], postings.indptr[columns + 1]
+        if not (ends - starts).sum():
+            return np.array([], dtype=int), np.array([], dtype=np.float64)
+        positions = np.concatenate([postings.indices[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate([
+            postings.data[s:e].astype(np.float64) * w for s, e, w in zip(starts, ends, weights)
+        ])
+        positions, inverse = np.unique(positions, return_inverse=True)
+        return positions, np.bincount(inverse, weights=contributions)
+
+    def _top_rows(self, scores, candidates, exclude, k):
+        """Best k (candidate row, score) pairs, highest score first, ties by ID"""
+        if exclude is not None:
+            scores[candidates == exclude] = 0
+        positive = np.flatnonzero(scores > 0)
+        if len(positive) > k:
+            positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+            # argpartition splits ties arbitrarily, so widen to every tied score
+            positive = np.flatnonzero(scores >= scores[positive].min())
+        ranked = sorted(positive, key=lambda i: (-scores[i], str(self.user_ids[candidates[i]])))
+        return [(candidates[i], float(scores[i])) for i in ranked[:k]]
+
+    def common_interests(self, interests, row):
+        start, end = self.membership.indptr[row], self.membership.indptr[row + 1]
+        return sorted(set(self.interests[self.membership.indices[start:end]]) & set(interests))
+
+    def top_matches(self, user_id, interests, candidate_type, limit=20, offset=0):
+        """Return [(candidate_id, score, common_interests)] for one page of best matches"""
+        candidates = self.rows_by_type.get(candidate_type)
+        if candidates is None or not len(candidates):
+            return []
+        positions, scores = self.posting_scores(candidate_type, *self.query_weights(interests))
+        top = self._top_rows(scores, candidates[positions], self.row_of.get(user_id), offset + limit)[offset:]
+        return [
+            (self.user_ids[row], score, self.common_interests(interests, row))
+            for row, score in top
+        ]
+
+    def top_matches_for_all(self, user_type, candidate_type, k=20, block_size=256):
+        """Yield (user_id, [(candidate_id, score, common_interests)]) for every user_type user
+
+        Users are scored a block at a time against all candidates, so memory
+        stays at block_size x candidates scores.
+        """
+        users = self.rows_by_type.get(user_type, np.array([], dtype=int))
+        candidates = self.rows_by_type.get(candidate_type)
+        if candidates is None or not len(candidates):
+            return
+        candidate_weights = self.postings_by_type[candidate_type].T
+        for start in range(0, len(users), block_size):
+            block = users[start:start + block_size]
+            scores = (self.weights[block] @ candidate_weights).toarray()
+            for offset, row in enumerate(block):
+                start_, end = self.membership.indptr[row], self.membership.indptr[row + 1]
+                interests = self.interests[self.membership.indices[start_:end]].tolist()
+                yield self.user_ids[row], [
+                    (self.user_ids[candidate], score, self.common_interests(interests, candidate))
+                    for candidate, score in self._top_rows(scores[offset], candidates, row, k)
+                ]
+
+
+class MatchScorerCache:
+    """Per-process MatchScorer, rebuilt once it is older than MATCH_SCORER_TTL
+
+    Only the first build blocks. After that an expired scorer keeps serving
+    while a single background thread builds its replacement. The same TTL
+    bounds how old a stored match list may be before it is scored live.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._scorer = None
+        self._reset_process()
+        os.register_at_fork(after_in_child=self._reset_process)
+
+    def _reset_process(self):
+        # A rebuild thread does not survive fork; its lock must not either
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._recompute_lock = threading.Lock()
+        self._recompute_requested_at = None
+
+    def init_app(self, app):
+        self.ttl = app.config.get('MATCH_SCORER_TTL', self.ttl)
+
+    def get(self, db):
+        scorer = self._scorer
+        if scorer is None:
+            with self._lock:
+                if self._scorer is None:
+                    self._scorer = MatchScorer.load(db)
+                return self._scorer
+        if time.monotonic() - scorer.built_at > self.ttl:
+            with self._lock:
+                start = not self._rebuilding
+                self._rebuilding = True
+            if start:
+                threading.Thread(target=self._rebuild, args=(db,), name='match-scorer-rebuild',
+                                 daemon=True).start()
+        return scorer
+
+    def _rebuild(self, db):
+        try:
+            self._scorer = MatchScorer.load(db)
+        except Exception:
+            # The stale scorer keeps serving; the next request retries
+            logger.exception("Rebuilding the match scorer failed")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def invalidate(self):
+        self._scorer = None
+
+    def request_recompute(self, k):
+        """Queue a recompute-matches job, at most once per TTL from this process"""
+        now = time.monotonic()
+        with self._recompute_lock:
+            requested = self._recompute_requested_at
+            if requested is not None and now - requested < self.ttl:
+                return
+            self._recompute_requested_at = now
+        try:
+            # dedupe keeps one job in the queue however many workers ask
+            job_queue.enqueue('recompute-matches', {"top": k}, dedupe=True)
+        except PyMongoError:
+            logger.exception("Could not queue a match recompute")
+
+
+match_scorer = MatchScorerCache()
+
+MATCHES_COLLECTION = 'user_matches'
+
+
+def stored_top_matches(db, user_id, user_type, limit=20, offset=0, max_age=None):
+    """One page of a user's precomputed matches as [(candidate_id, score, common_interests)]
+
+    Returns None when the page cannot be answered from user_matches: the
+    user has no stored list, the list is older than max_age seconds, or the
+    page reaches past the top k that were kept. The caller then scores live.
+    A stale list also queues a recompute.
+    """
+    stored = db[MATCHES_COLLECTION].find_one({"_id": user_id})
+    if not stored or stored.get("user_type") != user_type:
+        return None
+    computed_at = stored.get("computed_at")
+    if max_age is not None and (computed_at is None
+                                or datetime.utcnow() - computed_at > timedelta(seconds=max_age)):
+        match_scorer.request_recompute(stored.get("k", 20))
+        return None
+    matches = stored.get("matches") or []
+    # A list shorter than k holds every candidate, so any page is answerable
+    if offset + limit > stored.get("k", 0) and len(matches) >= stored.get("k", 0):
+        return None
+    return [
+        (match["user_id"], match["match_score"], match["common_interests"])
+        for match in matches[offset:offset + limit]
+    ]
+
+
+def recompute_matches(db, k=20, block_size=256):
+    """Score every user against every candidate and store each user's top k matches"""
+    scorer = MatchScorer.load(db)
+    computed_at = datetime.utcnow()
+    written = 0
+    for user_type, candidate_type in (("student", "faculty"), ("faculty", "student")):
+        operations = []
+        for user_id, matches in scorer.top_matches_for_all(user_type, candidate_type, k, block_size):
+            written += 1
+            operations.append(ReplaceOne({"_id": user_id}, {
+                "user_type": user_type,
+                "k": k,
+                "computed_at": computed_at,
+                "matches": [
+                    {"user_id": candidate_id, "match_score": round(score, 4), "common_interests": common}
+                    for candidate_id, score, common in matches
+                ],
+            }, upsert=True))
+            if len(operations) >= 1000:
+                db[MATCHES_COLLECTION].bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            db[MATCHES_COLLECTION].bulk_write(operations, ordered=False)
+    # Users who no longer have interests, or no longer exist, keep no list
+    db[MATCHES_COLLECTION].delete_many({"computed_at": {"$ne": computed_at}})
+    return written
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from pymongo import MongoClient, monitoring
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters: connections checked out, waiters and wait time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checked_out = 0
+            self.waiting = 0
+            self.open_connections = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "wait_queue": self.waiting,
+                "open_connections": self.open_connections,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, 'started', time.perf_counter())
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+def client_options(config):
+    """MongoClient keyword arguments built from the MONGO_* settings in Config"""
+    options = {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": config.get("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000),
+        "connectTimeoutMS": config.get("MONGO_CONNECT_TIMEOUT_MS", 20000),
+        "socketTimeoutMS": config.get("MONGO_SOCKET_TIMEOUT_MS"),
+    }
+    if config.get("MONGO_COMPRESSORS"):
+        options["compressors"] = config["MONGO_COMPRESSORS"]
+    return {key: value for key, value in options.items() if value is not None}
+
+
+class Mongo:
+    """Owns one MongoClient per process, created lazily after any fork
+
+    A client inherited from a pre-forking master shares its sockets with
+    every worker, so each process builds its own on first use.
+    """
+
+    def __init__(self):
+        self.uri = None
+        self.db_name = None
+        self.options = {}
+        self.listeners = []
+        self.pool_stats = PoolStats()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app, event_listeners=()):
+        uri = app.config.get("MONGO_URI") or "mongodb://localhost:27017/"
+        options = client_options(app.config)
+        listeners = [*event_listeners, self.pool_stats]
+        with self._lock:
+            if (uri, options, listeners) != (self.uri, self.options, self.listeners):
+                # A client built from the previous settings would keep serving
+                # the old server and pool; the next access builds a new one
+                self._client = None
+                self._pid = None
+            self.uri = uri
+            self.options = options
+            self.listeners = listeners
+            self.db_name = app.config.get("MONGO_DBNAME") or "yourdbname"
+        app.db = LazyDatabase(self)
+
+    def _after_fork(self):
+        # Drop, never close, the parent's client: its sockets belong to the parent
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.pool_stats.reset()
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._client = MongoClient(
+                        self.uri, event_listeners=self.listeners, **self.options
+                    )
+                    self._pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    def stats(self):
+        """Pool statistics for this process plus its configured limits"""
+        return {
+            "pid": os.getpid(),
+            "max_pool_size": self.options.get("maxPoolSize"),
+            **self.pool_stats.snapshot(),
+        }
+
+    def collect_metrics(self):
+        """Pool statistics in the shape expected by Metrics.add_collector"""
+        stats = self.stats()
+        return [
+            ("mongo_pool_checked_out", "gauge", "Connections currently checked out",
+             [({}, stats["checked_out"])]),
+            ("mongo_pool_wait_queue", "gauge", "Threads waiting for a connection",
+             [({}, stats["wait_queue"])]),
+            ("mongo_pool_open_connections", "gauge", "Open pooled connections",
+             [({}, stats["open_connections"])]),
+            ("mongo_pool_max_size", "gauge", "Configured maxPoolSize",
+             [({}, stats["max_pool_size"] or 0)]),
+            ("mongo_pool_checkouts_total", "counter", "Connection checkouts",
+             [({}, stats["checkouts"])]),
+            ("mongo_pool_checkout_failures_total", "counter", "Failed connection checkouts",
+             [({}, stats["checkout_failures"])]),
+            ("mongo_pool_wait_seconds_total", "counter", "Time spent waiting for a connection",
+             [({}, stats["wait_seconds_total"])]),
+            ("mongo_pool_wait_seconds_max", "gauge", "Longest wait for a connection",
+             [({}, stats["wait_seconds_max"])]),
+        ]
+
+
+class LazyDatabase:
+    """Stands in for app.db, resolving to the current process's database"""
+
+    def __init__(self, mongo):
+        self._mongo = mongo
+
+    def __getattr__(self, name):
+        return getattr(self._mongo.db, name)
+
+    def __getitem__(self, name):
+        return self._mongo.db[name]
+
+
+mongo = Mongo()
@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from flask import Response, g, request
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Records the Mongo commands issued by the current request thread
+
+    PyMongo publishes command events on the thread that runs the operation,
+    so thread-local counters are enough to attribute commands to a request.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self):
+        self._local.commands = 0
+        self._local.documents = 0
+        self._local.seconds = 0.0
+        self._local.breakdown = defaultdict(lambda: [0, 0.0])
+
+    @property
+    def commands(self):
+        return getattr(self._local, 'commands', 0)
+
+    @property
+    def documents(self):
+        return getattr(self._local, 'documents', 0)
+
+    @property
+    def seconds(self):
+        return getattr(self._local, 'seconds', 0.0)
+
+    @property
+    def breakdown(self):
+        """{command name: [count, seconds]} for the current request"""
+        return dict(getattr(self._local, 'breakdown', {}))
+
+    def started(self, event):
+        self._local.commands = self.commands + 1
+
+    def succeeded(self, event):
+        self._record(event, _documents_returned(event.reply))
+
+    def failed(self, event):
+        self._record(event, 0)
+
+    def _record(self, event, documents):
+        if not hasattr(self._local, 'breakdown'):
+            return
+        seconds = event.duration_micros / 1e6
+        self._local.documents += documents
+        self._local.seconds += seconds
+        entry = self._local.breakdown[event.command_name]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _documents_returned(reply):
+    cursor = reply.get('cursor') if isinstance(reply, dict) else None
+    if isinstance(cursor, dict):
+        return len(cursor.get('firstBatch') or cursor.get('nextBatch') or [])
+    return 0
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """In-process metric registry rendered in the Prometheus text format
+
+    Every worker process keeps its own registry, so scrape each worker or
+    aggregate across them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [buckets, [0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[1][i] += 1
+            histogram[2] += value
+            histogram[3] += 1
+
+    def add_collector(self, collector):
+        """Register a callable returning [(name, kind, help, [(labels, value)])] at scrape time"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        by_name = defaultdict(list)
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                by_name[name].append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), (buckets, counts, total, count) in self._histograms.items():
+                for bound, bucket_count in zip(buckets, counts):
+                    by_name[name].append(
+                        f"{name}_bucket{_format_labels(labels + (('le', bound),))} {bucket_count}"
+                    )
+                by_name[name].append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                by_name[name].append(f"{name}_sum{_format_labels(labels)} {total}")
+                by_name[name].append(f"{name}_count{_format_labels(labels)} {count}")
+            helps = dict(self._help)
+
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                helps[name] = (kind, help_text)
+                by_name[name].extend(
+                    f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}"
+                    for labels, value in samples
+                )
+
+        for name in sorted(by_name):
+            if name in helps:
+                kind, help_text = helps[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.extend(by_name[name])
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe('http_request_duration_seconds', 'histogram', 'Request latency by blueprint and route')
+metrics.describe('db_commands_total', 'counter', 'Mongo commands issued by requests')
+metrics.describe('db_documents_returned_total', 'counter', 'Documents returned by Mongo to requests')
+metrics.describe('db_time_seconds_total', 'counter', 'Time requests spent waiting on Mongo')
+metrics.describe('slow_requests_total', 'counter', 'Requests slower than SLOW_REQUEST_MS')
+
+
+def init_request_stats(app, counter):
+    """Record per-request latency and Mongo usage, and serve them at /metrics
+
+    The number of DB commands each request issued is also returned in the
+    X-DB-Commands header.
+    """
+    slow_request_ms = app.config.get('SLOW_REQUEST_MS')
+
+    @app.before_request
+    def start_request_stats():
+        counter.reset()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_stats(response):
+        response.headers['X-DB-Commands'] = str(counter.commands)
+        if request.endpoint == 'metrics' or 'request_started' not in g:
+            return response
+
+        elapsed = time.perf_counter() - g.request_started
+        labels = {
+            "blueprint": request.blueprint or '',
+            "route": request.url_rule.rule if request.url_rule else 'unmatched',
+        }
+        metrics.observe('http_request_duration_seconds', elapsed,
+                        method=request.method, status=response.status_code, **labels)
+        metrics.inc('db_commands_total', counter.commands, **labels)
+        metrics.inc('db_documents_returned_total', counter.documents, **labels)
+        metrics.inc('db_time_seconds_total', counter.seconds, **labels)
+
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            metrics.inc('slow_requests_total', **labels)
+            breakdown = ', '.join(
+                f"{name} x{count} {seconds * 1000:.1f}ms"
+                for name, (count, seconds) in sorted(counter.breakdown.items())
+            )
+            logger.warning(
+                "Slow request %s %s -> %s in %.1fms; mongo: %d commands, %d docs, %.1fms [%s]",
+                request.method, request.path, response.status_code, elapsed * 1000,
+                counter.commands, counter.documents, counter.seconds * 1000, breakdown
+            )
+        return response
+
+    if app.config.get('METRICS_ENABLED', True):
+        @app.route('/metrics', endpoint='metrics')
+        def metrics_endpoint():
+            return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,182 @@
+import re
+from pymongo import UpdateOne
+
+# Fields maintained on every user document so directory search can use a
+# multikey index instead of scanning name/bio/research_interests with $regex.
+SEARCH_TERMS_FIELD = 'search_terms'
+SEARCH_NAME_TERMS_FIELD = 'search_name_terms'
+SEARCH_SOURCE_FIELDS = ('name', 'bio', 'research_interests')
+# MinHash signature and LSH band keys maintained by app.utils.similarity
+SIMILARITY_SIGNATURE_FIELD = 'text_minhash'
+SIMILARITY_BANDS_FIELD = 'text_bands'
+INDEX_PROJECTION = {
+    SEARCH_TERMS_FIELD: 0, SEARCH_NAME_TERMS_FIELD: 0,
+    SIMILARITY_SIGNATURE_FIELD: 0, SIMILARITY_BANDS_FIELD: 0,
+}
+
+NAME_WEIGHT = 3
+MIN_STEM_LENGTH = 3
+MAX_QUERY_TERMS = 10
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'the', 'to', 'with', 'i', 'my', 'we', 'our'
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_SUFFIXES = (
+    'ational', 'ization', 'fulness', 'ousness', 'iveness', 'ation', 'ment',
+    'ness', 'ing', 'ied', 'er', 'ed', 'ly'
+)
+
+# What stem() can take off the end of a word: a suffix or a dropped final
+# "e", either one possibly followed by a plural ending
+_STRIPPED_ENDINGS = tuple(sorted({
+    suffix + plural for suffix in _SUFFIXES + ('e', '') for plural in ('', 's', 'es')
+} - {''}))
+
+
+def _singular(word):
+    # Plurals are stripped first, as in Porter step 1a, so "classes" and
+    # "class" share a stem and "ss", "us" and "is" endings are left alone
+    if word.endswith('ies') and len(word) - 3 >= MIN_STEM_LENGTH:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')) and len(word) - 1 >= MIN_STEM_LENGTH:
+        return word[:-1]
+    return word
+
+
+def stem(word):
+    """Reduce a lowercase word to a light suffix-stripped stem"""
+    if len(word) <= MIN_STEM_LENGTH or word.isdigit():
+        return word
+    word = _singular(word)
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            word = word[:-len(suffix)]
+            if suffix == 'ied':
+                word += 'y'
+            break
+    if word.endswith('e') and len(word) > MIN_STEM_LENGTH + 1:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split free text into lowercase, non-stopword tokens"""
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(t for t in text if isinstance(t, str))
+    return [t for t in _TOKEN_RE.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+def index_terms(document):
+    """Compute the search index fields for a user document"""
+    name_terms = {stem(t) for t in tokenize(document.get('name'))}
+    terms = set(name_terms)
+    for field in ('bio', 'research_interests'):
+        terms.update(stem(t) for t in tokenize(document.get(field)))
+    return {
+        SEARCH_TERMS_FIELD: sorted(terms),
+        SEARCH_NAME_TERMS_FIELD: sorted(name_terms),
+    }
+
+
+class SearchQuery:
+    """A parsed directory search: whole-word stems plus a trailing prefix"""
+
+    def __init__(self, text):
+        tokens = tokenize(text)[:MAX_QUERY_TERMS]
+        self.prefix = tokens.pop() if tokens else None
+        self.terms = sorted({stem(t) for t in tokens})
+
+    def __bool__(self):
+        return bool(self.terms or self.prefix)
+
+    def _prefix_stems(self):
+        # A stored stem can be shorter than the word being typed ("learn" for
+        # "learni"), but only by what stem() strips: a truncation counts as an
+        # exact match when the cut-off text can begin such an ending, so "art"
+        # is not a stem of "artificial".
+        stems = {stem(self.prefix)}
+        for k in range(MIN_STEM_LENGTH, len(self.prefix) + 1):
+            rest = self.prefix[k:]
+            if not rest or any(ending.startswith(rest) for ending in _STRIPPED_ENDINGS):
+                stems.add(self.prefix[:k])
+        return sorted(stems)
+
+    def _prefix_regex(self):
+        # Tokens are [a-z0-9]+ already; escaping keeps that true if the
+        # tokenizer ever changes.
+        return '^' + re.escape(self.prefix)
+
+    def filter(self):
+        """Mongo filter matching any term; anchored regexes stay index-bounded"""
+        clauses = []
+        if self.terms:
+            clauses.append({SEARCH_TERMS_FIELD: {"$in": self.terms}})
+        if self.prefix:
+            clauses.append({SEARCH_TERMS_FIELD: {"$regex": self._prefix_regex()}})
+            stems = self._prefix_stems()
+            if stems:
+                clauses.append({SEARCH_TERMS_FIELD: {"$in": stems}})
+        return {"$or": clauses}
+
+    def _matches_prefix(self, field):
+        return {"$cond": [{"$anyElementTrue": [{"$map": {
+            "input": {"$ifNull": ["$" + field, []]},
+            "as": "t",
+            "in": {"$or": [
+                {"$regexMatch": {"input": "$$t", "regex": self._prefix_regex()}},
+                {"$in": ["$$t", self._prefix_stems()]},
+            ]},
+        }}]}, 1, 0]}
+
+    def score_expression(self):
+        """Aggregation expression ranking documents by weighted term hits"""
+        parts = []
+        for field, weight in ((SEARCH_TERMS_FIELD, 1), (SEARCH_NAME_TERMS_FIELD, NAME_WEIGHT - 1)):
+            if self.terms:
+                hits = {"$size": {"$setIntersection": [{"$ifNull": ["$" + field, []]}, self.terms]}}
+                parts.append({"$multiply": [weight, hits]})
+            if self.prefix:
+                parts.append({"$multiply": [weight, self._matches_prefix(field)]})
+        return {"$add": parts}
+
+
+def ranked_search_pipeline(query, search, limit, after=None, projection=None):
+    """Pipeline for a relevance-ranked keyset page fetching up to limit + 1 documents"""
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {"search_score": search.score_expression()}},
+    ]
+    if after:
+        pipeline.append({"$match": {"$or": [
+            {"search_score": {"$lt": after['score']}},
+            {"search_score": after['score'], "_id": {"$gt": after['id']}},
+        ]}})
+    pipeline.append({"$sort": {"search_score": -1, "_id": 1}})
+    pipeline.append({"$limit": limit + 1})
+    if projection:
+        if any(value and field != '_id' for field, value in projection.items()):
+            # An inclusion projection must keep the score the cursor is built from
+            projection = {**projection, "search_score": 1}
+        pipeline.append({"$project": projection})
+    return pipeline
+
+
+def rebuild_index(db, batch_size=1000):
+    """Recompute search fields for every user document"""
+    updated = 0
+    batch = []
+    for user in db.users.find({}, {f: 1 for f in SEARCH_SOURCE_FIELDS}):
+        batch.append(UpdateOne({"_id": user["_id"]}, {"$set": index_terms(user)}))
+        if len(batch) >= batch_size:
+            updated += db.users.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += db.users.bulk_write(batch, ordered=False).modified_count
+    return updated
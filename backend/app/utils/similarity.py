@@ -0,0 +1,118 @@
+import hashlib
+import zlib
+import numpy as np
+from pymongo import UpdateOne
+from app.utils.search import SIMILARITY_BANDS_FIELD, SIMILARITY_SIGNATURE_FIELD, stem, tokenize
+
+# Profile text compared for bio similarity. Shingles are stemmed words and
+# adjacent word pairs, so "neural networks" in one bio overlaps with
+# "network" in another even when research_interests share nothing.
+SIMILARITY_SOURCE_FIELDS = ('bio', 'research_interests', 'publications', 'current_projects')
+TEXT_KEYS = ('title', 'name', 'description', 'abstract', 'venue', 'journal')
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+MAX_CANDIDATES = 2000
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; p is the
+# first prime above 2**32 and a, b < 2**32 keep a * x + b inside uint64.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240611)
+_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def profile_texts(document):
+    """Yield the free-text strings of a profile that feed its signature"""
+    for field in SIMILARITY_SOURCE_FIELDS:
+        value = document.get(field)
+        items = value if isinstance(value, list) else [value]
+        for item in items:
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, dict):
+                yield from (item[key] for key in TEXT_KEYS if isinstance(item.get(key), str))
+
+
+def shingles(document):
+    """Stemmed words and word pairs from every text in the profile"""
+    result = set()
+    for text in profile_texts(document):
+        words = [stem(t) for t in tokenize(text)]
+        result.update(words)
+        result.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return result
+
+
+def signature(shingle_set):
+    """MinHash signature of a shingle set, or None when the set is empty"""
+    if not shingle_set:
+        return None
+    hashes = np.array([zlib.crc32(s.encode('utf-8')) for s in shingle_set], dtype=np.uint64)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def band_keys(sig):
+    """LSH bucket keys; profiles sharing any key become candidates for each other"""
+    return [
+        f"{band}:{hashlib.blake2b(sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def similarity_fields(document):
+    """Compute the similarity index fields for a user document"""
+    sig = signature(shingles(document))
+    if sig is None:
+        return {SIMILARITY_SIGNATURE_FIELD: [], SIMILARITY_BANDS_FIELD: []}
+    return {
+        SIMILARITY_SIGNATURE_FIELD: [int(v) for v in sig],
+        SIMILARITY_BANDS_FIELD: band_keys(sig),
+    }
+
+
+def similar_users(db, user_id, user_type, limit=20, offset=0, min_similarity=0.0):
+    """Return [(candidate_id, estimated_jaccard)] for users of user_type with similar text
+
+    Candidates come from the LSH bands through the (user_type, text_bands)
+    index, so only users sharing a bucket are read; they are then ranked by
+    the fraction of agreeing MinHash values.
+    """
+    user = db.users.find_one(
+        {"_id": user_id}, {SIMILARITY_SIGNATURE_FIELD: 1, SIMILARITY_BANDS_FIELD: 1}
+    )
+    if not user or not user.get(SIMILARITY_SIGNATURE_FIELD):
+        return []
+    query_sig = np.array(user[SIMILARITY_SIGNATURE_FIELD], dtype=np.uint64)
+
+    candidates = list(db.users.find(
+        {"user_type": user_type, "_id": {"$ne": user_id},
+         SIMILARITY_BANDS_FIELD: {"$in": user[SIMILARITY_BANDS_FIELD]}},
+        {SIMILARITY_SIGNATURE_FIELD: 1}
+    ).limit(MAX_CANDIDATES))
+    candidates = [c for c in candidates if len(c.get(SIMILARITY_SIGNATURE_FIELD) or []) == NUM_PERMUTATIONS]
+    if not candidates:
+        return []
+
+    signatures = np.array([c[SIMILARITY_SIGNATURE_FIELD] for c in candidates], dtype=np.uint64)
+    scores = (signatures == query_sig).mean(axis=1)
+    ranked = sorted(
+        (i for i in range(len(candidates)) if scores[i] > min_similarity),
+        key=lambda i: (-scores[i], str(candidates[i]["_id"]))
+    )
+    return [(candidates[i]["_id"], float(scores[i])) for i in ranked[offset:offset + limit]]
+
+
+def rebuild_similarity_index(db, batch_size=1000):
+    """Recompute similarity fields for every user document"""
+    updated = 0
+    batch = []
+    for user in db.users.find({}, {f: 1 for f in SIMILARITY_SOURCE_FIELDS}):
+        batch.append(UpdateOne({"_id": user["_id"]}, {"$set": similarity_fields(user)}))
+        if len(batch) >= batch_size:
+            updated += db.users.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += db.users.bulk_write(batch, ordered=False).modified_count
+    return updated
@@ -0,0 +1,56 @@
+"""Compare the WSGI (gunicorn) and ASGI (uvicorn) app factories on the same
+database. Start both servers against the same MONGO_URI first, e.g.
+
+    gunicorn -w 4 -b 127.0.0.1:8000 run:app
+    uvicorn --workers 4 --port 8001 asgi:app
+    python benchmarks/asgi_vs_wsgi.py --wsgi http://127.0.0.1:8000 \
+        --asgi http://127.0.0.1:8001 --concurrency 10 50 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from http_load import run_load  # noqa: E402
+
+PATHS = [
+    "/api/faculty?limit=20",
+    "/api/students?limit=20&department=Computer%20Science",
+    "/api/faculty?search=machine%20learn",
+    "/api/research-interests",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--wsgi', required=True)
+    parser.add_argument('--asgi', required=True)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    def make_request(i):
+        return "GET", PATHS[i % len(PATHS)], None
+
+    results = []
+    print(f"{'server':<6} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for concurrency in args.concurrency:
+        for name, url in (("wsgi", args.wsgi), ("asgi", args.asgi)):
+            summary = asyncio.run(run_load(url, make_request, args.requests, concurrency))
+            summary.update(server=name, concurrency=concurrency)
+            results.append(summary)
+            print(f"{name:<6} {concurrency:>5} {summary['throughput_rps']:>9.1f} "
+                  f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                  f"{summary['p99_ms']:>8.1f} {summary['errors']:>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Compare two load_test.py result files route by route.
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 10
+
+Exits non-zero when any route's p95 latency regressed by more than
+--threshold percent, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+
+def change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline['meta'].get('commit')}\ncandidate {candidate['meta'].get('commit')}\n")
+    print(f"{'route':<34} {'p95 old':>9} {'p95 new':>9} {'Δp95':>8} {'Δrps':>8} {'db/req':>11}")
+    regressions = []
+    for name in sorted(set(baseline['routes']) | set(candidate['routes'])):
+        old, new = baseline['routes'].get(name), candidate['routes'].get(name)
+        if not old or not new:
+            print(f"{name:<34} {'only in ' + ('candidate' if new else 'baseline'):>30}")
+            continue
+        p95_change = change(old['p95_ms'], new['p95_ms'])
+        rps_change = change(old['throughput_rps'], new['throughput_rps'])
+        db = f"{old.get('db_commands_per_request', 0):.1f}->{new.get('db_commands_per_request', 0):.1f}"
+        print(f"{name:<34} {old['p95_ms']:>9.1f} {new['p95_ms']:>9.1f} "
+              f"{p95_change:>+7.1f}% {rps_change:>+7.1f}% {db:>11}")
+        if p95_change > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\np95 regressed more than {args.threshold}% on: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Closed-loop HTTP load generator shared by the benchmark scripts.
+
+Needs httpx (pip install httpx); it is not an application dependency.
+"""
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed, db_commands=(), statuses=None):
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+    if db_commands:
+        summary["db_commands_per_request"] = sum(db_commands) / len(db_commands)
+        summary["db_commands_max"] = max(db_commands)
+    if statuses is not None:
+        summary["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return summary
+
+
+async def run_load(base_url, make_request, total, concurrency, headers=None, timeout=30.0):
+    """Issue `total` requests from `concurrency` workers and return a summary
+
+    make_request(i) returns (method, path, json_body_or_None) or
+    (method, path, json_body_or_None, headers) for request i. The app's
+    X-DB-Commands header is collected when present.
+    """
+    latencies, db_commands, statuses = [], [], Counter()
+    errors = 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                method, path, body, *extra = make_request(i)
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        method, path, json=body, headers=extra[0] if extra else None
+                    )
+                    await response.aread()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+                if response.status_code >= 500:
+                    errors += 1
+                if 'x-db-commands' in response.headers:
+                    db_commands.append(int(response.headers['x-db-commands']))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed, db_commands, statuses)
@@ -0,0 +1,73 @@
+"""Compare directory payload encoding: per-document str() + Flask's default
+provider against MongoJSONProvider.
+
+    python benchmarks/json_encoding.py --docs 5000 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+from bson import ObjectId
+from flask.json.provider import _default as flask_default
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.json_provider import dumps_bytes, orjson  # noqa: E402
+
+
+def make_documents(count):
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(),
+        "name": f"Faculty Member {i}",
+        "email": f"faculty{i}@university.edu",
+        "user_type": "faculty",
+        "department": "Computer Science",
+        "position": "Associate Professor",
+        "research_interests": ["machine learning", "databases", "distributed systems"],
+        "bio": "Works on scalable data systems. " * 8,
+        "publications": [{"title": f"Paper {j}", "year": 2015 + j} for j in range(5)],
+        "current_projects": [{"name": "Project", "started": now}],
+        "contact_info": {"office": "B-204", "phone": "555-0100"},
+        "created_at": now,
+        "updated_at": now,
+    } for i in range(count)]
+
+
+def current_path(documents):
+    # Routes used to rewrite _id in place; copy so every run does the same work
+    documents = [dict(document) for document in documents]
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    payload = {"success": True, "faculty": documents, "count": len(documents)}
+    return json.dumps(payload, default=flask_default, sort_keys=True,
+                      ensure_ascii=True, separators=(',', ':')).encode('utf-8')
+
+
+def provider_path(documents):
+    return dumps_bytes({"success": True, "faculty": documents, "count": len(documents)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs)
+    print(f"{args.docs} documents, best of {args.repeat} runs "
+          f"(orjson {'enabled' if orjson else 'not installed'})")
+    results = {}
+    for name, fn in (("str() + flask json", current_path), ("MongoJSONProvider", provider_path)):
+        best = min(timeit.repeat(lambda: fn(documents), number=1, repeat=args.repeat))
+        results[name] = best
+        print(f"  {name:<20} {best * 1000:8.2f} ms  {len(fn(documents)) / 1024:8.0f} KiB")
+    baseline, candidate = results.values()
+    print(f"  speedup              {baseline / candidate:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
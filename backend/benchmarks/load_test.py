@@ -0,0 +1,247 @@
+"""Drive every API route at a fixed concurrency and record latency, throughput
+and Mongo commands per request as JSON, so runs can be compared across commits.
+
+    python benchmarks/seed.py --db collab_bench            # once
+    python benchmarks/load_test.py --db collab_bench --concurrency 32 \
+        --requests 500 --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/compare.py results/old.json results/new.json
+
+Without --base-url the app is served in-process on a threaded Werkzeug
+server against --mongo-uri/--db. With --base-url, point it at a running
+server (gunicorn, uvicorn) that uses the same database and JWT_SECRET_KEY.
+The run exits non-zero if any route returns a 5xx, unless --allow-errors.
+Needs httpx and a reachable mongod.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token, create_refresh_token  # noqa: E402
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from http_load import run_load  # noqa: E402
+from seed import DEPARTMENTS, SEED_PASSWORD, TOPICS  # noqa: E402
+
+
+def make_config(mongo_uri, db_name, jwt_secret):
+    class BenchConfig(Config):
+        MONGO_URI = mongo_uri
+        MONGO_DBNAME = db_name
+        SECRET_KEY = Config.SECRET_KEY or jwt_secret
+        JWT_SECRET_KEY = jwt_secret
+        # Every benchmark request comes from one IP, which the auth limits would throttle
+        AUTH_ADMISSION_ENABLED = False
+    return BenchConfig
+
+
+def serve_in_process(app):
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def sample_fixtures(db, sample_size=200, seed=42):
+    """Pick the users and requests the scenarios act on
+
+    Selection depends only on the data and the seed: users are drawn with a
+    seeded RNG from _id order, which follows insertion order in seed.py, so
+    every run against the same seeded database hits the same documents.
+    """
+    rng = random.Random(seed)
+
+    def ids(user_type):
+        ordered = [str(u["_id"]) for u in db.users.find({"user_type": user_type}, {"_id": 1}).sort("_id", 1)]
+        return rng.sample(ordered, min(sample_size, len(ordered)))
+
+    students, faculty = ids("student"), ids("faculty")
+    if not students or not faculty:
+        raise SystemExit("Database has no users; run benchmarks/seed.py first")
+    busiest = next(db.collaborations.aggregate([
+        {"$group": {"_id": "$faculty_id", "n": {"$sum": 1}}},
+        {"$sort": {"n": -1, "_id": 1}}, {"$limit": 1},
+    ]), {"_id": faculty[0]})["_id"]
+    requests = [str(r["_id"]) for r in
+                db.collaborations.find({"faculty_id": busiest}, {"_id": 1}).sort("_id", 1).limit(500)]
+    email_of = {str(u["_id"]): u["email"] for u in db.users.find(
+        {"_id": {"$in": [ObjectId(s) for s in students[:50]]}}, {"email": 1})}
+    emails = [email_of[s] for s in students[:50] if s in email_of]
+    return {"students": students, "faculty": faculty, "busiest_faculty": busiest,
+            "requests": requests, "emails": emails}
+
+
+def build_scenarios(app, fixtures, run_id):
+    """Route name -> make_request(i), covering every blueprint"""
+    with app.app_context():
+        def token(user_id, user_type):
+            return {"Authorization": "Bearer " + create_access_token(
+                identity=user_id, additional_claims={"user_type": user_type})}
+        student_tokens = {s: token(s, "student") for s in fixtures["students"]}
+        faculty_tokens = {f: token(f, "faculty") for f in fixtures["faculty"]}
+        busiest = fixtures["busiest_faculty"]
+        busiest_token = token(busiest, "faculty")
+        refresh_token = {"Authorization": "Bearer " + create_refresh_token(identity=fixtures["students"][0])}
+
+    students, faculty = fixtures["students"], fixtures["faculty"]
+    requests = fixtures["requests"] or [str(ObjectId())]
+
+    def pick(values, i):
+        return values[i % len(values)]
+
+    def student(i):
+        s = pick(students, i)
+        return s, student_tokens[s]
+
+    def fac(i):
+        f = pick(faculty, i)
+        return f, faculty_tokens[f]
+
+    def topic(i):
+        return TOPICS[i % len(TOPICS)]
+
+    return {
+        # faculty_routes
+        "GET /faculty": lambda i: ("GET", "/api/faculty?limit=20", None),
+        "GET /faculty?department": lambda i: (
+            "GET", f"/api/faculty?department={pick(DEPARTMENTS, i)}", None),
+        "GET /faculty?search": lambda i: ("GET", f"/api/faculty?search={topic(i)[:-2]}", None),
+        "GET /faculty?fields": lambda i: ("GET", "/api/faculty?limit=20&fields=name,department", None),
+        "GET /faculty/<id>": lambda i: ("GET", f"/api/faculty/{pick(faculty, i)}", None),
+        "PUT /faculty/<id>": lambda i: (
+            "PUT", f"/api/faculty/{fac(i)[0]}", {"office_hours": f"Slot {i}"}, fac(i)[1]),
+        "GET /faculty/<id>/publications": lambda i: (
+            "GET", f"/api/faculty/{pick(faculty, i)}/publications?limit=10", None),
+        "GET /departments": lambda i: ("GET", "/api/departments", None),
+        # student_routes
+        "GET /students": lambda i: ("GET", "/api/students?limit=20", None),
+        "GET /students?research_interests": lambda i: (
+            "GET", f"/api/students?research_interests={topic(i)}", None),
+        "GET /students/<id>": lambda i: ("GET", f"/api/students/{pick(students, i)}", None),
+        "PUT /students/<id>": lambda i: (
+            "PUT", f"/api/students/{student(i)[0]}", {"availability": f"Slot {i}"}, student(i)[1]),
+        "GET /students/<id>/projects": lambda i: (
+            "GET", f"/api/students/{pick(students, i)}/projects?limit=10", None),
+        "GET /programs": lambda i: ("GET", "/api/programs", None),
+        "GET /research-interests": lambda i: ("GET", "/api/research-interests", None),
+        # collaboration_routes
+        "GET /matches": lambda i: ("GET", "/api/matches", None, student(i)[1]),
+        "GET /matches/suggested": lambda i: ("GET", "/api/matches/suggested", None, student(i)[1]),
+        "GET /matches/suggested?method=text": lambda i: (
+            "GET", "/api/matches/suggested?method=text", None, student(i)[1]),
+        "GET /matches/<user_id>": lambda i: ("GET", f"/api/matches/{pick(students, i)}", None, fac(i)[1]),
+        "POST /request": lambda i: ("POST", "/api/request", {
+            "faculty_id": pick(faculty, i), "message": "Benchmark request",
+            "research_topic": topic(i)}, student(i)[1]),
+        "GET /requests/student": lambda i: ("GET", "/api/requests/student", None, student(i)[1]),
+        "GET /requests/faculty": lambda i: ("GET", "/api/requests/faculty", None, busiest_token),
+        "PUT /request/<id>/status": lambda i: (
+            "PUT", f"/api/request/{pick(requests, i)}/status",
+            {"status": ("accepted", "rejected", "pending")[i % 3]}, busiest_token),
+        "PUT /requests/status": lambda i: ("PUT", "/api/requests/status", {
+            "request_ids": requests[:200], "status": ("accepted", "rejected", "pending")[i % 3]},
+            busiest_token),
+        # export_routes
+        "GET /export/faculty": lambda i: ("GET", "/api/export/faculty?batch_size=1000", None, student(i)[1]),
+        # auth/routes
+        "POST /auth/login": lambda i: ("POST", "/api/auth/login", {
+            "email": pick(fixtures["emails"], i), "password": SEED_PASSWORD}),
+        "POST /auth/register/student": lambda i: ("POST", "/api/auth/register/student", {
+            "email": f"bench-{run_id}-s{i}@bench.university.edu", "password": SEED_PASSWORD,
+            "name": f"Bench Student {i}", "research_interests": [topic(i)]}),
+        "POST /auth/register/faculty": lambda i: ("POST", "/api/auth/register/faculty", {
+            "email": f"bench-{run_id}-f{i}@bench.university.edu", "password": SEED_PASSWORD,
+            "name": f"Bench Faculty {i}", "research_interests": [topic(i)]}),
+        "POST /auth/refresh": lambda i: ("POST", "/api/auth/refresh", None, refresh_token),
+        "GET /auth/me": lambda i: ("GET", "/api/auth/me", None, student(i)[1]),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI', 'mongodb://localhost:27017/'))
+    parser.add_argument('--db', default='collab_bench')
+    parser.add_argument('--base-url', help="benchmark an already running server instead")
+    parser.add_argument('--jwt-secret', default=os.environ.get('JWT_SECRET_KEY') or 'benchmark-secret')
+    parser.add_argument('--requests', type=int, default=500, help="requests per route")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--routes', nargs='*', help="only run routes containing these substrings")
+    parser.add_argument('--output', help="write machine-readable results to this JSON file")
+    parser.add_argument('--seed', type=int, default=42, help="seed for picking fixture users")
+    parser.add_argument('--allow-errors', action='store_true',
+                        help="exit 0 even when a route returned 5xx or failed to connect")
+    args = parser.parse_args()
+
+    app = create_app(make_config(args.mongo_uri, args.db, args.jwt_secret))
+    fixtures = sample_fixtures(MongoClient(args.mongo_uri)[args.db], seed=args.seed)
+    scenarios = build_scenarios(app, fixtures, run_id=int(time.time()))
+    if args.routes:
+        scenarios = {name: fn for name, fn in scenarios.items()
+                     if any(part in name for part in args.routes)}
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = serve_in_process(app)
+
+    results = {}
+    print(f"{'route':<34} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'db/req':>7} {'err':>5}")
+    try:
+        for name, make_request in scenarios.items():
+            summary = asyncio.run(run_load(base_url, make_request, args.requests, args.concurrency))
+            results[name] = summary
+            print(f"{name:<34} {summary['throughput_rps']:>8.1f} {summary['p50_ms']:>8.1f} "
+                  f"{summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f} "
+                  f"{summary.get('db_commands_per_request', 0):>7.1f} {summary['errors']:>5}")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                "meta": {
+                    "commit": git_commit(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "server": args.base_url or "in-process werkzeug",
+                    "database": args.db,
+                    "requests_per_route": args.requests,
+                    "concurrency": args.concurrency,
+                    "seed": args.seed,
+                },
+                "routes": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    # A route that errors is a bug to fix, not a baseline to compare against
+    failing = sorted(name for name, summary in results.items() if summary['errors'])
+    if failing and not args.allow_errors:
+        raise SystemExit("Routes with errors: " + ", ".join(failing))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Seed a Mongo database with a deterministic synthetic university.
+
+    python benchmarks/seed.py --mongo-uri mongodb://localhost:27017/ \
+        --db collab_bench --students 50000 --faculty 5000 --collaborations 500000
+
+Every user's password is SEED_PASSWORD. The derived search fields, stored
+matches and registered indexes are built as well, so the database looks
+like one maintained by the application.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from passlib.hash import pbkdf2_sha256
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.utils.indexes import ensure_indexes  # noqa: E402
+from app.utils.matching import recompute_matches  # noqa: E402
+from app.utils.search import index_terms  # noqa: E402
+from app.utils.similarity import similarity_fields  # noqa: E402
+
+SEED_PASSWORD = "benchmark-password"
+BATCH_SIZE = 10000
+
+DEPARTMENTS = [
+    "Computer Science", "Electrical Engineering", "Mechanical Engineering", "Physics",
+    "Mathematics", "Chemistry", "Biology", "Economics", "Psychology", "Civil Engineering",
+    "Information Technology", "Electronics", "Chemical Engineering", "Statistics",
+    "Data Science", "Biotechnology", "Materials Science", "Aerospace Engineering",
+]
+PROGRAMS = ["B.Tech", "M.Tech", "B.Sc", "M.Sc", "PhD", "MBA", "B.E", "M.E"]
+POSITIONS = ["Assistant Professor", "Associate Professor", "Professor", "Lecturer"]
+TOPICS = [
+    "machine learning", "deep learning", "neural networks", "computer vision",
+    "natural language processing", "databases", "distributed systems", "robotics",
+    "quantum computing", "cryptography", "computer networks", "operating systems",
+    "compilers", "human computer interaction", "bioinformatics", "signal processing",
+    "control systems", "power electronics", "thermodynamics", "fluid mechanics",
+    "materials", "nanotechnology", "renewable energy", "structural engineering",
+    "econometrics", "game theory", "cognitive science", "genomics", "epidemiology",
+    "optimization", "statistics", "data mining", "information retrieval",
+    "reinforcement learning", "embedded systems", "vlsi design", "wireless communication",
+    "cloud computing", "software engineering", "computer graphics",
+]
+WORDS = (
+    "research focuses on scalable methods for data analysis with applications in "
+    "healthcare energy education and industry using novel algorithms and systems"
+).split()
+
+
+def zipf_choice(rng, items, k):
+    """Pick k distinct items, favouring the head of the list like real interests"""
+    weights = [1 / (rank + 1) for rank in range(len(items))]
+    chosen = set()
+    while len(chosen) < k:
+        chosen.add(rng.choices(items, weights)[0])
+    return sorted(chosen)
+
+
+def make_user(rng, i, user_type, password_hash, now):
+    interests = zipf_choice(rng, TOPICS, rng.randint(1, 5))
+    user = {
+        "email": f"{user_type}{i}@bench.university.edu",
+        "password": password_hash,
+        "name": f"{rng.choice(['Asha', 'Ravi', 'Meera', 'Kiran', 'Sam', 'Lee', 'Ana'])} "
+                f"{rng.choice(['Shah', 'Iyer', 'Rao', 'Patel', 'Kim', 'Garcia', 'Singh'])} {i}",
+        "user_type": user_type,
+        "profile_image": "",
+        "department": rng.choice(DEPARTMENTS),
+        "research_interests": interests,
+        "bio": " ".join(rng.choices(WORDS, k=30)) + " " + " ".join(interests),
+        "publications": [
+            {"title": f"On {rng.choice(interests)} {j}", "year": rng.randint(2005, 2025)}
+            for j in range(rng.randint(0, 12 if user_type == "faculty" else 2))
+        ],
+        "current_projects": [{"name": f"{rng.choice(interests).title()} project"}],
+        "availability": rng.choice(["Open", "Limited", "Unavailable"]),
+        "contact_info": {"phone": f"555-{i:06d}"},
+        "created_at": now - timedelta(days=rng.randint(0, 1500)),
+        "updated_at": now,
+    }
+    if user_type == "faculty":
+        user.update(position=rng.choice(POSITIONS), lab_info={"name": "Lab"}, office_hours="Mon 2-4")
+    else:
+        user.update(program=rng.choice(PROGRAMS), year_of_study=str(rng.randint(1, 5)),
+                    skills=rng.sample(["python", "c++", "matlab", "r", "java", "sql"], 2))
+    user.update(index_terms(user))
+    user.update(similarity_fields(user))
+    return user
+
+
+def insert_batches(collection, documents, label):
+    started, batch, inserted = time.perf_counter(), [], []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= BATCH_SIZE:
+            inserted.extend(collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+    if batch:
+        inserted.extend(collection.insert_many(batch, ordered=False).inserted_ids)
+    print(f"  {label}: {len(inserted)} in {time.perf_counter() - started:.1f}s")
+    return inserted
+
+
+def seed(db, students, faculty, collaborations, seed_value=42):
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    password_hash = pbkdf2_sha256.hash(SEED_PASSWORD)
+
+    print(f"Seeding {db.name}")
+    student_ids = insert_batches(
+        db.users, (make_user(rng, i, "student", password_hash, now) for i in range(students)), "students"
+    )
+    faculty_ids = insert_batches(
+        db.users, (make_user(rng, i, "faculty", password_hash, now) for i in range(faculty)), "faculty"
+    )
+
+    def collaboration(i):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        return {
+            "student_id": str(rng.choice(student_ids)),
+            "faculty_id": str(rng.choice(faculty_ids)),
+            "message": "I would like to join your group.",
+            "research_topic": rng.choice(TOPICS),
+            "status": rng.choices(["pending", "accepted", "rejected"], [6, 2, 2])[0],
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    if student_ids and faculty_ids:
+        insert_batches(db.collaborations, (collaboration(i) for i in range(collaborations)),
+                       "collaborations")
+
+    started = time.perf_counter()
+    ensure_indexes(db)
+    recompute_matches(db)
+    print(f"  indexes and stored matches in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI', 'mongodb://localhost:27017/'))
+    parser.add_argument('--db', default='collab_bench')
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--faculty', type=int, default=5000)
+    parser.add_argument('--collaborations', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help="do not drop the database first")
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri)
+    if not args.keep:
+        client.drop_database(args.db)
+    seed(client[args.db], args.students, args.faculty, args.collaborations, args.seed)
+
+
+if __name__ == '__main__':
+    main()
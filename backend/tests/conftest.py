@@ -0,0 +1,42 @@
+import mongomock
+import pytest
+from bson import ObjectId
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test'
+    JWT_SECRET_KEY = 'test-secret-key-with-enough-bytes'
+    CACHE_BUS_ENABLED = False
+    JOB_WORKERS = 0
+    AUTH_ADMISSION_ENABLED = False
+    PASSWORD_HASH_WORKERS = 0
+    PASSWORD_HASH_ROUNDS = 1000
+    PROFILE_CACHE_SIZE = 0
+    METRICS_ENABLED = False
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    app.db = mongomock.MongoClient().db
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_header(app):
+    """Build an Authorization header for a new user of the given type"""
+    def make(user_type, user_id=None):
+        user_id = user_id or str(ObjectId())
+        with app.app_context():
+            token = create_access_token(identity=user_id, additional_claims={"user_type": user_type})
+        return user_id, {"Authorization": f"Bearer {token}"}
+    return make
@@ -0,0 +1,64 @@
+import pytest
+
+from app import create_app
+from app.auth.admission import TokenBuckets, admission_controller
+from tests.conftest import TestConfig
+
+
+@pytest.mark.parametrize("burst, per_minute", [(5, 0), (5, -1), (0, 10)])
+def test_token_buckets_reject_unusable_limits(burst, per_minute):
+    with pytest.raises(ValueError):
+        TokenBuckets(burst, per_minute, max_keys=10)
+
+
+@pytest.mark.parametrize("trusted, expected", [(0, '10.0.0.1'), (1, '203.0.113.7')])
+def test_ip_buckets_key_on_trusted_forwarded_for(trusted, expected, monkeypatch):
+    class ProxiedConfig(TestConfig):
+        AUTH_ADMISSION_ENABLED = True
+        PROXY_FIX_X_FOR = trusted
+
+    app = create_app(ProxiedConfig)
+    seen = []
+    monkeypatch.setattr(admission_controller, 'acquire', lambda ip, email=None: seen.append(ip))
+    monkeypatch.setattr(admission_controller, 'release', lambda: None)
+
+    app.test_client().post('/api/auth/login', json={}, headers={"X-Forwarded-For": "203.0.113.7"},
+                           environ_base={"REMOTE_ADDR": "10.0.0.1"})
+    assert seen == [expected]
+
+
+def test_token_bucket_allows_burst_then_refills():
+    buckets = TokenBuckets(burst=2, per_minute=60, max_keys=10)
+    for _ in range(2):
+        assert buckets.wait_time('ip', 0.0) == 0.0
+        buckets.take('ip', 0.0)
+    assert buckets.wait_time('ip', 0.0) == pytest.approx(1.0)
+    assert buckets.wait_time('ip', 0.5) == pytest.approx(0.5)
+    assert buckets.wait_time('ip', 1.0) == 0.0
+
+
+def test_token_bucket_refill_is_capped_at_burst():
+    buckets = TokenBuckets(burst=2, per_minute=60, max_keys=10)
+    buckets.take('ip', 0.0)
+    buckets.take('ip', 1000.0)
+    buckets.take('ip', 1000.0)
+    assert buckets.wait_time('ip', 1000.0) == pytest.approx(1.0)
+
+
+def test_token_buckets_are_independent_per_key():
+    buckets = TokenBuckets(burst=1, per_minute=60, max_keys=10)
+    buckets.take('a', 0.0)
+    assert buckets.wait_time('a', 0.0) > 0
+    assert buckets.wait_time('b', 0.0) == 0.0
+
+
+def test_token_buckets_forget_least_recently_used_keys():
+    buckets = TokenBuckets(burst=1, per_minute=1, max_keys=2)
+    buckets.take('a', 0.0)
+    buckets.take('b', 0.0)
+    buckets.take('a', 0.0)
+    buckets.take('c', 0.0)
+    assert len(buckets) == 2
+    # b was dropped and comes back full; a was used more recently and is kept
+    assert buckets.wait_time('b', 0.0) == 0.0
+    assert buckets.wait_time('a', 0.0) > 0
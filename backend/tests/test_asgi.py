@@ -0,0 +1,29 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token, create_refresh_token
+
+from app.asgi import AsyncApp, AsyncRequest
+
+
+def bad_tokens(app):
+    with app.app_context():
+        claims = {"user_type": "student"}
+        return {
+            "expired": create_access_token("u1", additional_claims=claims, expires_delta=timedelta(seconds=-1)),
+            "malformed": "not.a.jwt",
+            "bad signature": create_access_token("u1", additional_claims=claims)[:-4] + "abcd",
+            "refresh": create_refresh_token("u1", additional_claims=claims),
+        }
+
+
+@pytest.mark.parametrize("kind", ["expired", "malformed", "bad signature", "refresh"])
+def test_me_rejects_tokens_like_the_flask_app(app, client, kind):
+    token = bad_tokens(app)[kind]
+    flask_response = client.get('/api/auth/me', headers={"Authorization": f"Bearer {token}"})
+
+    scope = {"query_string": b"", "headers": [(b"authorization", f"Bearer {token}".encode())]}
+    status, body, _ = asyncio.run(AsyncApp(app).handle_me(AsyncRequest(scope)))
+    assert (status, body) == (flask_response.status_code, flask_response.get_json())
+    assert status == (401 if kind == "expired" else 422)
@@ -0,0 +1,135 @@
+from bson import ObjectId
+from app.api.collaboration_routes import MAX_BULK_REQUESTS, apply_request_status
+
+
+def create_request(client, auth_header, faculty_id):
+    student_id, headers = auth_header('student')
+    response = client.post('/api/request', json={"faculty_id": faculty_id, "message": "Hello"}, headers=headers)
+    assert response.status_code == 201
+    return student_id, response.get_json()['request_id']
+
+
+def test_student_creates_request(app, client, auth_header):
+    faculty_id = str(ObjectId())
+    student_id, request_id = create_request(client, auth_header, faculty_id)
+
+    stored = app.db.collaborations.find_one({"_id": ObjectId(request_id)})
+    assert stored['student_id'] == student_id
+    assert stored['status'] == 'pending'
+    assert stored['created_at'] == stored['updated_at']
+
+
+def test_faculty_cannot_create_request(client, auth_header):
+    _, headers = auth_header('faculty')
+    response = client.post('/api/request', json={"faculty_id": str(ObjectId()), "message": "Hi"}, headers=headers)
+    assert response.status_code == 403
+
+
+def test_update_request_status(app, client, auth_header):
+    faculty_id, headers = auth_header('faculty')
+    _, request_id = create_request(client, auth_header, faculty_id)
+
+    response = client.put(f'/api/request/{request_id}/status', json={"status": "accepted"}, headers=headers)
+    assert response.status_code == 200
+    assert app.db.collaborations.find_one({"_id": ObjectId(request_id)})['status'] == 'accepted'
+
+    response = client.put(f'/api/request/{request_id}/status', json={"status": "accepted"}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['message'] == 'Request already accepted'
+
+
+def test_update_request_status_errors(client, auth_header):
+    faculty_id, headers = auth_header('faculty')
+    _, request_id = create_request(client, auth_header, faculty_id)
+    _, other_headers = auth_header('faculty')
+
+    def put(rid, body, hdrs=headers):
+        return client.put(f'/api/request/{rid}/status', json=body, headers=hdrs).status_code
+
+    assert put('not-an-id', {"status": "accepted"}) == 400
+    assert put(request_id, {"status": "maybe"}) == 400
+    assert put(str(ObjectId()), {"status": "accepted"}) == 404
+    assert put(request_id, {"status": "accepted"}, other_headers) == 403
+
+
+def put_bulk(client, headers, body):
+    return client.put('/api/requests/status', json=body, headers=headers)
+
+
+def test_bulk_update_reports_each_request(app, client, auth_header):
+    faculty_id, headers = auth_header('faculty')
+    pending = create_request(client, auth_header, faculty_id)[1]
+    accepted = create_request(client, auth_header, faculty_id)[1]
+    app.db.collaborations.update_one({"_id": ObjectId(accepted)}, {"$set": {"status": "accepted"}})
+    foreign = create_request(client, auth_header, str(ObjectId()))[1]
+    missing = str(ObjectId())
+
+    response = put_bulk(client, headers, {
+        "status": "accepted",
+        "request_ids": [pending, accepted, foreign, missing, "not-an-id", pending],
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 1
+    # Repeated IDs are reported once, in request order
+    assert body["results"] == [
+        {"request_id": pending, "result": "updated"},
+        {"request_id": accepted, "result": "unchanged"},
+        {"request_id": foreign, "result": "unauthorized"},
+        {"request_id": missing, "result": "not_found"},
+        {"request_id": "not-an-id", "result": "invalid_id"},
+    ]
+    assert app.db.collaborations.find_one({"_id": ObjectId(pending)})["status"] == "accepted"
+    assert app.db.collaborations.find_one({"_id": ObjectId(foreign)})["status"] == "pending"
+
+
+def test_bulk_update_validation(client, auth_header):
+    _, headers = auth_header('faculty')
+    assert put_bulk(client, headers, {"status": "accepted"}).status_code == 400
+    assert put_bulk(client, headers, {"status": "maybe", "request_ids": [str(ObjectId())]}).status_code == 400
+    assert put_bulk(client, headers, {"status": "accepted", "request_ids": []}).status_code == 400
+    too_many = [str(ObjectId()) for _ in range(MAX_BULK_REQUESTS + 1)]
+    response = put_bulk(client, headers, {"status": "accepted", "request_ids": too_many})
+    assert response.status_code == 400
+    assert str(MAX_BULK_REQUESTS) in response.get_json()["message"]
+    _, student_headers = auth_header('student')
+    assert put_bulk(client, student_headers, {"status": "accepted", "request_ids": too_many[:1]}).status_code == 403
+
+
+def test_bulk_update_async_queues_a_job(app, client, auth_header):
+    faculty_id, headers = auth_header('faculty')
+    request_ids = [str(ObjectId()) for _ in range(MAX_BULK_REQUESTS + 1)]
+    response = put_bulk(client, headers, {"status": "rejected", "request_ids": request_ids, "async": True})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["job_url"] == f"/api/jobs/{body['job_id']}"
+    job = app.db.jobs.find_one({"_id": ObjectId(body["job_id"])})
+    assert job["name"] == "bulk-update-request-status"
+    assert job["owner_id"] == faculty_id
+    assert job["payload"] == {"faculty_id": faculty_id, "request_ids": request_ids, "status": "rejected"}
+
+
+class RacingCollection:
+    """Deletes and reassigns requests between apply_request_status's read and its write"""
+
+    def __init__(self, collection, delete_id, reassign_id):
+        self.collection, self.delete_id, self.reassign_id = collection, delete_id, reassign_id
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def bulk_write(self, operations, ordered=True):
+        self.collection.delete_one({"_id": ObjectId(self.delete_id)})
+        self.collection.update_one({"_id": ObjectId(self.reassign_id)}, {"$set": {"faculty_id": "someone"}})
+        return self.collection.bulk_write(operations, ordered=ordered)
+
+
+def test_bulk_update_reports_what_the_write_did(app, client, auth_header):
+    faculty_id, _ = auth_header('faculty')
+    kept, deleted, reassigned = (create_request(client, auth_header, faculty_id)[1] for _ in range(3))
+
+    class Db:
+        collaborations = RacingCollection(app.db.collaborations, deleted, reassigned)
+
+    results = apply_request_status(Db, faculty_id, [kept, deleted, reassigned], "accepted")
+    assert results == {kept: "updated", deleted: "not_found", reassigned: "unauthorized"}
@@ -0,0 +1,18 @@
+import pytest
+
+
+@pytest.mark.parametrize("path, key, user_type", [
+    ('/api/students', 'students', 'student'),
+    ('/api/faculty', 'faculty', 'faculty'),
+])
+def test_directory_summaries_include_bio(app, client, path, key, user_type):
+    app.db.users.insert_one({
+        "name": "Ada", "user_type": user_type, "bio": "Analytical engines",
+        "publications": [{"title": "Notes"}], "password": "hash",
+    })
+
+    response = client.get(path)
+    assert response.status_code == 200
+    [user] = response.get_json()[key]
+    assert user['bio'] == 'Analytical engines'
+    assert 'publications' not in user and 'password' not in user
@@ -0,0 +1,33 @@
+import json
+import pytest
+
+
+@pytest.mark.parametrize("batch_size", ["abc", "1.5", ""])
+def test_invalid_batch_size_is_rejected(client, auth_header, batch_size):
+    _, headers = auth_header("student")
+    response = client.get(f"/api/export/faculty?batch_size={batch_size}", headers=headers)
+    assert response.status_code == 400
+    assert response.get_json() == {"success": False, "message": "Invalid batch_size"}
+
+
+def test_invalid_resume_point_is_rejected(client, auth_header):
+    _, headers = auth_header("student")
+    response = client.get("/api/export/faculty?after=nope", headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Invalid cursor"
+
+
+def test_export_streams_and_resumes_in_id_order(app, client, auth_header):
+    ids = app.db.users.insert_many([
+        {"name": name, "user_type": "faculty", "password": "hash"} for name in ("Ada", "Grace", "Edsger")
+    ]).inserted_ids
+    _, headers = auth_header("student")
+
+    response = client.get("/api/export/faculty?batch_size=1", headers=headers)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["name"] for line in lines] == ["Ada", "Grace", "Edsger"]
+    assert all("password" not in line for line in lines)
+
+    response = client.get(f"/api/export/faculty?after={ids[0]}", headers=headers)
+    assert [json.loads(line)["name"] for line in response.get_data(as_text=True).splitlines()] == ["Grace", "Edsger"]
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+from passlib.hash import pbkdf2_sha256
+
+from app.auth.hashing import HashingBusyError, PasswordHasher, password_hasher
+
+
+def make_hasher(workers=1, timeout=30):
+    hasher = PasswordHasher()
+    hasher.rounds, hasher.workers, hasher.timeout = 1000, workers, timeout
+    return hasher
+
+
+def test_pool_hashes_in_separate_process():
+    hasher = make_hasher()
+    try:
+        stored = hasher.hash('secret')
+        assert pbkdf2_sha256.verify('secret', stored)
+        assert hasher.verify_and_update('secret', stored) == (True, None)
+        assert hasher._executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+    finally:
+        hasher._executor.shutdown()
+
+
+class SlowFuture:
+    """A hash still running in the pool when its caller gives up"""
+
+    def __init__(self):
+        self.cancel_requested = False
+        self.callbacks = []
+
+    def result(self, timeout=None):
+        raise FutureTimeoutError()
+
+    def cancel(self):
+        self.cancel_requested = True
+        return False
+
+    def add_done_callback(self, fn):
+        self.callbacks.append(fn)
+
+    def finish(self):
+        for fn in self.callbacks:
+            fn(self)
+
+
+class SlowExecutor:
+    def __init__(self):
+        self.future = SlowFuture()
+
+    def submit(self, fn, *args):
+        return self.future
+
+
+def test_timeout_is_reported_as_busy():
+    hasher = make_hasher(timeout=0.01)
+    executor = hasher._executor = SlowExecutor()
+    hasher._get_executor = lambda: executor
+
+    with pytest.raises(HashingBusyError):
+        hasher.hash('secret')
+    assert executor.future.cancel_requested
+    assert hasher.stats()['hash']['rejected'] == 1
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = make_hasher(timeout=0.01)
+    hasher._slots = threading.BoundedSemaphore(1)
+    executor = SlowExecutor()
+    hasher._get_executor = lambda: executor
+
+    with pytest.raises(HashingBusyError):
+        hasher.hash('secret')
+    # The timed-out hash still occupies the pool, so nothing more is admitted
+    assert not hasher._slots.acquire(blocking=False)
+
+    executor.future.finish()
+    assert hasher._slots.acquire(blocking=False)
+
+
+def test_login_timeout_returns_503_with_retry_after(app, client, monkeypatch):
+    app.db.users.insert_one({"email": "ada@example.com", "password": pbkdf2_sha256.hash("secret"),
+                             "name": "Ada", "user_type": "student"})
+    monkeypatch.setattr(password_hasher, 'workers', 1)
+    monkeypatch.setattr(password_hasher, '_get_executor', SlowExecutor)
+
+    response = client.post('/api/auth/login', json={"email": "ada@example.com", "password": "secret"})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(password_hasher.retry_after)
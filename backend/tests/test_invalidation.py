@@ -0,0 +1,81 @@
+from bson import ObjectId
+from app.utils.invalidation import InvalidationBus
+
+
+class FakeTailableCursor:
+    """Yields one batch per iteration, as a tailable cursor does between awaits"""
+
+    def __init__(self, batches):
+        self.batches = [list(batch) for batch in batches]
+        self.current = None
+
+    @property
+    def alive(self):
+        return bool(self.batches) or bool(self.current)
+
+    def __iter__(self):
+        self.current = self.batches.pop(0) if self.batches else []
+        return self
+
+    def __next__(self):
+        if not self.current:
+            raise StopIteration
+        return self.current.pop(0)
+
+
+class FakeCollection:
+    def __init__(self, batches):
+        self.batches = batches
+        self.queries = []
+
+    def find(self, query, **kwargs):
+        self.queries.append(query)
+        return FakeTailableCursor(self.batches)
+
+
+def make_bus(batches):
+    bus = InvalidationBus()
+    bus.await_ms = 0
+    bus.db = {bus.collection_name: FakeCollection(batches)}
+    applied, cleared = [], []
+    bus.subscribe('profiles', lambda *keys: applied.extend(keys) if keys else cleared.append(True))
+    return bus, applied, cleared
+
+
+def message(_id, key):
+    return {"_id": _id, "cache": "profiles", "keys": [key], "origin": "other", "published_at": 0}
+
+
+def test_resumes_after_last_message_regardless_of_id_order():
+    seen = ObjectId("ffffffffffffffffffffffff")
+    later_but_smaller = ObjectId("000000000000000000000001")
+    bus, applied, cleared = make_bus([[message(seen, "a"), message(later_but_smaller, "b")]])
+
+    assert bus._tail(seen) == later_but_smaller
+    assert applied == ["b"]
+    assert cleared == []
+    assert bus.collection.queries == [{}]
+
+
+def test_keeps_tailing_across_idle_batches():
+    first, second = ObjectId(), ObjectId()
+    bus, applied, _ = make_bus([[message(first, "a")], [], [message(second, "b")]])
+
+    assert bus._tail(None) == second
+    assert applied == ["a", "b"]
+
+
+def test_resyncs_when_last_message_was_overwritten():
+    gone, newer = ObjectId(), ObjectId()
+    bus, applied, cleared = make_bus([[message(newer, "a")], [message(ObjectId(), "b")]])
+
+    bus._tail(gone)
+    assert cleared == [True]
+    assert applied == ["b"]
+    assert bus.stats()["resyncs"] == 1
+
+
+def test_own_messages_are_ignored():
+    bus, applied, _ = make_bus([])
+    bus._apply({**message(ObjectId(), "b"), "origin": bus.origin})
+    assert applied == []
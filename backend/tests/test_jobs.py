@@ -0,0 +1,139 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from app.utils.indexes import ensure_indexes
+from app.utils.jobs import job_queue
+
+
+def test_worker_survives_failing_to_record_an_outcome(app, monkeypatch):
+    monkeypatch.setitem(job_queue._tasks, 'test-echo', lambda payload: payload)
+    monkeypatch.setattr(job_queue, 'poll_interval', 0.01)
+    first, second = job_queue.enqueue('test-echo', {"n": 1}), job_queue.enqueue('test-echo', {"n": 2})
+    stop, ran = threading.Event(), []
+
+    def run(job, worker_id):
+        ran.append(str(job["_id"]))
+        if len(ran) == 1:
+            raise AutoReconnect("primary stepped down")
+        stop.set()
+    monkeypatch.setattr(job_queue, 'run', run)
+
+    worker = threading.Thread(target=job_queue.work, args=('test-worker', stop), daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert ran == [first, second]
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    monkeypatch.setitem(job_queue._tasks, 'test-echo', lambda payload: payload)
+    return job_queue
+
+
+def test_claim_leases_the_oldest_due_job(app, queue):
+    later = queue.enqueue('test-echo', {"n": 2})
+    first = queue.enqueue('test-echo', {"n": 1})
+    app.db.jobs.update_one({"_id": ObjectId(first)}, {"$set": {"run_at": datetime.utcnow() - timedelta(minutes=1)}})
+
+    job = queue.claim('w1')
+    assert str(job["_id"]) == first
+    assert job["status"] == "running" and job["worker"] == "w1" and job["attempts"] == 1
+    assert job["lease_expires_at"] > datetime.utcnow()
+    assert str(queue.claim('w2')["_id"]) == later
+    assert queue.claim('w3') is None
+
+
+def test_failed_attempt_is_retried_with_backoff_then_fails(app, queue, monkeypatch):
+    def boom(payload):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(queue._tasks, 'test-boom', boom)
+    job_id = queue.enqueue('test-boom')
+
+    queue.run(queue.claim('w1'), 'w1')
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["last_error"] == "RuntimeError: boom"
+    assert job["run_at"] > datetime.utcnow() + timedelta(seconds=1)
+    # Not due again until the backoff has passed
+    assert queue.claim('w1') is None
+
+    for attempt in range(2, queue.max_attempts + 1):
+        app.db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": {"run_at": datetime.utcnow()}})
+        job = queue.claim('w1')
+        assert job["attempts"] == attempt
+        queue.run(job, 'w1')
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "RuntimeError: boom"
+
+
+def test_expired_lease_is_reclaimed_then_reaped_after_last_attempt(app, queue):
+    job_id = queue.enqueue('test-echo')
+    expire = {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    for attempt in range(1, queue.max_attempts + 1):
+        job = queue.claim(f'w{attempt}')
+        assert job["attempts"] == attempt
+        assert queue.reap() == 0
+        app.db.jobs.update_one({"_id": ObjectId(job_id)}, expire)
+
+    assert queue.claim('w-last') is None
+    assert queue.reap() == 1
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Visibility timeout expired"
+
+
+def test_dedupe_returns_the_active_job(app, queue):
+    ensure_indexes(app.db)
+    first = queue.enqueue('test-echo', {"n": 1}, dedupe=True)
+    assert queue.enqueue('test-echo', {"n": 1}, dedupe=True) == first
+    assert queue.enqueue('test-echo', {"n": 2}, dedupe=True) != first
+
+    queue.run(queue.claim('w1'), 'w1')
+    assert queue.get(first)["status"] == "succeeded"
+    assert queue.enqueue('test-echo', {"n": 1}, dedupe=True) != first
+
+
+def test_lease_is_renewed_while_a_job_runs(app, queue, monkeypatch):
+    monkeypatch.setattr(queue, 'visibility_timeout', 0.3)
+    leases = []
+
+    def slow(payload):
+        for _ in range(3):
+            time.sleep(0.2)
+            leases.append(app.db.jobs.find_one({}, {"lease_expires_at": 1})["lease_expires_at"])
+        return "done"
+    monkeypatch.setitem(queue._tasks, 'test-slow', slow)
+    job_id = queue.enqueue('test-slow')
+
+    queue.run(queue.claim('w1'), 'w1')
+    assert leases == sorted(leases) and leases[0] < leases[-1]
+    assert queue.get(job_id)["status"] == "succeeded"
+
+
+def test_lease_renewal_stops_once_another_worker_holds_the_job(app, queue):
+    queue.enqueue('test-echo')
+    job = queue.claim('w1')
+    assert queue.renew_lease(job, 'w1')
+    app.db.jobs.update_one({"_id": job["_id"]}, {"$set": {"worker": "w2"}})
+    assert not queue.renew_lease(job, 'w1')
+
+
+def test_only_the_owner_can_poll_a_job(app, client, auth_header, queue):
+    owner_id, owner_headers = auth_header('faculty')
+    _, other_headers = auth_header('faculty')
+    job_id = queue.enqueue('test-echo', {"n": 1}, owner_id=owner_id)
+
+    response = client.get(f'/api/jobs/{job_id}', headers=owner_headers)
+    assert response.status_code == 200
+    assert response.get_json()["job"]["id"] == job_id
+    assert response.get_json()["job"]["status"] == "queued"
+    assert client.get(f'/api/jobs/{job_id}', headers=other_headers).status_code == 404
+    assert client.get('/api/jobs/not-an-id', headers=owner_headers).status_code == 404
+    assert client.get(f'/api/jobs/{job_id}').status_code == 401
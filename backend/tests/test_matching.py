@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import mongomock
+import numpy as np
+import pytest
+from bson import ObjectId
+from app.models.collaboration import Collaboration
+from app.utils import matching
+from app.utils.matching import (
+    MATCHES_COLLECTION, MatchScorer, MatchScorerCache, recompute_matches, stored_top_matches
+)
+
+USERS = [
+    {"_id": "s1", "user_type": "student", "research_interests": ["AI", "Robotics"]},
+    {"_id": "s2", "user_type": "student", "research_interests": ["AI"]},
+    {"_id": "f1", "user_type": "faculty", "research_interests": ["AI", "Robotics"]},
+    {"_id": "f2", "user_type": "faculty", "research_interests": ["AI", "Databases"]},
+    {"_id": "f3", "user_type": "faculty", "research_interests": ["Databases"]},
+    {"_id": "f4", "user_type": "faculty", "research_interests": []},
+]
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.users.insert_many([dict(u) for u in USERS])
+    return db
+
+
+def test_rare_shared_interests_rank_higher():
+    scorer = MatchScorer(USERS)
+    top = scorer.top_matches("s1", ["AI", "Robotics"], "faculty")
+    assert [candidate for candidate, _, _ in top] == ["f1", "f2"]
+    assert top[0][1] == pytest.approx(1.0)
+    assert top[0][2] == ["AI", "Robotics"]
+    assert top[1][2] == ["AI"]
+
+
+def test_top_matches_pages_and_excludes_non_overlapping():
+    scorer = MatchScorer(USERS)
+    assert [c for c, _, _ in scorer.top_matches("s1", ["AI", "Robotics"], "faculty", limit=1, offset=1)] == ["f2"]
+    assert scorer.top_matches("s1", ["Unknown"], "faculty") == []
+    assert scorer.top_matches("s1", ["AI"], "admin") == []
+
+
+def test_queries_read_only_postings_of_their_interests():
+    scorer = MatchScorer(USERS)
+    positions, scores = scorer.posting_scores("faculty", *scorer.query_weights(["Robotics"]))
+    assert [scorer.user_ids[scorer.rows_by_type["faculty"][p]] for p in positions] == ["f1"]
+    assert len(scores) == 1
+    assert scorer.posting_scores("faculty", *scorer.query_weights(["Unknown"]))[0].size == 0
+
+
+def test_posting_scores_agree_with_full_product():
+    rng = np.random.RandomState(7)
+    topics = [f"t{i}" for i in range(30)]
+    users = [
+        {"_id": f"{kind}{n}", "user_type": "faculty" if kind == "f" else "student",
+         "research_interests": list(rng.choice(topics, size=rng.randint(1, 5), replace=False))}
+        for kind in "fs" for n in range(200)
+    ]
+    scorer = MatchScorer(users)
+    interests = ["t1", "t2", "t3"]
+    columns, weights = scorer.query_weights(interests)
+    full = scorer.weights[scorer.rows_by_type["faculty"]][:, columns] @ weights
+    positions, scores = scorer.posting_scores("faculty", columns, weights)
+    assert set(np.flatnonzero(full)) == set(positions)
+    assert scores == pytest.approx(full[positions])
+    expected = sorted(np.flatnonzero(full), key=lambda p: (-full[p], users[p]["_id"]))[:10]
+    top = scorer.top_matches("s0", interests, "faculty", limit=10)
+    assert [c for c, _, _ in top] == [users[p]["_id"] for p in expected]
+
+
+def test_batch_scores_match_single_queries():
+    scorer = MatchScorer(USERS)
+    for user_id, matches in scorer.top_matches_for_all("student", "faculty", k=5):
+        interests = next(u["research_interests"] for u in USERS if u["_id"] == user_id)
+        single = scorer.top_matches(user_id, interests, "faculty", limit=5)
+        assert [(c, pytest.approx(s), i) for c, s, i in single] == matches
+
+
+def test_recompute_and_serve_stored_matches(db):
+    assert recompute_matches(db, k=1) == 5
+    assert stored_top_matches(db, "s1", "student", limit=1) == [("f1", 1.0, ["AI", "Robotics"])]
+    # Past the stored top k the caller has to score live
+    assert stored_top_matches(db, "s1", "student", limit=2) is None
+    assert stored_top_matches(db, "s1", "faculty", limit=1) is None
+    assert stored_top_matches(db, "f4", "faculty") is None
+
+
+def test_short_stored_list_answers_any_page(db):
+    recompute_matches(db, k=20)
+    page = stored_top_matches(db, "s2", "student", limit=20, offset=0)
+    assert [c for c, _, _ in page] == ["f1", "f2"]
+    assert stored_top_matches(db, "s2", "student", limit=20, offset=20) == []
+
+
+def test_recompute_drops_lists_of_users_without_interests(db):
+    recompute_matches(db)
+    db.users.update_one({"_id": "s2"}, {"$set": {"research_interests": []}})
+    recompute_matches(db)
+    assert db[MATCHES_COLLECTION].find_one({"_id": "s2"}) is None
+
+
+def test_scorer_cache_serves_stale_scorer_while_rebuilding(db, monkeypatch):
+    cache = MatchScorerCache(ttl=0.01)
+    first = cache.get(db)
+    time.sleep(0.02)
+
+    release = threading.Event()
+    loaded = []
+
+    def slow_load(database):
+        release.wait(5)
+        scorer = MatchScorer(USERS)
+        loaded.append(scorer)
+        return scorer
+
+    monkeypatch.setattr(matching.MatchScorer, "load", staticmethod(slow_load))
+    assert cache.get(db) is first
+    assert cache.get(db) is first
+    release.set()
+    for _ in range(100):
+        if cache._scorer is not first:
+            break
+        time.sleep(0.01)
+    assert len(loaded) == 1
+    assert cache._scorer is loaded[0]
+
+
+def test_stale_stored_list_is_scored_live_and_queues_recompute(app, monkeypatch):
+    db = app.db
+    db.users.insert_many([dict(u) for u in USERS])
+    recompute_matches(db, k=5)
+    monkeypatch.setattr(matching.match_scorer, "_recompute_requested_at", None)
+    assert stored_top_matches(db, "s1", "student", max_age=60) is not None
+
+    db[MATCHES_COLLECTION].update_many({}, {"$set": {"computed_at": datetime.utcnow() - timedelta(seconds=61)}})
+    assert stored_top_matches(db, "s1", "student", max_age=60) is None
+    assert stored_top_matches(db, "s2", "student", max_age=60) is None
+    jobs = list(db.jobs.find({"name": "recompute-matches"}))
+    assert len(jobs) == 1
+    assert jobs[0]["payload"] == {"top": 5}
+
+
+def test_find_matches_sees_profile_changes_after_recompute(app, monkeypatch):
+    db = app.db
+    student, moved = ObjectId(), ObjectId()
+    db.users.insert_many([
+        {"_id": student, "user_type": "student", "research_interests": ["AI"]},
+        {"_id": moved, "user_type": "faculty", "research_interests": ["AI"]},
+    ])
+    monkeypatch.setattr(matching.match_scorer, "_scorer", None)
+    monkeypatch.setattr(matching.match_scorer, "_recompute_requested_at", None)
+    recompute_matches(db)
+
+    # The candidate's interests change after their match was stored
+    db.users.update_one({"_id": moved}, {"$set": {"research_interests": ["Biology"]}})
+    with app.app_context():
+        assert Collaboration.find_matches(str(student), "student") == []
+
+    # A faculty member added later is found once the stored list has expired
+    added = db.users.insert_one({"user_type": "faculty", "research_interests": ["AI"]}).inserted_id
+    db[MATCHES_COLLECTION].update_many({}, {"$set": {"computed_at": datetime(2000, 1, 1)}})
+    monkeypatch.setattr(matching.match_scorer, "_scorer", None)
+    with app.app_context():
+        matches = Collaboration.find_matches(str(student), "student")
+    assert [(m["_id"], m["common_interests"]) for m in matches] == [(added, ["AI"])]
@@ -0,0 +1,46 @@
+from flask import Flask
+from app.utils import mongo as mongo_module
+from app.utils.mongo import Mongo
+
+
+class FakeClient:
+    def __init__(self, uri, event_listeners=(), **options):
+        self.uri = uri
+        self.options = options
+
+    def __getitem__(self, name):
+        return name
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    return app
+
+
+def test_init_app_with_new_settings_replaces_the_client(monkeypatch):
+    monkeypatch.setattr(mongo_module, "MongoClient", FakeClient)
+    mongo = Mongo()
+    mongo.init_app(make_app(MONGO_URI="mongodb://one/"))
+    first = mongo.client
+    assert first.uri == "mongodb://one/"
+
+    mongo.init_app(make_app(MONGO_URI="mongodb://one/"))
+    assert mongo.client is first
+
+    mongo.init_app(make_app(MONGO_URI="mongodb://two/"))
+    assert mongo.client.uri == "mongodb://two/"
+
+    second = mongo.client
+    mongo.init_app(make_app(MONGO_URI="mongodb://two/", MONGO_MAX_POOL_SIZE=5))
+    assert mongo.client is not second
+    assert mongo.client.options["maxPoolSize"] == 5
+
+
+def test_init_app_picks_up_a_new_database_name(monkeypatch):
+    monkeypatch.setattr(mongo_module, "MongoClient", FakeClient)
+    mongo = Mongo()
+    mongo.init_app(make_app(MONGO_DBNAME="first"))
+    assert mongo.db == "first"
+    mongo.init_app(make_app(MONGO_DBNAME="second"))
+    assert mongo.db == "second"
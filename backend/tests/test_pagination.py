@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.utils.helpers import (
+    decode_cursor, decode_page_cursor, encode_cursor, finish_page, inbox_page, paginate,
+    parse_inbox_args, parse_page_args
+)
+
+
+def test_cursor_round_trip():
+    values = {"id": str(ObjectId()), "score": 3}
+    token = encode_cursor(values)
+    assert '=' not in token
+    assert decode_cursor(token) == values
+    assert decode_cursor(None) is None and decode_cursor('') is None
+
+
+@pytest.mark.parametrize("token", ["%%%", encode_cursor([1, 2]), "bm90IGpzb24"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_page_cursor_validates_id_and_score():
+    object_id = ObjectId()
+    assert decode_page_cursor(encode_cursor({"id": str(object_id)})) == {"id": object_id}
+    with pytest.raises(ValueError):
+        decode_page_cursor(encode_cursor({"id": "nope"}))
+    with pytest.raises(ValueError):
+        decode_page_cursor(encode_cursor({"id": str(object_id)}), search="ada")
+
+
+def test_parse_page_args():
+    assert parse_page_args({"limit": "5", "cursor": "abc"}) == (5, "abc")
+    assert parse_page_args({"limit": "100000"})[0] < 100000
+    for limit in ("0", "x"):
+        with pytest.raises(ValueError):
+            parse_page_args({"limit": limit})
+
+
+def test_finish_page():
+    documents = [{"_id": ObjectId(), "search_score": s} for s in (9, 8, 7)]
+    page, cursor = finish_page(list(documents), 2)
+    assert page == documents[:2]
+    assert decode_cursor(cursor) == {"id": str(documents[1]["_id"])}
+    page, cursor = finish_page(list(documents), 2, search="ada")
+    assert decode_cursor(cursor) == {"id": str(documents[1]["_id"]), "score": 8}
+    assert finish_page(list(documents), 3) == (documents, None)
+
+
+def test_paginate_walks_every_document_once(app):
+    ids = [app.db.users.insert_one({"user_type": "student", "n": n}).inserted_id for n in range(5)]
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(app.db.users, {"user_type": "student"}, 2, cursor)
+        seen.extend(doc["_id"] for doc in page)
+        if cursor is None:
+            break
+    assert seen == sorted(ids)
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest"])
+def test_inbox_pages_follow_created_at_then_id(app, sort):
+    start = datetime(2024, 1, 1)
+    # Two requests share a timestamp so the _id tiebreak is exercised
+    times = [start, start + timedelta(hours=1), start + timedelta(hours=1), start + timedelta(hours=2)]
+    for created_at in times:
+        app.db.collaborations.insert_one({"faculty_id": "f1", "status": "pending", "created_at": created_at})
+    app.db.collaborations.insert_one({"faculty_id": "f2", "status": "pending", "created_at": start})
+    filters = parse_inbox_args({"sort": sort})
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = inbox_page(app.db.collaborations, "faculty_id", "f1", filters, 1, cursor,
+                                  projection={"status": 1})
+        assert all("created_at" not in doc for doc in page)
+        seen.extend(doc["_id"] for doc in page)
+        if cursor is None:
+            break
+    expected = [doc["_id"] for doc in app.db.collaborations.find({"faculty_id": "f1"}).sort(
+        [("created_at", 1 if sort == "oldest" else -1), ("_id", 1 if sort == "oldest" else -1)])]
+    assert seen == expected
+
+
+def test_inbox_rejects_foreign_cursor(app):
+    filters = parse_inbox_args({})
+    with pytest.raises(ValueError):
+        inbox_page(app.db.collaborations, "faculty_id", "f1", filters, 10, encode_cursor({"id": "x"}))
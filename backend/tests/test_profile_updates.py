@@ -0,0 +1,95 @@
+import pytest
+from bson import ObjectId
+
+from app.models.user import User, VersionConflictError, profile_delta
+
+
+def test_delta_skips_unchanged_fields():
+    assert profile_delta({"name": "Ada", "bio": "x"}, {"name": "Ada"}) == ({}, {})
+
+
+def test_delta_sets_scalars_and_new_fields():
+    operators, changed = profile_delta({"name": "Ada"}, {"name": "Ada L", "bio": "Engines"})
+    assert operators == {"$set": {"name": "Ada L", "bio": "Engines"}}
+    assert changed == {"name": "Ada L", "bio": "Engines"}
+
+
+def test_delta_pushes_appended_items():
+    operators, _ = profile_delta({"skills": ["a", "b"]}, {"skills": ["a", "b", "c"]})
+    assert operators == {"$push": {"skills": {"$each": ["c"]}}}
+
+
+def test_delta_pulls_removed_items():
+    operators, _ = profile_delta({"skills": ["a", "b", "c", "b"]}, {"skills": ["a", "c"]})
+    assert operators == {"$pull": {"skills": {"$in": ["b"]}}}
+    operators, _ = profile_delta({"skills": ["a", "b"]}, {"skills": []})
+    assert operators == {"$pull": {"skills": {"$in": ["a", "b"]}}}
+
+
+@pytest.mark.parametrize("new", [["b", "a"], ["a", "x"], ["x", "a", "b"]])
+def test_delta_replaces_reordered_or_edited_arrays(new):
+    operators, _ = profile_delta({"skills": ["a", "b"]}, {"skills": new})
+    assert operators == {"$set": {"skills": new}}
+
+
+@pytest.fixture
+def student(app):
+    result = app.db.users.insert_one({
+        "name": "Ada", "user_type": "student", "bio": "Engines",
+        "research_interests": ["Machine Learning"], "skills": ["python", "c"],
+    })
+    return str(result.inserted_id)
+
+
+def update(app, student, data, expected_version=None):
+    with app.app_context():
+        return User.update_profile(student, "student", data, expected_version)
+
+
+def test_update_bumps_version_and_replaces_arrays(app, student):
+    assert update(app, student, {"skills": ["rust"], "bio": "Looms"}) == 1
+    stored = app.db.users.find_one({"_id": ObjectId(student)})
+    assert stored["skills"] == ["rust"]
+    assert stored["bio"] == "Looms"
+    assert stored["version"] == 1
+
+
+def test_update_appends_and_removes_array_items(app, student):
+    assert update(app, student, {"skills": ["python", "c", "go"]}) == 1
+    assert update(app, student, {"skills": ["c", "go"]}, expected_version=1) == 2
+    assert app.db.users.find_one({"_id": ObjectId(student)})["skills"] == ["c", "go"]
+
+
+def test_noop_update_keeps_version(app, student):
+    assert update(app, student, {"bio": "Looms"}) == 1
+    assert update(app, student, {"bio": "Looms", "skills": ["python", "c"]}, expected_version=1) == 1
+    assert app.db.users.find_one({"_id": ObjectId(student)})["version"] == 1
+
+
+def test_stale_version_is_rejected(app, student):
+    update(app, student, {"bio": "Looms"})
+    with pytest.raises(VersionConflictError) as conflict:
+        update(app, student, {"bio": "Cards"}, expected_version=0)
+    assert conflict.value.current_version == 1
+    assert app.db.users.find_one({"_id": ObjectId(student)})["bio"] == "Looms"
+
+
+def test_protected_fields_are_ignored(app, student):
+    assert update(app, student, {"user_type": "faculty", "version": 7}) == 0
+    assert app.db.users.find_one({"_id": ObjectId(student)})["user_type"] == "student"
+
+
+def test_unknown_user_returns_none(app):
+    assert update(app, str(ObjectId()), {"bio": "x"}) is None
+    assert update(app, "not-an-id", {"bio": "x"}) is None
+
+
+def test_put_with_stale_version_returns_409(app, client, auth_header, student):
+    _, headers = auth_header('student', student)
+    response = client.put(f'/api/students/{student}', json={"bio": "Looms", "version": 0}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["version"] == 1
+
+    response = client.put(f'/api/students/{student}', json={"bio": "Cards", "version": 0}, headers=headers)
+    assert response.status_code == 409
+    assert response.get_json()["version"] == 1
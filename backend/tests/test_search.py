@@ -0,0 +1,111 @@
+import pytest
+from app.utils.search import (
+    SEARCH_NAME_TERMS_FIELD, SEARCH_TERMS_FIELD, SearchQuery, index_terms, ranked_search_pipeline, stem, tokenize
+)
+
+
+@pytest.mark.parametrize("singular, plural", [
+    ("class", "classes"),
+    ("process", "processes"),
+    ("mass", "masses"),
+    ("business", "businesses"),
+    ("network", "networks"),
+    ("study", "studies"),
+    ("box", "boxes"),
+    ("database", "databases"),
+])
+def test_singular_and_plural_share_a_stem(singular, plural):
+    assert stem(singular) == stem(plural)
+
+
+@pytest.mark.parametrize("word", ["class", "process", "virus", "focus", "analysis"])
+def test_ss_us_is_endings_are_kept(word):
+    assert stem(word) == word
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("learning", "learn"),
+    ("learned", "learn"),
+    ("studied", "study"),
+    ("management", "manag"),
+    ("machine", "machin"),
+])
+def test_suffixes_are_stripped(word, expected):
+    assert stem(word) == expected
+
+
+def test_short_words_and_numbers_are_unchanged():
+    assert stem("ai") == "ai"
+    assert stem("bus") == "bus"
+    assert stem("2024") == "2024"
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Theory of Machine-Learning!") == ["theory", "machine", "learning"]
+    assert tokenize(["Deep learning", None, "NLP"]) == ["deep", "learning", "nlp"]
+    assert tokenize(None) == []
+
+
+def test_index_terms():
+    fields = index_terms({"name": "Ada Lovelace", "bio": "Analytical engines", "research_interests": ["Classes"]})
+    assert fields[SEARCH_NAME_TERMS_FIELD] == ["ada", "lovelac"]
+    assert fields[SEARCH_TERMS_FIELD] == ["ada", "analytical", "class", "engin", "lovelac"]
+
+
+def test_search_query_splits_terms_and_prefix():
+    search = SearchQuery("machine learning cla")
+    assert search.terms == ["learn", "machin"]
+    assert search.prefix == "cla"
+    assert search
+
+
+def test_empty_search_query_is_falsy():
+    assert not SearchQuery("")
+    assert not SearchQuery("the of and")
+
+
+def test_search_query_filter():
+    clauses = SearchQuery("classes proc").filter()["$or"]
+    assert {SEARCH_TERMS_FIELD: {"$in": ["class"]}} in clauses
+    assert {SEARCH_TERMS_FIELD: {"$regex": "^proc"}} in clauses
+    assert {SEARCH_TERMS_FIELD: {"$in": ["proc"]}} in clauses
+
+
+@pytest.mark.parametrize("typed, stems", [
+    ("learni", ["learn", "learni"]),
+    ("machine", ["machi", "machin", "machine"]),
+    ("studies", ["studi", "studie", "studies", "study"]),
+    ("ratings", ["rat", "rating", "ratings"]),
+    ("artificial", ["artificia", "artificial"]),
+    ("batch", ["batch"]),
+])
+def test_prefix_stems_only_drop_strippable_endings(typed, stems):
+    assert SearchQuery(typed)._prefix_stems() == stems
+
+
+@pytest.mark.parametrize("typed, bio", [("artificial", "Art history"), ("machine", "Mac"), ("batch", "Bats")])
+def test_prefix_does_not_match_unrelated_shorter_words(app, typed, bio):
+    app.db.users.insert_one({"user_type": "faculty", **index_terms({"bio": bio})})
+    search = SearchQuery(typed)
+    assert app.db.users.count_documents(search.filter()) == 0
+
+
+def test_prefix_matches_words_being_typed(app):
+    app.db.users.insert_one({"user_type": "faculty", **index_terms({"bio": "Machine learning"})})
+    for typed in ("machine", "learni", "learnings"):
+        assert app.db.users.count_documents(SearchQuery(typed).filter()) == 1
+
+
+def test_prefix_only_query_has_no_term_clause():
+    search = SearchQuery("lea")
+    assert search.terms == []
+    assert search.filter()["$or"] == [
+        {SEARCH_TERMS_FIELD: {"$regex": "^lea"}},
+        {SEARCH_TERMS_FIELD: {"$in": ["lea"]}},
+    ]
+
+
+def test_ranked_pipeline_keeps_score_for_inclusion_projection():
+    pipeline = ranked_search_pipeline({"user_type": "faculty"}, SearchQuery("ai"), 20, projection={"name": 1})
+    assert pipeline[-1] == {"$project": {"name": 1, "search_score": 1}}
+    assert pipeline[-2] == {"$limit": 21}
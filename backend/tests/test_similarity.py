@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.utils.search import SIMILARITY_BANDS_FIELD, SIMILARITY_SIGNATURE_FIELD
+from app.utils.similarity import (
+    BANDS, NUM_PERMUTATIONS, band_keys, shingles, signature, similarity_fields
+)
+
+NEURAL = {"bio": "Neural networks for protein structure prediction and folding",
+          "research_interests": ["Deep Learning", "Computational Biology"]}
+NETWORK = {"bio": "Training neural networks to predict protein folding structure",
+           "research_interests": ["Deep Learning"]}
+MEDIEVAL = {"bio": "Medieval manuscripts and the history of monastic libraries",
+            "publications": [{"title": "Scriptoria of northern France"}]}
+
+
+def estimate(a, b):
+    return float((signature(shingles(a)) == signature(shingles(b))).mean())
+
+
+def test_shingles_include_stemmed_words_and_pairs():
+    result = shingles({"bio": "Neural networks", "publications": [{"title": "Graphs", "year": 2020}]})
+    assert {"neural", "network", "neural network", "graph"} <= result
+
+
+def test_signature_is_deterministic():
+    sig = signature(shingles(NEURAL))
+    assert sig.shape == (NUM_PERMUTATIONS,)
+    assert np.array_equal(sig, signature(shingles(dict(NEURAL))))
+    assert signature(set()) is None
+
+
+def test_similar_profiles_agree_on_more_minhashes():
+    assert estimate(NEURAL, NEURAL) == 1.0
+    assert estimate(NEURAL, NETWORK) > estimate(NEURAL, MEDIEVAL)
+
+
+def test_band_keys_cover_every_band():
+    keys = band_keys(signature(shingles(NEURAL)))
+    assert len(keys) == BANDS
+    assert [key.split(':')[0] for key in keys] == [str(band) for band in range(BANDS)]
+
+
+def test_similarity_fields():
+    fields = similarity_fields(NEURAL)
+    assert len(fields[SIMILARITY_SIGNATURE_FIELD]) == NUM_PERMUTATIONS
+    assert all(isinstance(v, int) for v in fields[SIMILARITY_SIGNATURE_FIELD])
+    assert len(fields[SIMILARITY_BANDS_FIELD]) == BANDS
+    assert similarity_fields({"name": "No text"}) == {SIMILARITY_SIGNATURE_FIELD: [], SIMILARITY_BANDS_FIELD: []}
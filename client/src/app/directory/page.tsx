@@ -2,7 +2,7 @@
 
 import type { Faculty } from "@/types/user";
 import type { Student } from "@/types/user";
-import { useEffect, useState, useMemo, useCallback } from "react";
+import { useEffect, useState, useMemo, useCallback, useRef } from "react";
 // Import API functions
 import { facultyService } from "@/services/api";
 import { studentService } from "@/services/api";
@@ -50,13 +50,12 @@ export default function DirectoryPage() {
         setIsLoading(true);
         setError(null); // Reset error state
         try {
-            // Fetch data from API
-            const [facultyResponse, studentsResponse] = await Promise.all([
-                facultyService.getAllFaculty(),
-                studentService.getAllStudents(),
+            // Fetch every page of both directories; the filter options below
+            // are built from the full lists
+            const [faculty, students] = await Promise.all([
+                facultyService.listAllFaculty(),
+                studentService.listAllStudents(),
             ]);
-            const faculty = facultyResponse.data.faculty;
-            const students = studentsResponse.data.students;
 
             const combinedUsers = [...faculty, ...students].filter(Boolean); // Filter out any potential null/undefined entries
             setAllUsers(combinedUsers);
@@ -103,52 +102,61 @@ export default function DirectoryPage() {
         return [ALL_RESEARCH_AREAS_VALUE, ...Array.from(allAreas).sort()];
     }, [allUsers]);
 
-    const filterUsersCallback = useCallback(() => {
-        if (isLoading) return; // Don't filter while loading initial data
-
-        let users = allUsers;
+    // Department, research area and search are applied by the API; the user
+    // type only decides which directories are asked. Responses to superseded
+    // filter changes are dropped.
+    const latestFilterRequest = useRef(0);
 
-        // Filter by User Type
-        if (userTypeFilter !== "all") {
-            users = users.filter((user) => user?.user_type === userTypeFilter);
-        }
+    const filterUsersCallback = useCallback(async () => {
+        if (isLoading) return; // Don't filter while loading initial data
 
-        // Filter by Department
+        const request = ++latestFilterRequest.current;
+        const params: Record<string, string> = {};
         if (departmentFilter !== ALL_DEPARTMENTS_VALUE) {
-            users = users.filter(
-                (user) => user?.department === departmentFilter
-            );
+            params.department = departmentFilter;
         }
-
-        // Filter by Research Area
         if (
             researchAreaFilter &&
             researchAreaFilter !== ALL_RESEARCH_AREAS_VALUE
         ) {
-            // Ensure researchInterests is an array before checking includes
-            users = users.filter(
-                (user) =>
-                    Array.isArray(user?.research_interests) &&
-                    user.research_interests.includes(researchAreaFilter)
-            );
+            params.research_interests = researchAreaFilter;
+        }
+        if (searchTerm.trim()) {
+            params.search = searchTerm.trim();
         }
 
-        // Filter by Search Term (Name, Bio, Keywords, Title, Department)
-        if (searchTerm) {
-            const lowerSearchTerm = searchTerm.toLowerCase();
-            users = users.filter(
-                (user) =>
-                    user?.name?.toLowerCase().includes(lowerSearchTerm) ||
-                    user?.bio?.toLowerCase().includes(lowerSearchTerm) ||
-                    (Array.isArray(user?.research_interests) &&
-                        user.research_interests.some((interest: string) =>
-                            interest?.toLowerCase().includes(lowerSearchTerm)
-                        )) ||
-                    user?.department?.toLowerCase().includes(lowerSearchTerm)
+        // Without server-side filters the full lists are already loaded
+        if (Object.keys(params).length === 0) {
+            setFilteredUsers(
+                userTypeFilter === "all"
+                    ? allUsers
+                    : allUsers.filter((user) => user?.user_type === userTypeFilter)
             );
+            return;
         }
 
-        setFilteredUsers(users);
+        try {
+            const [faculty, students] = await Promise.all([
+                userTypeFilter !== "student"
+                    ? facultyService.listAllFaculty(params)
+                    : Promise.resolve([]),
+                userTypeFilter !== "faculty"
+                    ? studentService.listAllStudents(params)
+                    : Promise.resolve([]),
+            ]);
+            if (request === latestFilterRequest.current) {
+                setFilteredUsers([...faculty, ...students].filter(Boolean));
+            }
+        } catch (err) {
+            console.error("Error filtering users via API:", err);
+            if (request === latestFilterRequest.current) {
+                const message =
+                    err instanceof Error
+                        ? err.message
+                        : "An unknown error occurred.";
+                setError(`Failed to filter users: ${message}.`);
+            }
+        }
     }, [
         allUsers,
         searchTerm,
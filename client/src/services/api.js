@@ -47,6 +47,23 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
+// Directory listings are cursor-paginated: follow next_cursor until the
+// last page so callers get every matching user, not just the first page
+const DIRECTORY_PAGE_SIZE = 100;
+
+const fetchAllPages = async (path, key, params = {}) => {
+    const items = [];
+    let cursor = null;
+    do {
+        const response = await api.get(path, {
+            params: { ...params, limit: DIRECTORY_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+        });
+        items.push(...(response.data[key] || []));
+        cursor = response.data.next_cursor;
+    } while (cursor);
+    return items;
+};
+
 // Auth Services
 export const authService = {
     registerStudent: (data) => api.post("/auth/register/student", data),
@@ -57,7 +74,9 @@ export const authService = {
 
 // Student Services
 export const studentService = {
-    getAllStudents: () => api.get("/students"),
+    getAllStudents: (params) => api.get("/students", { params }),
+    // Every page of students matching { department, research_interests, search }
+    listAllStudents: (filters) => fetchAllPages("/students", "students", filters),
     getStudentById: (studentId) => api.get(`/students/${studentId}`),
     updateStudent: (studentId, data) => api.put(`/students/${studentId}`, data),
     getPrograms: () => api.get("/programs"),
@@ -66,7 +85,9 @@ export const studentService = {
 
 // Faculty Services
 export const facultyService = {
-    getAllFaculty: () => api.get("/faculty" ),
+    getAllFaculty: (params) => api.get("/faculty", { params }),
+    // Every page of faculty matching { department, research_interests, search }
+    listAllFaculty: (filters) => fetchAllPages("/faculty", "faculty", filters),
     getFacultyById: (id) => api.get(`/faculty/${id}`),
     getFacultyByDepartment: (department) =>
         api.get("/faculty", { params: { department } }),